@@ -0,0 +1,306 @@
+# archive.py
+# Append-only columnar archive of finished runs.
+#
+# <dir>/meta.json        schema and committed row counts, replaced atomically
+# <dir>/run.<col>        one fixed-width value per run
+# <dir>/day.<col>        one fixed-width value per day played (at dusk), the
+#                        days of run i at rows run.start[i] .. run.start[i+1]
+#
+# Columns are raw machine arrays (array typecodes below), so a reader maps
+# them and casts the bytes rather than parsing rows. Appends write the
+# column files first and then commit the new counts in meta.json; bytes past
+# the committed counts (a crash mid-append) are cut off on the next open.
+#
+# A game feeds a RunLog at every dusk and appends it when the run is over:
+#
+#   log = RunLog(gs.rng.seed)
+#   ... log.dusk(gs) after each day ...
+#   with Archive("runs") as a:
+#       a.append(log.finish(gs))
+#
+# The queries (survival_curve, causes, order_vs_day, day_means) scan the
+# mapped columns with C-level iteration (Counter, zip, map, sum) and build
+# only the aggregates. day_means uses numpy when it is installed (one
+# bincount over the day rows instead of a loop per run).
+from __future__ import annotations
+import json
+import mmap
+import operator
+import os
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from entities import GameState, SIDES
+import recipes
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python queries below still work
+    np = None
+
+VERSION = 1
+CAUSES = ("survived", "overrun", "starved")
+
+RUN_COLUMNS = (
+    ("seed", "Q"),
+    ("day", "H"),       # day reached, as in "You survived until Day N"
+    ("cause", "B"),     # index into CAUSES
+    ("upgrades", "B"),  # recipes.BIT mask of the upgrades owned at the end
+    ("order", "H"),     # upgrades in the order bought, see encode_order()
+    ("start", "Q"),     # first row of the run in the day columns
+)
+DAY_COLUMNS = (
+    ("wood", "i"),
+    ("food", "i"),
+    ("fence_hp", "i"),  # all sides together
+)
+_WIDTH = {"B": 1, "H": 2, "i": 4, "Q": 8}  # bytes, as written
+
+# ---- upgrade order ----
+# The upgrades as 3-bit digits (place in recipes.UPGRADES + 1), first bought
+# lowest; five of them fill the 16-bit column.
+
+_ORDER_BITS = 3
+_UPGRADE_AT = {r.id: k for k, r in enumerate(recipes.UPGRADES)}
+
+assert len(recipes.UPGRADES) * _ORDER_BITS <= 16
+
+def encode_order(ids: Iterable[int]) -> int:
+    """Recipe ids, in the order bought, as an order code."""
+    code = 0
+    for k, rid in enumerate(ids):
+        code |= (_UPGRADE_AT[rid] + 1) << (_ORDER_BITS * k)
+    return code
+
+def decode_order(code: int) -> Tuple[str, ...]:
+    names = []
+    while code:
+        names.append(recipes.UPGRADES[(code & 7) - 1].name)
+        code >>= _ORDER_BITS
+    return tuple(names)
+
+# ---- collecting a run ----
+
+class Run(NamedTuple):
+    seed: int
+    day: int
+    cause: str
+    upgrades: int
+    order: int
+    days: Tuple[Tuple[int, int, int], ...]  # (wood, food, fence_hp) at each dusk
+
+class RunLog:
+    """Per-day figures of one run, taken at dusk."""
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.days: List[Tuple[int, int, int]] = []
+        self.order: List[int] = []  # recipe ids, in the order first seen
+        self._owned = 0
+        self._starving = False
+
+    def dusk(self, gs: GameState):
+        p = gs.player
+        self.days.append((p.wood, p.food, sum(gs.fence(s).hp for s in SIDES)))
+        owned = recipes.owned_mask(gs)
+        if owned != self._owned:
+            # bought the same day: menu order
+            self.order.extend(r.id for r in recipes.UPGRADES if owned & ~self._owned & recipes.BIT[r.id])
+            self._owned = owned
+        self._starving = p.hp <= 0
+
+    def finish(self, gs: GameState) -> Run:
+        cause = "survived" if gs.alive else "starved" if self._starving else "overrun"
+        return Run(self.seed, gs.day_num, cause, recipes.owned_mask(gs), encode_order(self.order),
+                   tuple(self.days))
+
+# ---- storage ----
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class Archive:
+    def __init__(self, path: str = "runs"):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["version"] != VERSION:
+                raise ValueError(f"archive version {meta['version']} (this code reads {VERSION})")
+        else:
+            meta = {"version": VERSION, "runs": 0, "days": 0,
+                    "run": dict(RUN_COLUMNS), "day": dict(DAY_COLUMNS)}
+        self.runs: int = meta["runs"]
+        self.days: int = meta["days"]
+        self._schema = {"run": dict(RUN_COLUMNS), "day": dict(DAY_COLUMNS)}
+        for table in ("run", "day"):
+            if meta[table] != self._schema[table]:
+                raise ValueError(f"archive {table} columns differ from this code's")
+            for tc in meta[table].values():
+                if array(tc).itemsize != _WIDTH[tc]:
+                    raise ValueError(f"typecode {tc!r} has another width on this platform")
+        self._trim()
+        self._pending_run = {name: array(tc) for name, tc in RUN_COLUMNS}
+        self._pending_day = {name: array(tc) for name, tc in DAY_COLUMNS}
+        self._maps: Dict[str, Tuple[mmap.mmap, memoryview]] = {}
+
+    def _file(self, table: str, name: str) -> str:
+        return os.path.join(self.path, f"{table}.{name}")
+
+    def _trim(self):
+        """Cut column files back to the committed counts."""
+        for table, rows in (("run", self.runs), ("day", self.days)):
+            for name, tc in self._schema[table].items():
+                path = self._file(table, name)
+                size = rows * array(tc).itemsize
+                if not os.path.exists(path):
+                    open(path, "wb").close()
+                if os.path.getsize(path) != size:
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+
+    # --- appending ---
+
+    def append(self, run: Run):
+        """Queue a run; flush() (or leaving a `with` block) writes it."""
+        pr = self._pending_run
+        pr["seed"].append(run.seed)
+        pr["day"].append(run.day)
+        pr["cause"].append(CAUSES.index(run.cause))
+        pr["upgrades"].append(run.upgrades)
+        pr["order"].append(run.order)
+        pr["start"].append(self.days + len(self._pending_day["wood"]))
+        pd = self._pending_day
+        for wood, food, fence_hp in run.days:
+            pd["wood"].append(wood)
+            pd["food"].append(food)
+            pd["fence_hp"].append(fence_hp)
+
+    def flush(self):
+        added = len(self._pending_run["seed"])
+        if not added:
+            return
+        days = self.days + len(self._pending_day["wood"])
+        self._unmap()
+        for table, pending in (("run", self._pending_run), ("day", self._pending_day)):
+            for name, col in pending.items():
+                with open(self._file(table, name), "ab") as f:
+                    col.tofile(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                del col[:]
+        self._commit(self.runs + added, days)
+
+    def _commit(self, runs: int, days: int):
+        meta = {"version": VERSION, "runs": runs, "days": days,
+                "run": self._schema["run"], "day": self._schema["day"]}
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.meta_path)
+        _fsync_dir(self.path)
+        self.runs, self.days = runs, days
+
+    # --- reading ---
+
+    def column(self, table: str, name: str) -> memoryview:
+        """Committed values of a column, mapped read-only (no copy).
+        Valid until the next flush() or close()."""
+        key = f"{table}.{name}"
+        hit = self._maps.get(key)
+        if hit is None:
+            tc = self._schema[table][name]
+            rows = self.runs if table == "run" else self.days
+            if rows == 0:
+                return memoryview(array(tc))
+            with open(self._file(table, name), "rb") as f:
+                mm = mmap.mmap(f.fileno(), rows * array(tc).itemsize, access=mmap.ACCESS_READ)
+            hit = self._maps[key] = (mm, memoryview(mm).cast(tc))
+        return hit[1]
+
+    def _unmap(self):
+        for mm, view in self._maps.values():
+            view.release()
+            mm.close()
+        self._maps.clear()
+
+    def close(self):
+        self.flush()
+        self._unmap()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- queries ---
+
+    def causes(self) -> Dict[str, int]:
+        counts = Counter(self.column("run", "cause"))
+        return {CAUSES[c]: n for c, n in sorted(counts.items())}
+
+    def survival_curve(self) -> List[float]:
+        """out[d] = share of runs that reached day d (out[0] = out[1] = 1.0)."""
+        if not self.runs:
+            return []
+        reached = Counter(self.column("run", "day"))
+        out, alive = [0.0] * (max(reached) + 1), self.runs
+        for d in range(len(out)):
+            out[d] = alive / self.runs
+            alive -= reached.get(d, 0)
+        return out
+
+    def order_vs_day(self) -> Dict[Tuple[str, ...], Tuple[int, float]]:
+        """Upgrade order -> (runs, mean day reached), most common first."""
+        pairs = Counter(zip(self.column("run", "order"), self.column("run", "day")))
+        runs: Counter = Counter()
+        days: Counter = Counter()
+        for (order, day), n in pairs.items():
+            runs[order] += n
+            days[order] += n * day
+        return {decode_order(o): (n, days[o] / n) for o, n in runs.most_common()}
+
+    def day_means(self, name: str) -> List[float]:
+        """Mean of a day column on each day, over the runs that played it
+        (out[0] is day 1)."""
+        col = self.column("day", name)
+        starts = self.column("run", "start")
+        if np is not None:
+            return self._day_means_np(col, starts)
+        lengths = Counter(map(operator.sub, chain(starts[1:], (self.days,)), starts))
+        sums = [0] * max(lengths, default=0)
+        for lo, hi in zip(starts, chain(starts[1:], (self.days,))):
+            sums[:hi - lo] = map(operator.add, sums[:hi - lo], col[lo:hi])
+        counts, played = [], sum(lengths.values()) - lengths.get(0, 0)
+        for d in range(len(sums)):
+            counts.append(played)
+            played -= lengths.get(d + 1, 0)
+        return [s / c for s, c in zip(sums, counts)]
+
+    def _day_means_np(self, col: memoryview, starts: memoryview) -> List[float]:
+        if not self.runs:
+            return []
+        starts = np.asarray(starts, dtype=np.int64)
+        lengths = np.diff(starts, append=self.days)
+        # day row r belongs to the run starting at or before it: its day index
+        day_idx = np.arange(self.days) - np.repeat(starts, lengths)
+        sums = np.bincount(day_idx, weights=np.asarray(col, dtype=np.float64),
+                           minlength=int(lengths.max()))
+        # runs that reached day d+1: those with more than d days
+        counts = np.cumsum(np.bincount(lengths)[::-1])[::-1][1:]
+        return (sums / counts).tolist()
+
@@ -0,0 +1,287 @@
+# batch.py
+# Vectorized night simulator: N independent nights advanced in lockstep.
+# Requires numpy. Mirrors night.Night turn for turn; the RNG streams differ,
+# so individual games diverge but the outcome statistics match. A batch
+# plays under one Difficulty (the first state's gs.params by default).
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+import numpy as np
+from difficulty import Difficulty
+from entities import GameState, SIDES
+from night import TURNS, MAX_FREE_ACTIONS
+
+NSIDES = len(SIDES)
+SEQ_SHIFT = 32  # enemy targeting key = hp << HP_SHIFT | dmg << SEQ_SHIFT | spawn order
+HP_SHIFT = 48   # (entities._rank's order; names are not modeled)
+
+BatchPolicy = Callable[["BatchNight"], np.ndarray]
+
+def _spawn_params(day: np.ndarray, p: Difficulty):
+    # Vector form of Difficulty.wave
+    chance = np.minimum(p.spawn_chance + np.minimum(day, p.spawn_chance_days) * p.spawn_chance_per_day,
+                        p.spawn_chance_max)
+    per_spawn = 1 + sum((day >= d).astype(np.int64) for d in p.group_size_days)
+    groups = 1 + sum((day >= d).astype(np.int64) for d in p.groups_days)
+    return chance, per_spawn, groups
+
+def _scaled_stats(day: np.ndarray, rng: np.random.Generator, p: Difficulty):
+    # Vector form of entities.scaled_enemy
+    base_hp = p.enemy_hp + np.floor(day * p.enemy_hp_per_day).astype(np.int64)
+    base_dmg = p.enemy_dmg + np.floor(day * p.enemy_dmg_per_day).astype(np.int64)
+    lo, hi = p.enemy_hp_roll
+    hp = base_hp + rng.integers(lo, hi + 1, len(day))
+    rolls = np.asarray(p.enemy_dmg_roll, dtype=np.int64)
+    dmg = base_dmg + rolls[rng.integers(0, len(rolls), len(day))]
+    return np.maximum(1, hp), dmg
+
+@dataclass
+class BatchResult:
+    survived: np.ndarray
+    turns: np.ndarray
+    spawned: np.ndarray
+    trap_kills: np.ndarray
+    kills: np.ndarray
+    breaches: np.ndarray
+    arrows_spent: np.ndarray
+    damage_taken: np.ndarray
+    fences: np.ndarray  # (n, 4) in SIDES order
+    player_hp: np.ndarray
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "nights": int(len(self.survived)),
+            "survival_rate": float(self.survived.mean()),
+            "mean_turns": float(self.turns.mean()),
+            "mean_spawned": float(self.spawned.mean()),
+            "mean_trap_kills": float(self.trap_kills.mean()),
+            "mean_kills": float(self.kills.mean()),
+            "mean_breaches": float(self.breaches.mean()),
+            "mean_arrows_spent": float(self.arrows_spent.mean()),
+            "mean_damage_taken": float(self.damage_taken.mean()),
+            "mean_fence_hp": float(self.fences.sum(axis=1).mean()),
+        }
+
+class BatchNight:
+    """Struct-of-arrays state for N nights. Row i is game i."""
+
+    def __init__(self, states: Sequence[GameState], seed: Optional[int] = None,
+                 in_tower: bool = False, params: Optional[Difficulty] = None):
+        n = self.n = len(states)
+        self.params = p = params or (states[0].params if n else Difficulty())
+        self.max_groups = 1 + len(p.groups_days)
+        self.max_per_spawn = 1 + len(p.group_size_days)
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)
+        self.turn = 0
+
+        self.day = np.array([gs.day_num for gs in states], dtype=np.int64)
+        self.fence_hp = np.array([[gs.fence(s).hp for s in SIDES] for gs in states], dtype=np.int64)
+        self.hp = np.array([gs.player.hp for gs in states], dtype=np.int64)
+        self.max_hp = np.array([gs.player.max_hp for gs in states], dtype=np.int64)
+        self.damage = np.array([gs.player.damage for gs in states], dtype=np.int64)
+        self.arrows = np.array([gs.arrows for gs in states], dtype=np.int64)
+        self.traps = np.array([gs.traps for gs in states], dtype=np.int64)
+        self.defense_bonus = np.array([gs.defense_bonus for gs in states], dtype=np.float64)
+        self.has_bow = np.array([gs.has_bow for gs in states], dtype=bool)
+        self.has_watchtower = np.array([gs.has_watchtower for gs in states], dtype=bool)
+        self.in_tower = self.has_watchtower & in_tower
+        self.alive = np.array([gs.alive for gs in states], dtype=bool)
+        self.side = np.zeros(n, dtype=np.int64)  # everyone starts North
+        self.defending = np.zeros(n, dtype=bool)
+
+        self.max_alive = np.floor(p.max_alive + self.day * p.max_alive_per_day).astype(np.int64)
+        cap = int(self.max_alive.max()) if n else 1
+        # hp == 0 marks a free slot
+        self.enemy_hp = np.zeros((n, NSIDES, cap), dtype=np.int64)
+        self.enemy_dmg = np.zeros((n, NSIDES, cap), dtype=np.int64)
+        self.enemy_seq = np.zeros((n, NSIDES, cap), dtype=np.int64)
+        self._seq = 0
+
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.spawned = np.zeros(n, dtype=np.int64)
+        self.trap_kills = np.zeros(n, dtype=np.int64)
+        self.kills = np.zeros(n, dtype=np.int64)
+        self.breaches = np.zeros(n, dtype=np.int64)
+        self.arrows_spent = np.zeros(n, dtype=np.int64)
+        self.damage_taken = np.zeros(n, dtype=np.int64)
+
+    @classmethod
+    def replicate(cls, gs: GameState, n: int, seed: Optional[int] = None,
+                  in_tower: bool = False) -> "BatchNight":
+        """N copies of the same starting state (gs is only read).
+
+        Without a seed the batch is seeded from the game's own RNG seed and
+        day, so reruns of the same game reproduce.
+        """
+        if seed is None:
+            seed = (gs.rng.seed << 16) + gs.day_num
+        return cls([gs] * n, seed, in_tower)
+
+    def counts(self) -> np.ndarray:
+        """Live enemies per (game, side)."""
+        return (self.enemy_hp > 0).sum(axis=2)
+
+    # ---- Turn phases ----
+
+    def _spawn(self, act: np.ndarray):
+        rng, rows = self.rng, self.rows
+        current = (self.enemy_hp > 0).sum(axis=(1, 2))
+        chance, per_spawn, groups = _spawn_params(self.day, self.params)
+        max_batch = self.max_groups * self.max_per_spawn
+        spawning = act & (current < self.max_alive) & ~(rng.random(self.n) > chance)
+        remaining = self.max_alive - current
+
+        batch_side = np.zeros((self.n, max_batch), dtype=np.int64)
+        batch_slot = np.zeros((self.n, max_batch), dtype=np.int64)
+        batch_n = np.zeros(self.n, dtype=np.int64)
+        for g in range(self.max_groups):
+            go = spawning & (g < groups) & (remaining > 0)
+            if not go.any():
+                break
+            side = rng.integers(0, NSIDES, self.n)
+            count = np.where(go, np.minimum(per_spawn, remaining), 0)
+            remaining -= count
+            for j in range(self.max_per_spawn):
+                idx = rows[count > j]
+                if not len(idx):
+                    break
+                s = side[idx]
+                slot = np.argmax(self.enemy_hp[idx, s] <= 0, axis=1)  # first free slot
+                hp, dmg = _scaled_stats(self.day[idx], rng, self.params)
+                self.enemy_hp[idx, s, slot] = hp
+                self.enemy_dmg[idx, s, slot] = dmg
+                self.enemy_seq[idx, s, slot] = self._seq + np.arange(len(idx))
+                self._seq += len(idx)
+                k = batch_n[idx]
+                batch_side[idx, k] = s
+                batch_slot[idx, k] = slot
+                batch_n[idx] += 1
+        self.spawned += batch_n
+
+        # trap trigger per batch: kill a uniform sample of the new wave
+        trig = (batch_n > 0) & (self.traps > 0)
+        if trig.any():
+            lo, hi = self.params.trap_kills
+            k = np.minimum(rng.integers(lo, hi + 1, self.n), batch_n)
+            keys = rng.random((self.n, max_batch))
+            keys[np.arange(max_batch)[None, :] >= batch_n[:, None]] = 2.0
+            rank = keys.argsort(axis=1).argsort(axis=1)
+            victim = trig[:, None] & (rank < k[:, None])
+            gi, bi = np.nonzero(victim)
+            self.enemy_hp[gi, batch_side[gi, bi], batch_slot[gi, bi]] = 0
+            self.traps -= trig
+            self.trap_kills += victim.sum(axis=1)
+
+    def _resolve(self, choice: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Vector form of night._resolve_player_action. Returns consumed mask."""
+        rows = self.rows
+        self.defending[mask] = False
+        consumed = np.zeros(self.n, dtype=bool)
+
+        move = mask & (choice >= 1) & (choice <= 4)
+        target = choice - 1
+        pivot = move & self.in_tower  # free action
+        self.side[pivot] = target[pivot]
+        walk = move & ~self.in_tower & (self.side != target)
+        self.side[walk] = target[walk]
+        consumed |= walk
+
+        atk = mask & (choice == 5)
+        consumed |= atk
+        if atk.any():
+            hp = self.enemy_hp[rows, self.side]
+            occ = hp > 0
+            hit = atk & occ.any(axis=1)
+            key = np.where(occ, (hp << HP_SHIFT) | (self.enemy_dmg[rows, self.side] << SEQ_SHIFT)
+                           | self.enemy_seq[rows, self.side],
+                           np.iinfo(np.int64).max)
+            slot = key.argmin(axis=1)
+            ranged = hit & self.has_bow & (self.arrows > 0) & self.in_tower
+            self.arrows -= ranged
+            self.arrows_spent += ranged
+            dmg = self.damage + self.rng.integers(0, 3, self.n)
+            left = np.maximum(0, hp[rows, slot] - dmg)
+            self.enemy_hp[rows[hit], self.side[hit], slot[hit]] = left[hit]
+            self.kills += hit & (left == 0)
+
+        dfd = mask & (choice == 6) & ~(self.has_watchtower & self.in_tower)
+        self.defending[dfd] = True
+        consumed |= dfd
+
+        consumed |= mask & (choice == 7)
+
+        tower = mask & (choice == 8) & self.has_watchtower
+        self.in_tower[tower] = ~self.in_tower[tower]
+        consumed |= tower
+        return consumed
+
+    def _attack(self, act: np.ndarray):
+        """Vector form of night._enemies_attack."""
+        rng, rows = self.rng, self.rows
+        exposed = self.has_watchtower & self.in_tower
+        for si in range(NSIDES):
+            occ = self.enemy_hp[:, si] > 0
+            cnt = occ.sum(axis=1)
+            go = act & (cnt > 0)
+            if not go.any():
+                continue
+            k = rng.integers(0, np.maximum(cnt, 1))
+            pick = np.argmax(occ.cumsum(axis=1) > k[:, None], axis=1)
+            dmg = self.enemy_dmg[rows, si, pick]
+
+            up = self.fence_hp[:, si] > 0
+            bat = go & up
+            fdmg = np.where(self.defense_bonus > 0,
+                            np.floor(dmg * (1 - self.defense_bonus)).astype(np.int64), dmg)
+            self.fence_hp[bat, si] = np.maximum(0, self.fence_hp[bat, si] - fdmg[bat])
+
+            br = go & ~up
+            pdmg = np.where(self.defending & (self.side == si), np.maximum(0, dmg - 2), dmg)
+            pdmg = pdmg + exposed
+            before = self.hp.copy()
+            self.hp[br] = np.maximum(0, self.hp[br] - pdmg[br])
+            self.damage_taken += before - self.hp
+            self.breaches += br
+
+    def step(self, policy: BatchPolicy):
+        """Advance every live game by one turn."""
+        self.turn += 1
+        act = self.alive.copy()
+        self.turns += act
+        self._spawn(act)
+
+        pending = act.copy()
+        for _ in range(MAX_FREE_ACTIONS):
+            if not pending.any():
+                break
+            pending &= ~self._resolve(np.asarray(policy(self), dtype=np.int64), pending)
+
+        self._attack(act)
+        self.alive &= self.hp > 0
+
+    def run(self, policy: Optional[BatchPolicy] = None) -> BatchResult:
+        policy = policy or greedy_policy
+        while self.turn < TURNS and self.alive.any():
+            self.step(policy)
+        # dawn
+        self.hp[self.alive] = np.minimum(self.max_hp, self.hp + 2)[self.alive]
+        return BatchResult(
+            survived=self.alive.copy(), turns=self.turns, spawned=self.spawned,
+            trap_kills=self.trap_kills, kills=self.kills, breaches=self.breaches,
+            arrows_spent=self.arrows_spent, damage_taken=self.damage_taken,
+            fences=self.fence_hp.copy(), player_hp=self.hp.copy(),
+        )
+
+def greedy_policy(b: BatchNight) -> np.ndarray:
+    """Vector form of night.greedy_policy."""
+    counts = b.counts()
+    here = counts[b.rows, b.side] > 0
+    busiest = counts.argmax(axis=1)
+    empty = counts[b.rows, busiest] == 0
+    return np.where(here, 5, np.where(empty, 7, busiest + 1))
+
+def simulate_nights(gs: GameState, n: int, seed: Optional[int] = None,
+                    policy: Optional[BatchPolicy] = None, in_tower: bool = False) -> BatchResult:
+    """Run n nights from the same starting state."""
+    return BatchNight.replicate(gs, n, seed, in_tower).run(policy)
@@ -0,0 +1,279 @@
+# bench.py
+# Performance measurements.
+#
+#   python bench.py memory                  bytes per enemy
+#   python bench.py timing                  timing suite as JSON on stdout
+#   python bench.py timing --save           ...and store it as the baseline
+#   python bench.py timing --check          compare with the baseline; exit 1 on regression
+#
+# Timings are the best of several repeats of a fixed, seeded workload, in
+# microseconds per call. A calibration loop (plain interpreter work that no
+# game change touches) is timed around every benchmark, and --check compares
+# each benchmark as a multiple of its own calibration, so a baseline saved on
+# one machine, or on a busy one, still gates a run on another. Re-save after
+# changing a benchmarked path.
+from __future__ import annotations
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from entities import (Enemy, ENEMY_NAMES, EnemyPool, EnemyQueue, ENEMY_POOL, GameState, SIDES,
+                      scaled_enemy)
+from journal import SaveJournal
+import night
+from rng import GameRNG
+import world
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SEED = 1234
+
+@dataclass
+class _DictEnemy:
+    # The pre-__slots__ Enemy, kept only as the "before" baseline
+    side: str
+    hp: int
+    dmg: int
+    name: str = field(default_factory=lambda: random.choice(
+        ["Wisp", "Crawler", "Gnashling", "Hollow", "Stalker", "Skitter"]))
+
+    def alive(self) -> bool:
+        return self.hp > 0
+
+def _bytes_per_object(make, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objs = [make(i) for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(st.size_diff for st in after.compare_to(before, "filename"))
+    # don't charge the holding list to the enemies
+    list_bytes = objs.__sizeof__()
+    del objs
+    return (grown - list_bytes) / n
+
+def bench_enemy_memory(n: int = 100_000) -> dict:
+    """Bytes per live enemy: old dict-backed dataclass vs slotted Enemy."""
+    random.seed(0)
+    old = _bytes_per_object(lambda i: _DictEnemy(SIDES[i % 4], 5 + i % 7, 2, ENEMY_NAMES[i % 6]), n)
+    new = _bytes_per_object(lambda i: Enemy(SIDES[i % 4], 5 + i % 7, 2, ENEMY_NAMES[i % 6]), n)
+
+    # Steady state with the pool: a churn of spawn/kill reuses the same objects
+    pool = EnemyPool(max_free=n)
+    live = [pool.acquire(SIDES[i % 4], 5, 2, 0) for i in range(n)]
+    for e in live:
+        pool.release(e)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    live = [pool.acquire(SIDES[i % 4], 5 + i % 7, 2, i % 6) for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(st.size_diff for st in after.compare_to(before, "filename"))
+    pooled = (grown - live.__sizeof__()) / n
+    return {"enemies": n, "dataclass_bytes": old, "slots_bytes": new,
+            "pooled_new_bytes": pooled}
+
+# ---- Timing suite ----
+
+def _time(run: Callable[[], None], number: int, repeat: int,
+          setup: Optional[Callable[[], None]] = None) -> float:
+    """Best-of-`repeat` microseconds per call of run(), `number` calls per repeat,
+    after one untimed repeat to warm pools and caches."""
+    best = float("inf")
+    gc_was_on = gc.isenabled()
+    for rep in range(repeat + 1):
+        if setup:
+            setup()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            for _ in range(number):
+                run()
+            dt = time.perf_counter() - t0
+        finally:
+            if gc_was_on:
+                gc.enable()
+        if rep:
+            best = min(best, dt)
+    return best / number * 1e6
+
+def _calibration_loop():
+    d: Dict[int, int] = {}
+    for i in range(200):
+        d[i & 31] = d.get(i & 31, 0) + i * 3 // 7
+    sorted(d.values())
+
+def bench_calibration(repeat: int = 10) -> float:
+    """The unit --check measures in: microseconds per calibration loop."""
+    return _time(_calibration_loop, 200, max(50, 5 * repeat))  # many short repeats: best-of is stable
+
+def _durable_state(day: int) -> GameState:
+    """A game that lives through a whole night, so every turn gets timed."""
+    gs = GameState(rng=GameRNG(SEED))
+    gs.day_num = day
+    gs.player.update_stats(day)
+    gs.player.max_hp = gs.player.hp = 10 ** 9
+    for f in gs.fences.values():
+        f.max_hp = f.hp = 10 ** 9
+    return gs
+
+def _full_queues(n: int) -> Tuple[GameState, night.Queues]:
+    gs = _durable_state(10)
+    queues = {s: EnemyQueue() for s in SIDES}
+    stream = gs.rng.spawn
+    for i in range(n):
+        side = SIDES[i % len(SIDES)]
+        queues[side].push(scaled_enemy(10, side, stream))
+    return gs, queues
+
+def bench_scaled_enemy(repeat: int) -> float:
+    stream = GameRNG(SEED).spawn
+    release = ENEMY_POOL.release
+    return _time(lambda: release(scaled_enemy(10, "North", stream)), 20_000, repeat)
+
+def bench_spawn_pattern(repeat: int) -> float:
+    stream = GameRNG(SEED).spawn
+    return _time(lambda: night._spawn_pattern(10, 3, 15, stream), 20_000, repeat)
+
+def bench_enemies_attack(n: int, repeat: int) -> float:
+    gs, queues = _full_queues(n)
+    return _time(lambda: night._enemies_attack(gs, queues), 5_000, repeat)
+
+def bench_night(day: int, repeat: int) -> float:
+    start = _durable_state(day)
+    states: List[GameState] = []
+    number = 20
+
+    def setup():
+        states[:] = [copy.deepcopy(start) for _ in range(number)]
+
+    def run():
+        gs = states.pop()
+        if night.simulate_night(gs).turns != night.TURNS:
+            raise RuntimeError("benchmark night ended early")
+
+    return _time(run, number, repeat, setup)
+
+def bench_render(repeat: int) -> float:
+    pos = world.CABIN_POS
+    return _time(lambda: world.render(pos), 5_000, repeat)
+
+def bench_save_load(repeat: int) -> float:
+    """Save to a fresh journal and load it back through a second one (as on restart)."""
+    tmp = tempfile.mkdtemp(prefix="cabin-bench-")
+    try:
+        gs = GameState(rng=GameRNG(SEED))
+        base = os.path.join(tmp, "save")
+        counter = [0]
+
+        def run():
+            counter[0] += 1
+            gs.player.wood = counter[0]
+            SaveJournal(base).save(gs)
+            if SaveJournal(base).load().player.wood != counter[0]:
+                raise RuntimeError("save did not round-trip")
+
+        return _time(run, 50, repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _suite(repeat: int) -> List[Tuple[str, Callable[[], float]]]:
+    out = [("scaled_enemy", lambda: bench_scaled_enemy(repeat)),
+           ("spawn_pattern", lambda: bench_spawn_pattern(repeat))]
+    for n in (10, 100, 1000):
+        out.append((f"enemies_attack[{n}]", lambda n=n: bench_enemies_attack(n, repeat)))
+    for day in (1, 10, 50, 200):
+        out.append((f"night[day={day}]", lambda day=day: bench_night(day, repeat)))
+    out.append(("world_render", lambda: bench_render(repeat)))
+    out.append(("save_load", lambda: bench_save_load(repeat)))
+    return out
+
+def run_timing(repeat: int = 10) -> Dict[str, float]:
+    """Every timing benchmark, name -> microseconds per call."""
+    return {name: bench() for name, bench in _suite(repeat)}
+
+def run_calibrated(repeat: int = 10) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """run_timing(), plus for each benchmark the calibration loop timed on
+    either side of it (the faster of the two), name -> microseconds."""
+    results, cal = {}, {}
+    before = bench_calibration(repeat)
+    for name, bench in _suite(repeat):
+        results[name] = bench()
+        after = bench_calibration(repeat)
+        cal[name], before = min(before, after), after
+    return results, cal
+
+def _report(results: Dict[str, float], calibration: Dict[str, float]) -> dict:
+    return {
+        "unit": "us/call",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {k: round(v, 3) for k, v in results.items()},
+        "calibration": {k: round(v, 3) for k, v in calibration.items()},
+    }
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float,
+            calibration: Dict[str, float], base_calibration: Dict[str, float]
+            ) -> List[Tuple[str, float, float]]:
+    """Benchmarks whose time in calibration loops exceeds the baseline's by
+    more than `tolerance`: (name, baseline ratio, current ratio)."""
+    out = []
+    for name, now in results.items():
+        if name in baseline and name in base_calibration:
+            was, ratio = baseline[name] / base_calibration[name], now / calibration[name]
+            if ratio > was * (1 + tolerance):
+                out.append((name, was, ratio))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Cabin performance benchmarks.")
+    ap.add_argument("suite", choices=["memory", "timing"])
+    ap.add_argument("-n", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--save", action="store_true", help="store this run as the baseline")
+    ap.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed slowdown before --check fails (0.25 = 25%%)")
+    args = ap.parse_args()
+    if args.suite == "timing":
+        report = _report(*run_calibrated(args.repeat))
+        print(json.dumps(report, indent=2))
+        if args.save:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+        if args.check:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            if not isinstance(baseline.get("calibration"), dict):
+                sys.exit(f"{args.baseline} has no calibration; re-save it with --save")
+            slow = compare(report["results"], baseline["results"], args.tolerance,
+                           report["calibration"], baseline["calibration"])
+            for name, was, now in slow:
+                print(f"REGRESSION {name}: {was:.2f} -> {now:.2f} x calibration "
+                      f"(+{(now / was - 1) * 100:.0f}%)", file=sys.stderr)
+            if slow:
+                sys.exit(1)
+        return
+    if args.suite == "memory":
+        r = bench_enemy_memory(args.n)
+        print(f"{r['enemies']} live enemies")
+        print(f"  dataclass + __dict__ : {r['dataclass_bytes']:7.1f} bytes/enemy")
+        print(f"  __slots__ + name id  : {r['slots_bytes']:7.1f} bytes/enemy")
+        print(f"  pooled (reused)      : {r['pooled_new_bytes']:7.1f} new bytes/enemy")
+
+if __name__ == "__main__":
+    main()
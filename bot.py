@@ -0,0 +1,227 @@
+# bot.py
+# Search-based night play.
+#
+# SearchBot is a night.Policy that picks each action by Monte Carlo tree
+# search. From the live position it plays many sampled futures on copies of
+# the night, each with fresh random streams of its own (it never sees the
+# game's rolls), steers toward the actions that have done best so far (UCB1) and
+# finishes every playout with the greedy policy.
+#
+# Positions are shared through a transposition table keyed on the turn and
+# a hash of solver.night_state, so different move orders that reach the
+# same position pool their statistics. The table outlives a move: whatever
+# was learned about the position the night actually reaches is the head
+# start for the next search. Entries for turns already played are dropped.
+# Playouts run on one scratch GameState, reset from a packed snapshot of the
+# position (packed.restore) before each one.
+#
+#   bot = SearchBot(budget=0.2)                   # seconds per move
+#   bot.play(gs)                                  # a whole night
+#   simulate_night(gs, bot, on_turn=bot.on_turn)  # the same, by hand
+#   bot.hint(gs, queues, turn)                    # "Hint: Attack (5)."
+from __future__ import annotations
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from entities import EnemyStacks, GameState, SIDES
+import events
+import metrics
+from metrics import Metrics
+import night
+from night import MAX_FREE_ACTIONS, TURNS, Night, NightResult, Out, Queues
+from packed import Snapshot, restore, snapshot
+from solver import Action, actions, night_state
+
+FENCE_WEIGHT = 0.1  # share of a survival's reward that depends on fence HP left
+DEATH_WEIGHT = 0.5  # a death scores this much times the share of the night survived
+
+Key = Tuple[int, int]  # (turn, hash of the NightState)
+
+class _Node:
+    __slots__ = ("actions", "visits", "n", "w")
+
+    def __init__(self, acts: List[Action]):
+        self.actions = acts
+        self.visits = 0
+        self.n = [0] * len(acts)   # playouts through each action
+        self.w = [0.0] * len(acts)  # their total reward
+
+    def select(self, c: float) -> int:
+        for i, k in enumerate(self.n):
+            if k == 0:
+                return i
+        log = math.log(self.visits)
+        n, w = self.n, self.w
+        return max(range(len(n)), key=lambda i: w[i] / n[i] + c * math.sqrt(log / n[i]))
+
+    def best(self) -> int:
+        return max(range(len(self.n)), key=lambda i: (self.n[i], self.w[i]))
+
+class SearchBot:
+    """Monte Carlo tree search over the night menu.
+
+    Each move searches for `budget` seconds (and/or `max_iterations`
+    playouts, for reproducible runs together with `seed`). The turn number
+    comes from on_turn(), which simulate_night calls before each turn.
+    """
+
+    def __init__(self, budget: Optional[float] = 0.2, max_iterations: Optional[int] = None,
+                 exploration: float = 0.7, rollout: night.Policy = night.greedy_policy,
+                 max_nodes: int = 200_000, seed: Optional[int] = None):
+        if budget is None and max_iterations is None:
+            raise ValueError("need a time budget or an iteration limit")
+        self.budget = budget
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.rollout = rollout
+        self.max_nodes = max_nodes
+        self.table: Dict[Key, _Node] = {}
+        self.turn = 0
+        self.iterations = 0  # playouts in the last search
+        self._rng = random.Random(seed)
+        self._scratch = GameState()
+        self._night: Optional[Tuple[int, int]] = None  # (id(gs), day) the table is for
+        self._turn_seen = 0
+        self._pending: List[str] = []  # rest of a multi-choice action
+        self._pending_turn = 0
+
+    # --- night.Policy ---
+
+    def on_turn(self, gs: GameState, queues: Queues, turn: int):
+        self.turn = turn
+
+    def __call__(self, gs: GameState, queues: Queues) -> str:
+        if self._pending and self._pending_turn == self.turn:
+            return self._pending.pop(0)
+        action = self.choose(gs, queues, self.turn)
+        self._pending, self._pending_turn = list(action[1:]), self.turn
+        return action[0]
+
+    def play(self, gs: GameState, in_tower: bool = False, out: Out = None,
+             m: Optional[Metrics] = None) -> NightResult:
+        return night.simulate_night(gs, self, out, in_tower, on_turn=self.on_turn, m=m)
+
+    def hint(self, gs: GameState, queues: Queues, turn: int) -> str:
+        return f"Hint: {describe(self.choose(gs, queues, turn), gs)}."
+
+    # --- search ---
+
+    def choose(self, gs: GameState, queues: Queues, turn: int) -> Action:
+        """The most explored action from this position (turn `turn` under way)."""
+        self._forget(gs, turn)
+        st = night_state(gs, queues, turn)
+        key = (turn, hash(st))
+        root = self.table.get(key)
+        if root is None:
+            root = self.table[key] = _Node(actions(st, gs.has_watchtower))
+        if len(root.actions) == 1:
+            self.iterations = 0
+            return root.actions[0]
+        deadline = None if self.budget is None else time.perf_counter() + self.budget
+        horde = isinstance(queues[SIDES[0]], EnemyStacks)
+        snap = snapshot(gs)
+        self._scratch.params = gs.params
+        done = 0
+        while True:
+            self._iterate(self._branch(snap, queues, turn, horde), root)
+            done += 1
+            if done < len(root.actions):
+                continue  # try everything once
+            if self.max_iterations is not None and done >= self.max_iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.iterations = done
+        return root.actions[root.best()]
+
+    def _forget(self, gs: GameState, turn: int):
+        ident = (id(gs), gs.day_num)
+        if ident != self._night or turn < self._turn_seen:
+            self.table.clear()
+            self._night = ident
+        else:
+            self.table = {k: v for k, v in self.table.items() if k[0] >= turn}
+            if len(self.table) > self.max_nodes:
+                self.table.clear()
+        self._turn_seen = turn
+
+    def _branch(self, snap: Snapshot, queues: Queues, turn: int, horde: bool) -> Night:
+        sim = self._scratch
+        n = Night(sim, horde=horde, m=metrics.NULL, bus=events.NULL)
+        restore(sim, snap)
+        sim.rng.spawn.seek(self._rng.getrandbits(64), 0)
+        sim.rng.combat.seek(self._rng.getrandbits(64), 0)
+        n.enemy_queues = {s: q.copy() for s, q in queues.items()}
+        n.turn = turn
+        return n
+
+    def _iterate(self, sim: Night, root: _Node):
+        path: List[Tuple[_Node, int]] = []
+        node = root
+        while True:
+            i = node.select(self.exploration)
+            path.append((node, i))
+            if not _advance(sim, node.actions[i]):
+                break
+            st = night_state(sim.gs, sim.enemy_queues, sim.turn)
+            key = (sim.turn, hash(st))
+            child = self.table.get(key)
+            if child is None:
+                if len(self.table) < self.max_nodes:
+                    self.table[key] = _Node(actions(st, sim.gs.has_watchtower))
+                self._playout(sim)
+                break
+            node = child
+        r = _reward(sim)
+        for node, i in path:
+            node.visits += 1
+            node.n[i] += 1
+            node.w[i] += r
+
+    def _playout(self, sim: Night):
+        gs = sim.gs
+        while True:
+            for _ in range(MAX_FREE_ACTIONS):
+                if sim.act(self.rollout(gs, sim.enemy_queues)):
+                    break
+            if not _advance(sim, ()):
+                return
+
+def _advance(sim: Night, action: Action) -> bool:
+    """Play `action`, let the enemies strike and start the next turn. False once the night is over."""
+    for choice in action:
+        sim.act(choice)
+    gs = sim.gs
+    if gs.player.hp <= 0:
+        gs.alive = False
+        return False
+    sim.end_turn()
+    if sim.over:
+        return False
+    sim.begin_turn()
+    return True
+
+def _reward(sim: Night) -> float:
+    gs = sim.gs
+    if not gs.alive:
+        return DEATH_WEIGHT * sim.turn / TURNS
+    hp = sum(f.hp for f in gs.fences.values())
+    full = sum(f.max_hp for f in gs.fences.values())
+    return 1.0 - FENCE_WEIGHT + FENCE_WEIGHT * hp / full
+
+def describe(action: Action, gs: GameState) -> str:
+    """Menu wording for an action, e.g. "Cover East (2), then Attack (5)"."""
+    in_tower = gs.in_tower
+    parts = []
+    for c in action:
+        if c in ("1", "2", "3", "4"):
+            label = f"{'Cover' if in_tower else 'Move'} {SIDES[int(c) - 1]}"
+        elif c == "8":
+            label = "Climb down" if in_tower else "Climb tower"
+            in_tower = not in_tower
+        else:
+            label = {"5": "Attack", "6": "Defend", "7": "Wait"}[c]
+        parts.append(f"{label} ({c})")
+    return ", then ".join(parts)
@@ -0,0 +1,171 @@
+# campaign.py
+# Headless full campaigns (day -> night -> morning upkeep) sharded across a
+# process pool. Each run owns a GameRNG seeded from (base_seed, run index), so
+# results are bit-identical however the runs are split between workers.
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from archive import Archive, Run, RunLog
+from difficulty import DEFAULT, Difficulty
+from entities import GameState, SIDES
+from rng import GameRNG
+import main
+import night
+from stats import SweepStats
+
+class RunResult(NamedTuple):
+    index: int
+    seed: int
+    day: int          # day reached, as in "You survived until Day N"
+    cause: str        # "overrun", "starved" or "survived" (hit max_days)
+    wood: int
+    food: int
+    seeds: int
+    arrows: int
+    traps: int
+    upgrades: Tuple[str, ...]
+    run: Optional[Run] = None  # per-day record, for the archive (keep_runs)
+
+def derive_seed(base_seed: int, index: int) -> int:
+    """Independent 64-bit seed for run `index` of a campaign batch."""
+    h = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+def play_campaign(index: int, seed: int, max_days: int = 100,
+                  day_policy: main.DayPolicy = main.steady_day_policy,
+                  night_policy: night.Policy = night.greedy_policy,
+                  params: Optional[Difficulty] = None, keep_run: bool = False,
+                  stats: Optional[SweepStats] = None) -> RunResult:
+    gs = GameState(rng=GameRNG(seed), params=params or DEFAULT)
+    gs.reinforce_cost = gs.params.reinforce_cost
+    log = RunLog(seed) if keep_run else None
+    cause = "survived"
+    while gs.day_num <= max_days:
+        main.play_day(gs, day_policy)
+        if log is not None:
+            log.dusk(gs)
+        if stats is not None:
+            stats.dusk(gs.player.wood, gs.player.food)
+        starving = gs.player.hp <= 0
+        res = night.simulate_night(gs, night_policy)
+        if stats is not None:
+            stats.night(sum(gs.fence(s).hp for s in SIDES), res.breaches)
+        if not gs.alive:
+            cause = "starved" if starving else "overrun"
+            break
+        gs.day_num += 1
+        main.morning_upkeep(gs, out=None)
+
+    p = gs.player
+    if stats is not None:
+        stats.end(gs.day_num, cause)
+    return RunResult(index, seed, gs.day_num, cause, p.wood, p.food, p.seeds,
+                     gs.arrows, gs.traps, tuple(sorted(gs.upgrades)),
+                     log.finish(gs) if log is not None else None)
+
+def _play_shard(args, stats: Optional[SweepStats]) -> List[RunResult]:
+    start, stop, base_seed, max_days, day_policy, night_policy, params, *keep = args
+    return [play_campaign(i, derive_seed(base_seed, i), max_days, day_policy, night_policy, params,
+                          bool(keep and keep[0]), stats)
+            for i in range(start, stop)]
+
+def _run_shard(args) -> List[RunResult]:
+    return _play_shard(args, None)
+
+def _run_stats_shard(args) -> Tuple[List[RunResult], SweepStats]:
+    stats = SweepStats()
+    return _play_shard(args, stats), stats
+
+def _stats_shard(args) -> SweepStats:
+    start, stop, base_seed, max_days, day_policy, night_policy, params = args
+    stats = SweepStats()
+    for i in range(start, stop):
+        play_campaign(i, derive_seed(base_seed, i), max_days, day_policy, night_policy, params, stats=stats)
+    return stats
+
+def aggregate_campaigns(runs: int, base_seed: int = 0, workers: Optional[int] = None,
+                        max_days: int = 100, shard_size: int = 256,
+                        day_policy: main.DayPolicy = main.steady_day_policy,
+                        night_policy: night.Policy = night.greedy_policy,
+                        params: Optional[Difficulty] = None) -> SweepStats:
+    """Play `runs` campaigns and return only their SweepStats, merged from
+    per-shard stats as shards finish: memory does not grow with `runs`.
+    The result is the same however the runs are sharded."""
+    shards = ((start, min(start + shard_size, runs), base_seed, max_days, day_policy, night_policy, params)
+              for start in range(0, runs, shard_size))
+    total = SweepStats()
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for shard in shards:
+            total.merge(_stats_shard(shard))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # a bounded window of shards in flight, rather than pool.map's whole list
+        pending = set()
+        for shard in shards:
+            pending.add(pool.submit(_stats_shard, shard))
+            if len(pending) >= 4 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    total.merge(f.result())
+        for f in pending:
+            total.merge(f.result())
+    return total
+
+def run_campaigns(runs: int, base_seed: int = 0, workers: Optional[int] = None,
+                  max_days: int = 100, shard_size: int = 64,
+                  day_policy: main.DayPolicy = main.steady_day_policy,
+                  night_policy: night.Policy = night.greedy_policy,
+                  params: Optional[Difficulty] = None, keep_runs: bool = False,
+                  stats: Optional[SweepStats] = None) -> Iterator[RunResult]:
+    """Yield one RunResult per run, in run order, as shards finish.
+
+    Policies must be module-level callables so they can be pickled. With
+    keep_runs, each result carries its archive.Run. With `stats`, each
+    shard's SweepStats is merged into it before its results are yielded.
+    """
+    shards = [(start, min(start + shard_size, runs), base_seed, max_days, day_policy, night_policy, params,
+               keep_runs)
+              for start in range(0, runs, shard_size)]
+    play = _run_shard if stats is None else _run_stats_shard
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        yield from _collect(map(play, shards), stats)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _collect(pool.map(play, shards), stats)
+
+def _collect(outs: Iterable, stats: Optional[SweepStats]) -> Iterator[RunResult]:
+    for out in outs:
+        if stats is not None:
+            out, shard_stats = out
+            stats.merge(shard_stats)
+        yield from out
+
+def main_cli():
+    ap = argparse.ArgumentParser(description="Run headless campaigns in parallel.")
+    ap.add_argument("runs", type=int)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-days", type=int, default=100)
+    ap.add_argument("--archive", metavar="DIR", help="append every run to the archive in DIR")
+    args = ap.parse_args()
+
+    if not args.archive:
+        stats = aggregate_campaigns(args.runs, args.seed, args.workers, args.max_days)
+    else:
+        stats = SweepStats()
+        with Archive(args.archive) as arch:
+            for r in run_campaigns(args.runs, args.seed, args.workers, args.max_days, keep_runs=True,
+                                   stats=stats):
+                arch.append(r.run)
+    day = stats["day"]
+    print(f"{day.count} runs | mean day {day.mean:.2f} | max day {day.hi}")
+    print(stats.report())
+
+if __name__ == "__main__":
+    main_cli()
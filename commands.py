@@ -0,0 +1,103 @@
+# commands.py
+# Where the game's decisions come from.
+#
+# Every decision point (day menu, craft item, night action, watchtower
+# question) calls read(); the "[Enter]" pauses call pause(). Stdin asks the
+# player; a script feeds recorded commands and skips the pauses, so a
+# recorded game replays at full speed.
+#
+# Recording format: a "#cabin-replay seed=<n>" header, then one command per line.
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, TextIO
+
+import screen
+from screen import Screen
+
+HEADER = "#cabin-replay"
+
+class CommandSource(ABC):
+    scripted = False
+
+    @abstractmethod
+    def read(self, prompt: str = "") -> str:
+        ...
+
+    def pause(self, prompt: str = ""):
+        self.read(prompt)
+
+class StdinSource(CommandSource):
+    """The player at the terminal. Flushes `scr` so they see everything before the prompt."""
+
+    def __init__(self, scr: Optional[Screen] = None):
+        self.scr = scr
+
+    def read(self, prompt: str = "") -> str:
+        if self.scr:
+            self.scr.flush()
+        return input(prompt)
+
+class ScriptSource(CommandSource):
+    """Commands from an iterator; pauses are skipped. Raises EOFError when it runs dry."""
+    scripted = True
+
+    def __init__(self, commands: Iterable[str], seed: Optional[int] = None):
+        self._it = iter(commands)
+        self.seed = seed
+
+    def read(self, prompt: str = "") -> str:
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise EOFError("command script exhausted") from None
+
+    def pause(self, prompt: str = ""):
+        pass
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScriptSource":
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        seed = None
+        if lines and lines[0].startswith(HEADER):
+            for field in lines.pop(0).split()[1:]:
+                key, _, val = field.partition("=")
+                if key == "seed":
+                    seed = int(val)
+        if lines and lines[-1] == "":
+            lines.pop()  # trailing newline
+        return cls(lines, seed)
+
+class Recorder(CommandSource):
+    """Passes reads through to `inner` and logs them, with the RNG seed, to `path`."""
+
+    def __init__(self, inner: CommandSource, path: str, seed: int):
+        self.inner = inner
+        self.seed = seed
+        self._f: TextIO = open(path, "w", encoding="utf-8")
+        self._f.write(f"{HEADER} seed={seed}\n")
+        self._f.flush()
+
+    @property
+    def scripted(self) -> bool:
+        return self.inner.scripted
+
+    def read(self, prompt: str = "") -> str:
+        cmd = self.inner.read(prompt)
+        self._f.write(cmd.replace("\n", " ") + "\n")
+        self._f.flush()
+        return cmd
+
+    def pause(self, prompt: str = ""):
+        self.inner.pause(prompt)
+
+    def close(self):
+        self._f.close()
+
+_default: Optional[CommandSource] = None
+
+def default() -> CommandSource:
+    global _default
+    if _default is None:
+        _default = StdinSource(screen.default())
+    return _default
@@ -0,0 +1,100 @@
+# difficulty.py
+# The balance constants, in one place.
+#
+# Every GameState carries a Difficulty (gs.params); the night engine, enemy
+# scaling, player growth and the craft menu read their curves from it, and
+# so do the solver and the vectorized simulator. The defaults are the game
+# as shipped. Instances are frozen (derive variants with
+# dataclasses.replace(), as sweep.py does), costs included: it is held as a
+# read-only mapping, so a Difficulty hashes and can key caches. They are not
+# part of saves.
+from __future__ import annotations
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+DEFAULT_COSTS = {"Spear": 5, "Axe": 6, "Hoe": 4, "Bow": 8, "Watchtower": 25,
+                 "Trap": 5, "Arrow Batch": 2}
+
+@dataclass(frozen=True)
+class Difficulty:
+    # night waves (night._spawn_pattern)
+    spawn_chance: float = 0.35            # chance a turn brings a wave, at day 0
+    spawn_chance_per_day: float = 0.05
+    spawn_chance_days: int = 10           # the chance stops growing after this day
+    spawn_chance_max: float = 0.85
+    group_size_days: Tuple[int, ...] = (3, 6)  # enemies per group: 1, +1 from each of these days
+    groups_days: Tuple[int, ...] = (3, 7)      # groups per wave: likewise
+    max_alive: float = 3.0                # enemies on the field before waves stop
+    max_alive_per_day: float = 1.2
+    # enemies (entities.scaled_enemy)
+    enemy_hp: int = 5
+    enemy_hp_per_day: float = 1.2
+    enemy_hp_roll: Tuple[int, int] = (-1, 2)      # uniform, inclusive
+    enemy_dmg: int = 2
+    enemy_dmg_per_day: float = 0.5
+    enemy_dmg_roll: Tuple[int, ...] = (0, 0, 1)   # one picked at random
+    # player (Player.update_stats)
+    player_hp_per_day: float = 1.2
+    player_damage_every: int = 4          # days per +1 damage
+    morning_heal: int = 2
+    # traps: each one kills this many of a new wave (uniform, inclusive)
+    trap_kills: Tuple[int, int] = (2, 4)
+    # crafting (main.do_craft), in wood
+    costs: Mapping[str, int] = field(default_factory=lambda: DEFAULT_COSTS, hash=False)
+    reinforce_cost: int = 10              # first fence reinforcement
+    reinforce_step: int = 5               # added after each one
+
+    def __post_init__(self):
+        # a private copy, read-only
+        object.__setattr__(self, "costs", MappingProxyType(dict(self.costs)))
+
+    def __hash__(self) -> int:
+        h = self.__dict__.get("_hash")
+        if h is None:
+            h = hash((*(getattr(self, f.name) for f in dataclasses.fields(self) if f.hash is not False),
+                      tuple(sorted(self.costs.items()))))
+            object.__setattr__(self, "_hash", h)
+        return h
+
+    def __reduce__(self):
+        # a mappingproxy neither pickles nor deep-copies
+        return (from_dict, (as_dict(self),))
+
+    def wave(self, day: int) -> Tuple[float, int, int]:
+        """(spawn chance, enemies per group, groups per wave) on `day`."""
+        chance = min(self.spawn_chance + min(day, self.spawn_chance_days) * self.spawn_chance_per_day,
+                     self.spawn_chance_max)
+        return (chance, 1 + sum(day >= d for d in self.group_size_days),
+                1 + sum(day >= d for d in self.groups_days))
+
+    def alive_cap(self, day: int) -> int:
+        return int(self.max_alive + day * self.max_alive_per_day)
+
+    def enemy_base(self, day: int) -> Tuple[int, int]:
+        """(hp, dmg) of an enemy on `day` before its rolls."""
+        return (self.enemy_hp + int(day * self.enemy_hp_per_day),
+                self.enemy_dmg + int(day * self.enemy_dmg_per_day))
+
+def as_dict(p: Difficulty) -> dict:
+    out = {f.name: getattr(p, f.name) for f in dataclasses.fields(p)}
+    out["costs"] = dict(p.costs)
+    return out
+
+def from_dict(d: dict) -> Difficulty:
+    """Inverse of as_dict (JSON lists back to tuples); unknown keys are an error."""
+    names = {f.name for f in dataclasses.fields(Difficulty)}
+    extra = set(d) - names
+    if extra:
+        raise KeyError(f"unknown difficulty fields: {sorted(extra)}")
+    return Difficulty(**{k: tuple(v) if isinstance(v, list) else v for k, v in d.items()})
+
+def param_hash(p: Difficulty) -> str:
+    """Short stable hex digest of every field."""
+    text = json.dumps(as_dict(p), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+DEFAULT = Difficulty()
@@ -1,8 +1,13 @@
 # entities.py
 from __future__ import annotations
 from dataclasses import dataclass, field
+import heapq
+import itertools
 import random
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from difficulty import DEFAULT, Difficulty
+from rng import GameRNG
 
 SIDES = ("North", "East", "South", "West")
 
@@ -23,12 +28,12 @@ class Player:
     hp: int = 20
     damage: int = 4
 
-    def update_stats(self, day_num: int):
+    def update_stats(self, day_num: int, params: Difficulty = DEFAULT):
         # Gentle, diminishing scaling
-        self.max_hp = self.base_hp + int(day_num * 1.2)  # slower HP gain
-        self.damage = self.base_damage + (day_num // 4)  # +1 dmg per 4 days
+        self.max_hp = self.base_hp + int(day_num * params.player_hp_per_day)  # slower HP gain
+        self.damage = self.base_damage + (day_num // params.player_damage_every)  # +1 dmg per 4 days
         # Only small passive heal each morning
-        self.hp = min(self.hp + 2, self.max_hp)
+        self.hp = min(self.hp + params.morning_heal, self.max_hp)
 
     def heal(self, amount: int) -> int:
         before = self.hp
@@ -55,23 +60,266 @@ class Fence:
         self.hp += amt
         return amt
 
-@dataclass
+# Interned enemy names; an Enemy stores only the index. Spawns draw from
+# the fixed BASE_NAMES (ids 0..5), so interning another name never changes
+# what a seed spawns.
+BASE_NAMES = ("Wisp", "Crawler", "Gnashling", "Hollow", "Stalker", "Skitter")
+ENEMY_NAMES = list(BASE_NAMES)
+_NAME_IDS = {n: i for i, n in enumerate(ENEMY_NAMES)}
+
+def intern_name(name: str) -> int:
+    i = _NAME_IDS.get(name)
+    if i is None:
+        i = _NAME_IDS[name] = len(ENEMY_NAMES)
+        ENEMY_NAMES.append(name)
+    return i
+
 class Enemy:
-    side: str
-    hp: int
-    dmg: int
-    name: str = field(default_factory=lambda: random.choice(
-        ["Wisp", "Crawler", "Gnashling", "Hollow", "Stalker", "Skitter"]))
+    __slots__ = ("side", "hp", "dmg", "name_id")
+    count = 1  # a lone enemy is a stack of one
+
+    def __init__(self, side: str, hp: int, dmg: int, name: str):
+        # no random default: a name drawn outside the game's streams would
+        # make the run unreproducible (scaled_enemy draws from its rng)
+        self.side = side
+        self.hp = hp
+        self.dmg = dmg
+        self.name_id = intern_name(name)
+
+    @property
+    def name(self) -> str:
+        return ENEMY_NAMES[self.name_id]
 
     def alive(self) -> bool:
         return self.hp > 0
 
-def scaled_enemy(day_num: int, side: str) -> Enemy:
-    base_hp = 5 + int(day_num * 1.2)
-    base_dmg = 2 + int(day_num * 0.5)
-    hp = base_hp + random.randint(-1, 2)
-    dmg = base_dmg + random.choice([0, 0, 1])
-    return Enemy(side=side, hp=max(1, hp), dmg=dmg)
+    def __repr__(self) -> str:
+        return f"Enemy(side={self.side!r}, hp={self.hp}, dmg={self.dmg}, name={self.name!r})"
+
+class EnemyPool:
+    """Free list of dead Enemy objects for scaled_enemy to reuse.
+
+    Only release an enemy once nothing (queue, wave list) still refers to it.
+    """
+    __slots__ = ("_free", "max_free")
+
+    def __init__(self, max_free: int = 4096):
+        self._free: List[Enemy] = []
+        self.max_free = max_free
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, side: str, hp: int, dmg: int, name_id: int) -> Enemy:
+        if self._free:
+            e = self._free.pop()
+        else:
+            e = Enemy.__new__(Enemy)
+        e.side = side
+        e.hp = hp
+        e.dmg = dmg
+        e.name_id = name_id
+        return e
+
+    def release(self, e: Enemy):
+        if len(self._free) < self.max_free:
+            self._free.append(e)
+
+ENEMY_POOL = EnemyPool()
+
+def _rank(e) -> Tuple[int, int, int]:
+    """Value order of enemies (or stacks): lowest hp, then dmg, then name.
+    Targets and attackers are picked in this order on both kinds of side,
+    so a night plays the same with EnemyQueue or EnemyStacks: enemies that
+    tie on it are identical and it doesn't matter which one is taken."""
+    return e.hp, e.dmg, e.name_id
+
+class EnemyQueue:
+    """The enemies massed on one side.
+
+    A heap keyed on (hp, dmg, name, spawn order) finds the lowest-HP target,
+    and a dense list holds the live enemies. Removal swaps the enemy out of
+    the list and marks its heap entry dead; dead entries are dropped when
+    they surface. The Enemy object itself is the handle.
+    """
+    __slots__ = ("_heap", "_items", "_entry", "_seq")
+    owns_enemies = True  # pushed Enemy objects live in the queue
+
+    def __init__(self, enemies: Iterable[Enemy] = ()):
+        self._heap: List[list] = []        # [hp, dmg, name_id, seq, enemy or None, index]
+        self._items: List[Enemy] = []
+        self._entry: Dict[int, list] = {}  # id(enemy) -> live heap entry
+        self._seq = itertools.count()
+        for e in enemies:
+            self.push(e)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, e: Enemy) -> bool:
+        return id(e) in self._entry
+
+    def __iter__(self) -> Iterator[Enemy]:
+        # spawn order, for display
+        return iter(sorted(self._items, key=lambda e: self._entry[id(e)][3]))
+
+    def push(self, e: Enemy):
+        entry = [e.hp, e.dmg, e.name_id, next(self._seq), e, len(self._items)]
+        self._entry[id(e)] = entry
+        self._items.append(e)
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, e: Enemy):
+        entry = self._entry.pop(id(e))
+        entry[4] = None
+        idx, last = entry[5], self._items.pop()
+        if last is not e:
+            self._items[idx] = last
+            self._entry[id(last)][5] = idx
+        if len(self._heap) > 2 * len(self._items) + 16:
+            self._heap = [en for en in self._heap if en[4] is not None]
+            heapq.heapify(self._heap)
+
+    def update(self, e: Enemy):
+        """Re-key `e` after its hp changed."""
+        old = self._entry[id(e)]
+        if old[0] == e.hp:
+            return
+        old[4] = None
+        entry = [e.hp, e.dmg, e.name_id, old[3], e, old[5]]
+        self._entry[id(e)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def lowest(self) -> Optional[Enemy]:
+        """Lowest enemy in _rank order, earliest spawn first among identical ones."""
+        heap = self._heap
+        while heap and heap[0][4] is None:
+            heapq.heappop(heap)
+        return heap[0][4] if heap else None
+
+    def strike(self, dmg: int) -> Tuple[str, int]:
+        """Hit the lowest-HP enemy. Returns (name, hp left); the dead go back to the pool."""
+        e = self.lowest()
+        e.hp = max(0, e.hp - dmg)
+        name, hp = e.name, e.hp
+        if hp <= 0:
+            self.remove(e)
+            ENEMY_POOL.release(e)
+        else:
+            self.update(e)
+        return name, hp
+
+    def choice(self, rng=random) -> Enemy:
+        """Uniform over enemies: the draw indexes them in _rank order."""
+        return sorted(self._items, key=_rank)[rng.randrange(len(self._items))]
+
+    def copy(self) -> "EnemyQueue":
+        """Independent queue of fresh Enemy objects, same strike order."""
+        return EnemyQueue(ENEMY_POOL.acquire(e.side, e.hp, e.dmg, e.name_id) for e in self)
+
+    def prune(self) -> List[Enemy]:
+        """Drop enemies that died without being removed; they sit on top of the heap."""
+        dead = []
+        e = self.lowest()
+        while e is not None and not e.alive():
+            self.remove(e)
+            dead.append(e)
+            e = self.lowest()
+        return dead
+
+class EnemyStack:
+    __slots__ = ("name_id", "hp", "dmg", "count")
+
+    def __init__(self, name_id: int, hp: int, dmg: int, count: int = 0):
+        self.name_id = name_id
+        self.hp = hp
+        self.dmg = dmg
+        self.count = count
+
+    @property
+    def name(self) -> str:
+        return ENEMY_NAMES[self.name_id]
+
+    def alive(self) -> bool:
+        return self.hp > 0
+
+class EnemyStacks:
+    """Run-length form of EnemyQueue for horde nights.
+
+    Identical enemies share one (name, hp, dmg, count) stack, so memory and
+    per-turn work grow with the number of distinct variants on a side, not
+    the number of enemies. Pushed Enemy objects are copied, not kept.
+    """
+    __slots__ = ("_stacks", "_n")
+    owns_enemies = False
+
+    def __init__(self, enemies: Iterable[Enemy] = ()):
+        self._stacks: Dict[Tuple[int, int, int], EnemyStack] = {}  # creation order
+        self._n = 0
+        for e in enemies:
+            self.push(e)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[EnemyStack]:
+        return iter(list(self._stacks.values()))
+
+    def _add(self, name_id: int, hp: int, dmg: int, count: int = 1):
+        key = (name_id, hp, dmg)
+        st = self._stacks.get(key)
+        if st is None:
+            st = self._stacks[key] = EnemyStack(name_id, hp, dmg)
+        st.count += count
+        self._n += count
+
+    def _take(self, st: EnemyStack, count: int = 1):
+        st.count -= count
+        self._n -= count
+        if st.count <= 0:
+            del self._stacks[(st.name_id, st.hp, st.dmg)]
+
+    def push(self, e: Enemy):
+        self._add(e.name_id, e.hp, e.dmg)
+
+    def remove(self, e: Enemy):
+        self._take(self._stacks[(e.name_id, e.hp, e.dmg)])
+
+    def lowest(self) -> Optional[EnemyStack]:
+        return min(self._stacks.values(), key=_rank, default=None)
+
+    def strike(self, dmg: int) -> Tuple[str, int]:
+        """Split one enemy off the lowest-HP stack and hit it."""
+        st = self.lowest()
+        hp = max(0, st.hp - dmg)
+        self._take(st)
+        if hp > 0:
+            self._add(st.name_id, hp, st.dmg)
+        return st.name, hp
+
+    def choice(self, rng=random) -> EnemyStack:
+        """Uniform over enemies, i.e. stacks weighted by count, in _rank order."""
+        r = rng.randrange(self._n)
+        for st in sorted(self._stacks.values(), key=_rank):
+            r -= st.count
+            if r < 0:
+                return st
+        raise IndexError("choice from an empty side")
+
+    def copy(self) -> "EnemyStacks":
+        out = EnemyStacks()
+        for st in self._stacks.values():
+            out._add(st.name_id, st.hp, st.dmg, st.count)
+        return out
+
+    def prune(self) -> List[Enemy]:
+        return []  # strike() never leaves a dead stack behind
+
+def scaled_enemy(day_num: int, side: str, rng=random, params: Difficulty = DEFAULT) -> Enemy:
+    base_hp, base_dmg = params.enemy_base(day_num)
+    hp = base_hp + rng.randint(*params.enemy_hp_roll)
+    dmg = base_dmg + rng.choice(params.enemy_dmg_roll)
+    return ENEMY_POOL.acquire(side, max(1, hp), dmg, rng.randrange(len(BASE_NAMES)))
 
 @dataclass
 class GameState:
@@ -98,6 +346,8 @@ class GameState:
     has_watchtower: bool = False
     in_tower: bool = False
     upgrades: set = field(default_factory=set)
+    rng: GameRNG = field(default_factory=GameRNG)
+    params: Difficulty = field(default_factory=Difficulty, metadata={"saved": False})  # balance constants
 
     def fence(self, side: str) -> Fence:
         return self.fences[side]
\ No newline at end of file
@@ -0,0 +1,288 @@
+# events.py
+# Typed game events and the sinks that receive them.
+#
+# What happens in a day or a night (a gather, a fence hit, a breach, a trap,
+# a harvest...) is an event record: a NamedTuple whose type says what it is.
+# Game code publishes each one with
+#
+#   if out or bus.enabled:
+#       publish(bus, out, FenceHit(side, attacker.name, dmg))
+#
+# which hands it to the bus's sinks and, if there is an `out`, prints the
+# console line for it (text(ev), the same wording as ever). With no sinks
+# and no `out`, nothing is built or formatted: the guard is the whole cost,
+# as with metrics' `if m.enabled:`.
+#
+# Sinks: RingBuffer (the last N events, for debugging), JsonlSink (one
+# JSON object per line, written in batches) and TextSink (console text,
+# e.g. to log a headless game). NULL is a bus with no sinks.
+from __future__ import annotations
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import recipes
+
+Out = Optional[Callable[[str], None]]
+
+# ---- events ----
+# night
+
+class Spawned(NamedTuple):
+    side: str
+    count: int
+
+class TrapSprung(NamedTuple):
+    kills: int
+
+class Struck(NamedTuple):
+    side: str
+    name: str
+    dmg: int
+    ranged: bool
+    arrows_left: int
+
+class Killed(NamedTuple):
+    side: str
+    name: str
+    ranged: bool
+
+class FenceHit(NamedTuple):
+    side: str
+    name: str
+    dmg: int
+
+class Breach(NamedTuple):
+    side: str
+    name: str
+    dmg: int
+
+class Dawn(NamedTuple):
+    healed: int
+
+class NightEnded(NamedTuple):
+    survived: bool
+    turns: int
+
+# day
+
+class Gathered(NamedTuple):
+    wood: int
+    combo: int
+
+class Foraged(NamedTuple):
+    food: int
+    seeds: int
+    wood: int
+
+class Repaired(NamedTuple):
+    wood: int
+    hp: int
+
+class Rested(NamedTuple):
+    healed: int
+
+class Planted(NamedTuple):
+    pass
+
+class Watered(NamedTuple):
+    day: int      # of the 3 the crop needs
+    ready: bool
+
+class Harvested(NamedTuple):
+    food: int
+
+class Crafted(NamedTuple):
+    recipe: int   # recipes.RECIPES id
+    wood: int
+
+# morning
+
+class Frost(NamedTuple):
+    decay: int
+
+class Campfire(NamedTuple):
+    lit: bool
+
+class Meal(NamedTuple):
+    ate: bool
+    dmg: int
+
+Event = tuple  # any of the records above
+
+# ---- console text ----
+
+def _forage_text(ev: Foraged) -> str:
+    if ev.food:
+        return f"You find edible shoots and berries. Food +{ev.food}."
+    if ev.seeds:
+        return "You find hardy seeds in a wilted husk. Seeds +1."
+    if ev.wood:
+        return f"You drag back a limb. Wood +{ev.wood}."
+    return "You trudge and circle back with nothing to show."
+
+def _struck_text(ev: Struck) -> str:
+    if ev.ranged:
+        return f"🏹 You loose an arrow at the {ev.name} ({ev.side}) for {ev.dmg}! {ev.arrows_left} arrows left."
+    return f"You strike the {ev.name} for {ev.dmg} damage!"
+
+def _crafted_text(ev: Crafted) -> str:
+    r = recipes.RECIPES[ev.recipe]
+    return r.done or f"You craft {r.name}. {r.desc}"
+
+_TEXT: Dict[type, Callable[..., Optional[str]]] = {
+    Spawned: lambda ev: None,
+    TrapSprung: lambda ev: f"Your traps snap! {ev.kills} creatures from the new wave are slain.",
+    Struck: _struck_text,
+    Killed: lambda ev: f"The {ev.name} {'falls' if ev.ranged else 'collapses'}.",
+    FenceHit: lambda ev: f"{ev.name} batters the {ev.side} fence (-{ev.dmg}).",
+    Breach: lambda ev: f"{ev.name} breaches {ev.side}! You take {ev.dmg} damage.",
+    Dawn: lambda ev: ("\nA gray thread of light touches the treetops. Dawn.\n"
+                      f"You patch wounds and breathe deep. HP +{ev.healed}."),
+    NightEnded: lambda ev: None,
+    Gathered: lambda ev: f"You gather wood at the treeline. +{ev.wood} wood. (+{ev.combo} combo)",
+    Foraged: _forage_text,
+    Repaired: lambda ev: (f"You spend {ev.wood} wood to patch the fences.\n"
+                          f"Total repair: +{ev.hp} HP across all sides."),
+    Rested: lambda ev: f"You rest by the hearth. HP +{ev.healed}.",
+    Planted: lambda ev: "You plant a seed in the soil.",
+    Watered: lambda ev: (f"You water the young crop (Day {ev.day}/3)."
+                         + ("\nYour crops are ready to harvest tomorrow!" if ev.ready else "")),
+    Harvested: lambda ev: f"You harvest {ev.food} food from your field. The soil rests.",
+    Crafted: _crafted_text,
+    Frost: lambda ev: f"\nFrost gnaws at the boards overnight. All standing fences -{ev.decay} HP.",
+    Campfire: lambda ev: ("You feed the campfire with 1 wood. Its warmth keeps the night at bay." if ev.lit
+                          else "You have no wood for the campfire. The clearing will be dark tonight..."),
+    Meal: lambda ev: ("You eat your morning meal. (-1 food)" if ev.ate
+                      else f"You have nothing to eat. You feel weaker. (-{ev.dmg} HP)"),
+}
+
+def text(ev: Event) -> Optional[str]:
+    """The console line(s) for ev, or None for events the console doesn't show."""
+    return _TEXT[type(ev)](ev)
+
+def record(ev: Event, day: int = 0, turn: int = 0) -> dict:
+    return {"ev": type(ev).__name__, "day": day, "turn": turn, **ev._asdict()}
+
+# ---- bus and sinks ----
+
+class Sink(ABC):
+    @abstractmethod
+    def write(self, ev: Event, day: int, turn: int):
+        ...
+
+    def flush(self):
+        pass
+
+class Bus:
+    """Fans events out to its sinks, stamped with the current day and night turn."""
+
+    def __init__(self, sinks: Sequence[Sink] = ()):
+        self.sinks = list(sinks)
+        self.day = 0
+        self.turn = 0  # night turn, 0 by day
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def at(self, day: int, turn: int = 0):
+        self.day, self.turn = day, turn
+
+    def emit(self, ev: Event):
+        for s in self.sinks:
+            s.write(ev, self.day, self.turn)
+
+    def flush(self):
+        for s in self.sinks:
+            s.flush()
+
+class NullBus(Bus):
+    """The null sink: never enabled, so guarded publishers build nothing."""
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def enabled(self) -> bool:
+        return False
+
+    def at(self, day: int, turn: int = 0):
+        pass
+
+    def emit(self, ev: Event):
+        pass
+
+class RingBuffer(Sink):
+    """The last `capacity` events as (day, turn, event)."""
+
+    def __init__(self, capacity: int = 1024):
+        self.events: deque = deque(maxlen=capacity)
+
+    def write(self, ev: Event, day: int, turn: int):
+        self.events.append((day, turn, ev))
+
+    def last(self, n: int) -> List[Tuple[int, int, Event]]:
+        return list(self.events)[-n:]
+
+    def of(self, kind: type) -> List[Tuple[int, int, Event]]:
+        return [e for e in self.events if type(e[2]) is kind]
+
+class JsonlSink(Sink):
+    """Appends record(ev) lines to `path`, `batch` at a time (and on flush)."""
+
+    def __init__(self, path: str, batch: int = 256):
+        self.path = path
+        self.batch = batch
+        self._pending: List[str] = []
+
+    def write(self, ev: Event, day: int, turn: int):
+        self._pending.append(json.dumps(record(ev, day, turn), separators=(",", ":"), ensure_ascii=False))
+        if len(self._pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(self._pending) + "\n")
+        self._pending.clear()
+
+class TextSink(Sink):
+    """Console text for each event, to any line writer."""
+
+    def __init__(self, out: Callable[[str], None] = print):
+        self.out = out
+
+    def write(self, ev: Event, day: int, turn: int):
+        line = text(ev)
+        if line is not None:
+            self.out(line)
+
+def publish(bus: Bus, out: Out, ev: Event):
+    """Emit ev on the bus and show its text on `out` (either may be off)."""
+    if bus.enabled:
+        bus.emit(ev)
+    if out:
+        line = text(ev)
+        if line is not None:
+            out(line)
+
+NULL = NullBus()
+
+_default: Bus = NULL
+
+def default() -> Bus:
+    return _default
+
+def configure(jsonl: Optional[str] = None, ring: int = 0) -> Bus:
+    """Make default() a bus writing to the given sinks (NULL if none)."""
+    global _default
+    sinks: List[Sink] = []
+    if jsonl:
+        sinks.append(JsonlSink(jsonl))
+    if ring:
+        sinks.append(RingBuffer(ring))
+    _default = Bus(sinks) if sinks else NULL
+    return _default
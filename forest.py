@@ -0,0 +1,283 @@
+# forest.py
+# Large procedurally generated worlds, stored in chunks on disk.
+#
+# A ForestMap stands in for world.TileMap when the clearing sits in a forest
+# of millions of tiles:
+#
+#   world.install(forest.open_forest("forest.bin", 4096, 4096, seed=7))
+#
+# The tiles live in a file of CHUNK x CHUNK blocks (one byte per tile),
+# memory-mapped a chunk at a time. A mapping must start on the allocation
+# granularity (a page on Linux, 64 KiB on Windows), so each chunk maps the
+# window from the boundary at or before its block and reads past the gap. A chunk is generated
+# from (seed, chunk x, chunk y) the first time it is touched and written to
+# its block; a bitmap in the file header records which chunks exist, so a
+# reopened file picks up where it left off. At most `cache` chunks are mapped
+# at once, least recently used first out, so memory stays flat however large
+# the world is (the header bitmap is one bit per chunk).
+#
+# tiles, flags, neighbors and neighbor_idx are views with TileMap's indexing
+# (flat index y * width + x), so world's query functions work unchanged and
+# near_trees/near_fence read across chunk boundaries. render() draws a
+# viewport around the player instead of the whole map.
+from __future__ import annotations
+import mmap
+import os
+import random
+import struct
+import tempfile
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+from world import (LEGEND, NEAR_FENCE, NEAR_TREE, PLAYER, T_CABIN, T_FENCE, T_GROUND, T_TREE,
+                   _TILE_CHARS)
+
+CHUNK = 64              # tiles per chunk side
+DENSITY = 0.35          # share of forest tiles that are trees
+CLEARING = 3            # half-size of the fenced clearing (3 gives the 7x7 layout)
+VIEW = (41, 21)         # viewport, in tiles
+
+_MAGIC = b"CBNFRST1"
+_HEAD = struct.Struct("<8sqqqqqd")  # magic, width, height, seed, chunk, clearing, density
+
+def _round_up(n: int, to: int) -> int:
+    return -(-n // to) * to
+
+class ForestMap:
+    """A width x height world in lazily generated, memory-mapped chunks."""
+
+    def __init__(self, f, width: int, height: int, seed: int = 0, chunk: int = CHUNK,
+                 clearing: int = CLEARING, density: float = DENSITY, cache: int = 256,
+                 view: Tuple[int, int] = VIEW):
+        if width < 3 or height < 5:
+            raise ValueError(f"map must be at least 3x5, got {width}x{height}")
+        if cache < 1:
+            raise ValueError("cache must hold at least one chunk")
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.chunk = chunk
+        self.clearing = clearing
+        self.density = density
+        self.view = view
+        self.cabin_pos = (width // 2, height // 2)
+        self.cache = cache
+
+        self._f = f
+        self._cols = -(-width // chunk)
+        self._nchunks = self._cols * -(-height // chunk)
+        self._size = chunk * chunk
+        self._base = _round_up(_HEAD.size + -(-self._nchunks // 8), mmap.ALLOCATIONGRANULARITY)
+        self._open_file()
+
+        cut = min(255, int(density * 256))
+        self._table = bytes(T_TREE if b < cut else T_GROUND for b in range(256))
+        self._mapped: "OrderedDict[int, Tuple[mmap.mmap, int]]" = OrderedDict()
+        self._last = (-1, None, 0)
+        self.generated = 0  # chunks generated by this instance
+        self.evictions = 0
+
+        self.tiles = _Tiles(self)
+        self.flags = _Flags(self)
+        self.neighbors = _Neighbors(self)
+        self.neighbor_idx = _NeighborIdx(self)
+
+    def _open_file(self):
+        want = _HEAD.pack(_MAGIC, self.width, self.height, self.seed, self.chunk,
+                          self.clearing, self.density)
+        size = self._base + self._nchunks * self._size
+        fd = self._f.fileno()
+        if os.fstat(fd).st_size == 0:
+            os.ftruncate(fd, size)  # sparse: blocks take disk once written
+            self._header = mmap.mmap(fd, self._base)
+            self._header[:_HEAD.size] = want
+        else:
+            if os.fstat(fd).st_size != size:
+                raise ValueError("forest file does not match the requested world")
+            self._header = mmap.mmap(fd, self._base)
+            if self._header[:_HEAD.size] != want:
+                self._header.close()
+                raise ValueError("forest file was made with other parameters")
+
+    # --- chunks ---
+
+    def _chunk(self, cid: int) -> Tuple[mmap.mmap, int]:
+        """The mapping holding chunk cid and the offset of its block in it."""
+        if self._last[0] == cid:
+            return self._last[1], self._last[2]
+        mapped = self._mapped
+        hit = mapped.get(cid)
+        if hit is None:
+            if len(mapped) >= self.cache:
+                mapped.popitem(last=False)[1][0].close()
+                self.evictions += 1
+            pos = self._base + cid * self._size
+            delta = pos % mmap.ALLOCATIONGRANULARITY
+            mm = mmap.mmap(self._f.fileno(), delta + self._size, offset=pos - delta)
+            hit = mapped[cid] = (mm, delta)
+            if not self._header[_HEAD.size + (cid >> 3)] & (1 << (cid & 7)):
+                self._generate(cid, mm, delta)
+        else:
+            mapped.move_to_end(cid)
+        self._last = (cid, *hit)
+        return hit
+
+    def _generate(self, cid: int, mm: mmap.mmap, delta: int):
+        c = self.chunk
+        x0, y0 = (cid % self._cols) * c, (cid // self._cols) * c
+        rng = random.Random(f"{self.seed}:{x0 // c}:{y0 // c}")
+        buf = bytearray(rng.randbytes(self._size).translate(self._table))
+        w, h = self.width, self.height
+        cabx, caby = self.cabin_pos
+        r = self.clearing - 1
+        for ly in range(c):
+            y = y0 + ly
+            row = ly * c
+            if y >= h - 1 or y == 0:  # south/north tree rows, and past the edge
+                buf[row:row + c] = bytes([T_TREE]) * c
+                continue
+            if x0 == 0:
+                buf[row] = T_TREE
+            if x0 <= w - 1 < x0 + c:
+                buf[row + w - 1 - x0:row + c] = bytes([T_TREE]) * (x0 + c - w + 1)
+            if abs(y - caby) <= r:
+                for x in range(max(x0, cabx - r), min(x0 + c, cabx + r + 1)):
+                    buf[row + x - x0] = (T_CABIN if (x, y) == self.cabin_pos
+                                         else T_FENCE if abs(y - caby) == r else T_GROUND)
+        mm[delta:delta + self._size] = bytes(buf)
+        self._header[_HEAD.size + (cid >> 3)] |= 1 << (cid & 7)
+        self.generated += 1
+
+    def tile(self, x: int, y: int) -> int:
+        c = self.chunk
+        mm, delta = self._chunk((y // c) * self._cols + x // c)
+        return mm[delta + (y % c) * c + x % c]
+
+    def set_tile(self, x: int, y: int, code: int):
+        c = self.chunk
+        mm, delta = self._chunk((y // c) * self._cols + x // c)
+        mm[delta + (y % c) * c + x % c] = code
+
+    def flag(self, x: int, y: int) -> int:
+        flag = 0
+        for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                t = self.tile(nx, ny)
+                if t == T_TREE:
+                    flag |= NEAR_TREE
+                elif t == T_FENCE:
+                    flag |= NEAR_FENCE
+        return flag
+
+    def row(self, y: int, x0: int, x1: int) -> bytes:
+        """Tile codes of row y, columns x0 <= x < x1, across chunks."""
+        c = self.chunk
+        parts = []
+        x = x0
+        while x < x1:
+            end = min(x1, (x // c + 1) * c)
+            mm, delta = self._chunk((y // c) * self._cols + x // c)
+            off = delta + (y % c) * c + x % c
+            parts.append(mm[off:off + end - x])
+            x = end
+        return b"".join(parts)
+
+    # --- drawing ---
+
+    def render(self, px: int, py: int) -> str:
+        """The viewport around (px, py), clamped to the map edges."""
+        vw, vh = min(self.view[0], self.width), min(self.view[1], self.height)
+        x0 = max(0, min(px - vw // 2, self.width - vw))
+        y0 = max(0, min(py - vh // 2, self.height - vh))
+        rows = []
+        for y in range(y0, y0 + vh):
+            cells = [_TILE_CHARS[t] for t in self.row(y, x0, x0 + vw)]
+            if y == py and x0 <= px < x0 + vw:
+                cells[px - x0] = PLAYER
+            rows.append("".join(cells))
+        return "\n".join(rows + ["", LEGEND])
+
+    # --- lifetime ---
+
+    def flush(self):
+        for mm, _ in self._mapped.values():
+            mm.flush()
+        self._header.flush()
+
+    def close(self):
+        for mm, _ in self._mapped.values():
+            mm.close()
+        self._mapped.clear()
+        self._last = (-1, None, 0)
+        self._header.close()
+        self._f.close()
+
+    def __enter__(self) -> "ForestMap":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Views with TileMap's flat-index interface, resolved through the chunks.
+
+class _Tiles:
+    def __init__(self, fm: ForestMap):
+        self._fm = fm
+
+    def __len__(self) -> int:
+        return self._fm.width * self._fm.height
+
+    def _yx(self, i: int) -> Tuple[int, int]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("map index out of range")
+        return divmod(i, self._fm.width)
+
+    def __iter__(self) -> Iterator[int]:
+        fm = self._fm
+        for y in range(fm.height):
+            yield from fm.row(y, 0, fm.width)
+
+    def __getitem__(self, i: int) -> int:
+        y, x = self._yx(i)
+        return self._fm.tile(x, y)
+
+    def __setitem__(self, i: int, code: int):
+        y, x = self._yx(i)
+        self._fm.set_tile(x, y, code)
+
+class _Flags(_Tiles):
+    def __iter__(self) -> Iterator:
+        return map(self.__getitem__, range(len(self)))
+
+    def __getitem__(self, i: int) -> int:
+        y, x = self._yx(i)
+        return self._fm.flag(x, y)
+
+    __setitem__ = None
+
+class _Neighbors(_Flags):
+    def __getitem__(self, i: int) -> Tuple[Tuple[int, int], ...]:
+        w, h = self._fm.width, self._fm.height
+        y, x = self._yx(i)
+        return tuple((nx, ny) for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                     if 0 <= nx < w and 0 <= ny < h)
+
+class _NeighborIdx(_Neighbors):
+    def __getitem__(self, i: int) -> Tuple[int, ...]:
+        w = self._fm.width
+        return tuple(ny * w + nx for nx, ny in super().__getitem__(i))
+
+def open_forest(path: Optional[str], width: int, height: int, seed: int = 0, **kw) -> ForestMap:
+    """Open (or create) the forest file at path; None uses an anonymous temp file."""
+    if path is None:
+        f = tempfile.TemporaryFile()
+    else:
+        f = open(path, "r+b" if os.path.exists(path) else "w+b")
+    try:
+        return ForestMap(f, width, height, seed, **kw)
+    except Exception:
+        f.close()
+        raise
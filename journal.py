@@ -0,0 +1,167 @@
+# journal.py
+# Append-only save journal.
+#
+# <base>.snap     full state as of record `seq`, replaced atomically
+# <base>.journal  one compact JSON line per save: {"seq": n, "d": {changed fields}}
+#
+# A save appends only the fields that changed since the previous one and
+# fsyncs the journal. Every `compact_every` saves the current state becomes
+# the new snapshot (write temp, fsync, rename) and the journal is emptied.
+# Loading reads the snapshot and replays at most `compact_every` records;
+# a torn last line from a crash is cut off.
+from __future__ import annotations
+import dataclasses
+import json
+import os
+from typing import Any, Dict, Optional
+
+from entities import GameState
+import recipes
+
+Flat = Dict[str, Any]
+_MISSING = object()  # a field the last save didn't have
+
+def flatten_state(gs: GameState) -> Flat:
+    """Every GameState field as {"player.wood": 5, "fences.North.hp": 20, ...}."""
+    flat: Flat = {}
+
+    def walk(prefix: str, obj):
+        for f in dataclasses.fields(obj):
+            if not f.metadata.get("saved", True):
+                continue
+            val = getattr(obj, f.name)
+            key = prefix + f.name
+            if dataclasses.is_dataclass(val):
+                walk(key + ".", val)
+            elif isinstance(val, dict) and val and dataclasses.is_dataclass(next(iter(val.values()))):
+                for k, v in val.items():
+                    walk(f"{key}.{k}.", v)
+            elif key == "upgrades":
+                flat[key] = recipes.to_ids(val)  # saved by recipe id
+            elif isinstance(val, (set, frozenset)):
+                flat[key] = sorted(val)
+            else:
+                flat[key] = val
+
+    walk("", gs)
+    return flat
+
+def restore_state(flat: Flat, gs: Optional[GameState] = None) -> GameState:
+    """Apply flattened fields onto gs (a fresh GameState by default)."""
+    gs = gs or GameState()
+    for key, val in flat.items():
+        *path, name = key.split(".")
+        obj = gs
+        for part in path:
+            obj = obj[part] if isinstance(obj, dict) else getattr(obj, part)
+        if key == "upgrades":
+            val = recipes.from_ids(val)
+        elif isinstance(getattr(obj, name, None), (set, frozenset)):
+            val = set(val)
+        setattr(obj, name, val)
+    return gs
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True)
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class SaveJournal:
+    def __init__(self, base: str = "save", compact_every: int = 7):
+        self.snapshot_path = base + ".snap"
+        self.journal_path = base + ".journal"
+        self.compact_every = compact_every
+        self._last: Optional[Flat] = None  # state as persisted on disk
+        self._seq = 0
+        self._records = 0  # journal records since the snapshot
+
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def save(self, gs: GameState):
+        flat = flatten_state(gs)
+        if self._last is None:
+            self._read()
+        if self._last is None:
+            self._seq += 1
+            self._write_snapshot(flat)
+            return
+        delta = {k: v for k, v in flat.items() if self._last.get(k, _MISSING) != v}
+        self._seq += 1
+        line = _dumps({"seq": self._seq, "d": delta}) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._last = flat
+        self._records += 1
+        if self._records >= self.compact_every:
+            self._write_snapshot(flat)
+
+    def load(self) -> Optional[GameState]:
+        """Snapshot plus journal tail, or None if there is no save."""
+        flat = self._read()
+        return restore_state(flat) if flat is not None else None
+
+    def delete(self):
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._last, self._seq, self._records = None, 0, 0
+
+    def _write_snapshot(self, flat: Flat):
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps({"seq": self._seq, "state": flat}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Records up to seq are now in the snapshot; load() skips any that survive a crash here.
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(self.snapshot_path)
+        self._last = flat
+        self._records = 0
+
+    def _read(self) -> Optional[Flat]:
+        flat: Optional[Flat] = None
+        seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snap = json.load(f)
+            flat, seq = snap["state"], snap["seq"]
+
+        records = 0
+        if os.path.exists(self.journal_path):
+            good = 0
+            with open(self.journal_path, "rb") as f:
+                for raw in f:
+                    try:
+                        rec = json.loads(raw)
+                    except ValueError:
+                        break  # torn write from a crash; drop it and anything after
+                    if not raw.endswith(b"\n"):
+                        break
+                    good += len(raw)
+                    if rec["seq"] <= seq:
+                        continue
+                    flat = dict(flat or {})
+                    flat.update(rec["d"])
+                    seq = rec["seq"]
+                    records += 1
+            if good < os.path.getsize(self.journal_path):
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good)
+                    os.fsync(f.fileno())
+
+        self._last, self._seq, self._records = flat, seq, records
+        return flat
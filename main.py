@@ -1,49 +1,42 @@
 # main.py
 from __future__ import annotations
-import random
+from typing import Callable, Optional
 from entities import GameState, SIDES
+from rng import GameRNG
 import night
+from night import Out
+from bot import SearchBot
+import commands
+from commands import CommandSource, Recorder, ScriptSource, StdinSource
+import screen
+from screen import NullScreen, Screen
+import events
+from events import Bus, publish
+import metrics
+from metrics import Metrics
 
 DIV = "\n" + "=" * 56 + "\n"
 import json, os
+from journal import SaveJournal
+import recipes
+from archive import Archive, RunLog
 
-SAVE_FILE = "save.json"
-
-def save_game(gs: GameState):
-    data = {
-        "day_num": gs.day_num,
-        "player": {
-            "hp": gs.player.hp,
-            "max_hp": gs.player.max_hp,
-            "wood": gs.player.wood,
-            "food": gs.player.food,
-            "seeds": gs.player.seeds,
-            "damage": gs.player.damage,
-            "gather_bonus": getattr(gs.player, "gather_bonus", 0),
-        },
-        "fences": {s: {"hp": f.hp, "max_hp": f.max_hp} for s, f in gs.fences.items()},
-        "upgrades": list(getattr(gs, "upgrades", [])),
-        "reinforce_cost": getattr(gs, "reinforce_cost", 10),
-        "has_field": getattr(gs, "has_field", False),
-        "field_state": getattr(gs, "field_state", "empty"),
-        "field_timer": getattr(gs, "field_timer", 0),
-        "field_watered": getattr(gs, "field_watered", 0),
-        "campfire_on": getattr(gs, "campfire_on", True),
-        "traps": getattr(gs, "traps", 0),
-    }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-    print("(Game saved.)")
-
-
-def load_game() -> GameState:
-    """Always return a valid GameState. Fall back to a fresh game on error."""
-    try:
-        with open(SAVE_FILE) as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        print("(Save missing/corrupted. Starting a new game.)")
-        return GameState()
+SAVE_BASE = "save"
+ARCHIVE_DIR = "runs"  # finished runs, see archive.py
+LEGACY_SAVE_FILE = "save.json"  # pre-journal saves, read once and migrated
+
+_journal = SaveJournal(SAVE_BASE)
+
+def save_exists() -> bool:
+    return _journal.exists() or os.path.exists(LEGACY_SAVE_FILE)
+
+def save_game(gs: GameState, scr: Optional[Screen] = None):
+    _journal.save(gs)
+    (scr or screen.default()).say("(Game saved.)")
+
+def _load_legacy() -> GameState:
+    with open(LEGACY_SAVE_FILE) as f:
+        data = json.load(f)
 
     gs = GameState()
     gs.day_num = data["day_num"]
@@ -61,7 +54,9 @@ def load_game() -> GameState:
         f.hp = fdata["hp"]
         f.max_hp = fdata["max_hp"]
 
-    gs.crafted = set(data.get("crafted", []))
+    gs.upgrades = set(data.get("upgrades", []))
+    gs.has_bow = "Bow" in gs.upgrades
+    gs.has_watchtower = "Watchtower" in gs.upgrades
     gs.reinforce_cost = data.get("reinforce_cost", 10)
     gs.has_field = data.get("has_field", False)
     gs.field_state = data.get("field_state", "empty")
@@ -69,177 +64,158 @@ def load_game() -> GameState:
     gs.field_watered = data.get("field_watered", 0)
     gs.campfire_on = data.get("campfire_on", True)
     gs.traps = data.get("traps", 0)
-    print("(Game loaded.)")
     return gs
 
-def intro(gs: GameState):
-    print(DIV)
-    print("You stumble out of the pines into a small clearing.")
-    print("A wooden cabin crouches in the mist, its four fences scarred but standing.")
-    input("\n[Enter] Step toward the cabin...")
+def load_game(scr: Optional[Screen] = None) -> GameState:
+    """Always return a valid GameState. Fall back to a fresh game on error."""
+    scr = scr or screen.default()
+    try:
+        gs = _journal.load()
+        if gs is None:
+            gs = _load_legacy()
+            _journal.save(gs)
+            os.remove(LEGACY_SAVE_FILE)
+    except (OSError, ValueError, KeyError):
+        scr.say("(Save missing/corrupted. Starting a new game.)")
+        return GameState()
+    scr.say("(Game loaded.)")
+    return gs
 
-def show_day_status(gs: GameState, actions_left: int):
+def delete_save():
+    _journal.delete()
+    if os.path.exists(LEGACY_SAVE_FILE):
+        os.remove(LEGACY_SAVE_FILE)
+
+INTRO_TEXT = (DIV + "\n"
+              "You stumble out of the pines into a small clearing.\n"
+              "A wooden cabin crouches in the mist, its four fences scarred but standing.")
+
+def game_over_text(gs: GameState) -> str:
+    return (DIV + "\n"
+            "You collapse against the cold earth. The forest exhales.\n"
+            f"You survived until Day {gs.day_num}.\n"
+            "Thanks for playing this prototype.")
+
+def intro(gs: GameState, scr: Optional[Screen] = None, src: Optional[CommandSource] = None):
+    (scr or screen.default()).say(INTRO_TEXT)
+    (src or commands.default()).pause("\n[Enter] Step toward the cabin...")
+
+def show_day_status(gs: GameState, actions_left: int, scr: Optional[Screen] = None):
+    scr = scr or screen.default()
+    if not scr.active:
+        return
     total = gs.player.day_actions_per_day
     hour = 6 + (total - actions_left)
-    print(DIV)
-    print(f"DAY {gs.day_num} — {hour:02d}:00 | Actions left: {actions_left}")
-    print(f"HP {gs.player.hp}/{gs.player.max_hp} | Wood {gs.player.wood} | Food {gs.player.food} | Seeds {gs.player.seeds} | Arrows {gs.arrows} | Traps {gs.traps}")
+    lines = [DIV]
+    lines.append(f"DAY {gs.day_num} — {hour:02d}:00 | Actions left: {actions_left}")
+    lines.append(f"HP {gs.player.hp}/{gs.player.max_hp} | Wood {gs.player.wood} | Food {gs.player.food} | Seeds {gs.player.seeds} | Arrows {gs.arrows} | Traps {gs.traps}")
     for s in SIDES:
         f = gs.fence(s)
-        print(f"  {s:<5} Fence: {f.hp:02d}/{f.max_hp}")
-    print(DIV)
-
-def day_menu(gs):
-    print("Choose your action:")
-    print(" 1) Gather wood")
-    print(" 2) Forage")
-    print(" 3) Repair all fences")
-    print(" 4) Rest")
-    print(" 5) Craft items")
+        lines.append(f"  {s:<5} Fence: {f.hp:02d}/{f.max_hp}")
+    lines.append(DIV)
+    scr.frame(lines)
+
+def day_menu_text(gs) -> str:
+    lines = ["Choose your action:",
+             " 1) Gather wood",
+             " 2) Forage",
+             " 3) Repair all fences",
+             " 4) Rest",
+             " 5) Craft items"]
     if getattr(gs, "has_field", False):
-        print(" 6) Tend the field")
-    print(" 7) End day")
-    return input("> ").strip()
-
-
-def do_craft(gs: GameState):
-    reinforce_cost = getattr(gs, "reinforce_cost", 10)
-
-    # ---- Permanent Upgrades ----
-    # (name, cost, desc, prereq)
-    upgrades = [
-        ("Spear", 5, "Increase night attack damage by +2.", None),
-        ("Axe", 6, "Gather +2 extra wood each time.", None),
-        ("Hoe", 4, "Unlock 'Tend Field' to grow food.", None),
-        ("Bow", 8, "Allows ranged attacks using arrows.", "Spear"),  # must have spear
-        ("Watchtower", 25, "Shoot from any side but cannot defend.", "Bow"),  # must have bow
-    ]
-
-    # ---- Consumables / Repeatables ----
-    craftables = [
-        (f"Reinforce Fences ({reinforce_cost} wood)", reinforce_cost, "Increase all fence max HP by +10, cost rises each time."),
-        ("Trap", 5, "Place a trap that kills 2–4 monsters when a new wave spawns."),
-        ("Arrow Batch", 2, "Craft 5 arrows for ranged attacks."),
-    ]
-
-    # ---- Display ----
-    print("\n== Permanent Upgrades ==")
-    for i, (name, cost, desc, prereq) in enumerate(upgrades, 1):
-        mark = "✅" if name in gs.upgrades else " "
-        prereq_text = f"(requires {prereq})" if prereq else ""
-        print(f" U{i}) {name:<18} ({cost} wood) {mark} {prereq_text}\n     {desc}")
-
-    print("\n== Craftable Items ==")
-    for i, (name, cost, desc) in enumerate(craftables, 1):
-        print(f" C{i}) {name:<18} ({cost} wood)\n     {desc}")
-
-    choice = input("> Choose item (e.g. U1, C2) or Enter to cancel: ").strip().lower()
+        lines.append(" 6) Tend the field")
+    lines.append(" 7) End day")
+    return "\n".join(lines)
+
+def day_menu(gs, scr: Optional[Screen] = None, src: Optional[CommandSource] = None):
+    scr = scr or screen.default()
+    if scr.active:
+        scr.say(day_menu_text(gs))
+    return (src or commands.default()).read("> ").strip()
+
+CRAFT_PROMPT = "> Choose item (e.g. U1, C2) or Enter to cancel: "
+
+def craft_menu_text(gs: GameState) -> str:
+    lines = ["\n== Permanent Upgrades =="]
+    for r in recipes.UPGRADES:
+        mark = "✅" if r.name in gs.upgrades else " "
+        prereq_text = f"(requires {r.prereq})" if r.prereq else ""
+        lines.append(f" {r.code.upper()}) {r.name:<18} ({recipes.cost(gs, r.id)} wood) {mark} {prereq_text}\n"
+                     f"     {recipes.describe(gs, r)}")
+
+    lines.append("\n== Craftable Items ==")
+    for r in recipes.CRAFTABLES:
+        lines.append(f" {r.code.upper()}) {recipes.label(gs, r):<18} ({recipes.cost(gs, r.id)} wood)\n"
+                     f"     {recipes.describe(gs, r)}")
+    return "\n".join(lines)
+
+def do_craft(gs: GameState, choice: Optional[str] = None, out: Out = print,
+             src: Optional[CommandSource] = None, bus: Optional[Bus] = None):
+    """Craft `choice` ("u1", "c2", "" to cancel); None shows the menu and asks `src`."""
+    if choice is None:
+        if out:
+            out(craft_menu_text(gs))
+        choice = (src or commands.default()).read(CRAFT_PROMPT)
+    choice = choice.strip().lower()
     if not choice:
-        print("Cancelled.")
+        if out:
+            out("Cancelled.")
         return
 
-    # ---- Handle Upgrades ----
-    if choice.startswith("u"):
-        idx = int(choice[1:]) - 1
-        if not (0 <= idx < len(upgrades)):
-            print("Invalid choice.")
-            return
-        name, cost, desc, prereq = upgrades[idx]
-
-        # prerequisite check
-        if prereq and prereq not in gs.upgrades:
-            print(f"You need {prereq} before crafting {name}.")
-            return
-
-        if name in gs.upgrades:
-            print("You already have this upgrade.")
-            return
-        if gs.player.wood < cost:
-            print("Not enough wood.")
-            return
-
-        gs.player.wood -= cost
-        gs.upgrades.add(name)
-
-        # Apply upgrade effects
-        if name == "Spear":
-            gs.player.damage += 2
-        elif name == "Axe":
-            gs.player.gather_bonus = 2
-        elif name == "Hoe":
-            gs.has_field = True
-            gs.field_state = "empty"
-            gs.field_timer = 0
-        elif name == "Bow":
-            gs.has_bow = True
-        elif name == "Watchtower":
-            gs.has_watchtower = True
-
-        print(f"You craft {name}. {desc}")
+    if choice[1:].isdigit():
+        choice = choice[0] + str(int(choice[1:]))  # "u01" is U1
+    r = recipes.BY_CODE.get(choice)
+    if r is None:
+        if out:
+            out("Invalid choice." if choice[:1] in ("u", "c") else "Invalid input.")
         return
-
-    # ---- Handle Craftables ----
-    if choice.startswith("c"):
-        idx = int(choice[1:]) - 1
-        if not (0 <= idx < len(craftables)):
-            print("Invalid choice.")
-            return
-        name, cost, desc = craftables[idx]
-        if gs.player.wood < cost:
-            print("Not enough wood.")
-            return
-
-        gs.player.wood -= cost
-
-        if "Reinforce" in name:
-            for f in gs.fences.values():
-                f.max_hp += 10
-                f.hp += 10
-            gs.reinforce_cost += 5  # escalate cost
-            print("Your fences grow sturdier, with thicker planks and braces.")
-        elif name == "Trap":
-            gs.traps += 1
-            print("You build a trap and hide it near the fence line.")
-        elif name == "Arrow Batch":
-            gs.arrows += 5
-            print("You craft 5 new arrows and bundle them neatly.")
-
+    problem = recipes.blocker(gs, r.id)
+    if problem:
+        if out:
+            out(problem)
         return
-
-    print("Invalid input.")
-
-def do_gather(gs: GameState):
-    base = random.randint(2, 4)
+    wood = gs.player.wood
+    recipes.craft(gs, r.id)
+    bus = bus or events.default()
+    if out or bus.enabled:
+        publish(bus, out, events.Crafted(r.id, wood - gs.player.wood))
+
+def do_gather(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
+    base = gs.rng.loot.randint(2, 4)
     bonus = getattr(gs.player, "gather_bonus", 0) + gs.daily_wood_bonus_combo
     gs.daily_wood_bonus_combo += 2
     gained = base + bonus
     gs.player.wood += gained
-    print(f"You gather wood at the treeline. +{gained} wood. (+{gs.daily_wood_bonus_combo} combo)")
+    bus = bus or events.default()
+    if out or bus.enabled:
+        publish(bus, out, events.Gathered(gained, gs.daily_wood_bonus_combo))
 
-def do_forage(gs: GameState):
-    r = random.random()
+def do_forage(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
+    food = seeds = wood = 0
+    r = gs.rng.loot.random()
     if r < 0.35:
-        amt = random.randint(1, 2)
-        gs.player.food += amt
-        print(f"You find edible shoots and berries. Food +{amt}.")
+        food = gs.rng.loot.randint(1, 2)
+        gs.player.food += food
     elif r < 0.6:
+        seeds = 1
         gs.player.seeds += 1
-        print("You find hardy seeds in a wilted husk. Seeds +1.")
     elif r < 0.8:
-        amt = random.randint(1, 2)
-        gs.player.wood += amt
-        print(f"You drag back a limb. Wood +{amt}.")
-    else:
-        print("You trudge and circle back with nothing to show.")
+        wood = gs.rng.loot.randint(1, 2)
+        gs.player.wood += wood
+    bus = bus or events.default()
+    if out or bus.enabled:
+        publish(bus, out, events.Foraged(food, seeds, wood))
 
-def do_repair(gs: GameState):
+def do_repair(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
     if gs.player.wood <= 0:
-        print("You have no wood to repair with.")
+        if out:
+            out("You have no wood to repair with.")
         return
 
     total_need = sum(f.max_hp - f.hp for f in gs.fences.values())
     if total_need <= 0:
-        print("All fences look sturdy already.")
+        if out:
+            out("All fences look sturdy already.")
         return
 
     # 1 wood = 2 HP repair
@@ -261,14 +237,18 @@ def do_repair(gs: GameState):
     wood_used = (repaired_total + 1) // 2  # round up partial use
     gs.player.wood -= wood_used
 
-    print(f"You spend {wood_used} wood to patch the fences.")
-    print(f"Total repair: +{repaired_total} HP across all sides.")
+    bus = bus or events.default()
+    if out or bus.enabled:
+        publish(bus, out, events.Repaired(wood_used, repaired_total))
 
-def do_rest(gs: GameState):
+def do_rest(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
     healed = gs.player.rest()
-    print(f"You rest by the hearth. HP +{healed}.")
+    bus = bus or events.default()
+    if out or bus.enabled:
+        publish(bus, out, events.Rested(healed))
 
-def do_tend_field(gs: GameState):
+def do_tend_field(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
+    bus = bus or events.default()
     state = getattr(gs, "field_state", "empty")
     if state == "empty":
         if gs.player.seeds > 0:
@@ -276,128 +256,263 @@ def do_tend_field(gs: GameState):
             gs.field_state = "planted"
             gs.field_timer = 3
             gs.field_watered = 0
-            print("You plant a seed in the soil.")
+            if out or bus.enabled:
+                publish(bus, out, events.Planted())
         else:
-            print("You have no seeds.")
+            if out:
+                out("You have no seeds.")
     elif state == "planted":
         gs.field_watered += 1
         gs.field_timer -= 1
-        print(f"You water the young crop (Day {3 - gs.field_timer}/3).")
         if gs.field_timer <= 0:
             gs.field_state = "ready"
-            print("Your crops are ready to harvest tomorrow!")
+        if out or bus.enabled:
+            publish(bus, out, events.Watered(3 - gs.field_timer, gs.field_state == "ready"))
     elif state == "ready":
         bonus = min(gs.field_watered, 3)
-        gained = random.randint(2, 4 + bonus)
+        gained = gs.rng.loot.randint(2, 4 + bonus)
         gs.player.food += gained
         gs.field_state = "empty"
-        print(f"You harvest {gained} food from your field. The soil rests.")
-
-def run_day(gs: GameState):
+        if out or bus.enabled:
+            publish(bus, out, events.Harvested(gained))
+
+DayPolicy = Callable[[GameState, int], str]
+
+def apply_day_choice(gs: GameState, choice: str, out: Out = print,
+                     src: Optional[CommandSource] = None, bus: Optional[Bus] = None) -> str:
+    """Perform one day-menu choice; "5 c2" crafts C2 without prompting.
+
+    Returns "acted", "end" (stop early) or "invalid".
+    """
+    choice, _, arg = choice.strip().partition(" ")
+    if choice == "1":
+        do_gather(gs, out, bus)
+    elif choice == "2":
+        do_forage(gs, out, bus)
+    elif choice == "3":
+        do_repair(gs, out, bus)
+    elif choice == "4":
+        do_rest(gs, out, bus)
+    elif choice == "5":
+        do_craft(gs, arg or None, out, src, bus)
+    elif choice == "6" and getattr(gs, "has_field", False):
+        do_tend_field(gs, out, bus)
+    elif choice == "7":
+        if out:
+            out("You decide to stop early and wait for dusk.")
+        return "end"
+    else:
+        if out:
+            out("Pick a number from the list.")
+        return "invalid"
+    return "acted"
+
+def play_day(gs: GameState, policy: DayPolicy, out: Out = None, bus: Optional[Bus] = None):
+    """Headless day: `policy(gs, actions_left)` picks every action."""
+    bus = bus or events.default()
+    bus.at(gs.day_num)
+    actions = gs.player.day_actions_per_day
+    while actions > 0:
+        outcome = apply_day_choice(gs, policy(gs, actions), out, bus=bus)
+        if outcome == "end":
+            break
+        actions -= 1  # invalid picks burn the action so a bad policy can't stall
+
+def steady_day_policy(gs: GameState, actions_left: int) -> str:
+    """A plain, sensible day: gather, arm up, then build and patch fences at dusk."""
+    wood = gs.player.wood
+    if gs.player.hp <= gs.player.max_hp // 2:
+        return "4"
+    if actions_left <= 2 and wood > 1 and any(f.hp < f.max_hp for f in gs.fences.values()):
+        return "3"
+    if "Spear" not in gs.upgrades and wood >= 7:
+        return "5 u1"
+    if actions_left <= 5 and wood >= gs.reinforce_cost + 7:
+        return "5 c1"
+    if actions_left == 3 and wood >= 7:
+        return "5 c2"
+    if gs.player.food < 2 and actions_left > 6:
+        return "2"
+    return "1"
+
+def run_day(gs: GameState, scr: Optional[Screen] = None, src: Optional[CommandSource] = None,
+            m: Optional[Metrics] = None, bus: Optional[Bus] = None):
+    scr = scr or screen.default()
+    src = src or commands.default()
+    m = m or metrics.default()
+    bus = bus or events.default()
+    bus.at(gs.day_num)
     actions = gs.player.day_actions_per_day
     hour = 6 + (14 - actions)
-    print(f"Current time: {hour:02d}:00")
+    scr.say(f"Current time: {hour:02d}:00")
     while actions > 0:
-        show_day_status(gs, actions)
-        choice = day_menu(gs)
-        consumed = True
-
-        if choice == "1":
-            do_gather(gs)
-        elif choice == "2":
-            do_forage(gs)
-        elif choice == "3":
-            do_repair(gs)
-        elif choice == "4":
-            do_rest(gs)
-        elif choice == "5":
-            do_craft(gs)
-        elif choice == "6" and getattr(gs, "has_field", False):
-            do_tend_field(gs)
-        elif choice == "7":
-            print("You decide to stop early and wait for dusk.")
+        show_day_status(gs, actions, scr)
+        choice = day_menu(gs, scr, src)
+        wood = gs.player.wood
+        outcome = apply_day_choice(gs, choice, scr.say if scr.active else None, src, bus)
+        if m.enabled and choice.strip() == "3":
+            m.inc("repair_wood", wood - gs.player.wood)
+        if outcome == "end":
             break
-        else:
-            print("Pick a number from the list.")
-            consumed = False
-
-        if consumed:
+        if outcome == "acted":
             actions -= 1
-            input("\n[Enter] Continue...")
+            src.pause("\n[Enter] Continue...")
 
-    print("\nDusk bleeds into night. The treeline begins to whisper...")
+    scr.say("\nDusk bleeds into night. The treeline begins to whisper...")
+    scr.flush()
 
-def morning_upkeep(gs: GameState):
+def morning_upkeep(gs: GameState, out: Out = print, bus: Optional[Bus] = None):
+    bus = bus or events.default()
+    bus.at(gs.day_num)
     # Small chance of weather decay
-    if random.random() < 0.25:
-        decay = random.randint(1, 2)
+    if gs.rng.weather.random() < 0.25:
+        decay = gs.rng.weather.randint(1, 2)
         for s in SIDES:
             f = gs.fence(s)
             if f.hp > 0:
                 f.hp = max(0, f.hp - decay)
-        print(f"\nFrost gnaws at the boards overnight. All standing fences -{decay} HP.")
+        if out or bus.enabled:
+            publish(bus, out, events.Frost(decay))
     # Consume 1 wood daily for the fire
     if gs.player.wood > 0:
         gs.player.wood -= 1
         gs.campfire_on = True
-        print("You feed the campfire with 1 wood. Its warmth keeps the night at bay.")
     else:
         gs.campfire_on = False
-        print("You have no wood for the campfire. The clearing will be dark tonight...")
+    if out or bus.enabled:
+        publish(bus, out, events.Campfire(gs.campfire_on))
     # Feast
+    dmg = 0
     if gs.player.food > 0:
         gs.player.food -= 1
-        print("You eat your morning meal. (-1 food)")
     else:
         dmg = 2
         gs.player.hp = max(0, gs.player.hp - dmg)
-        print("You have nothing to eat. You feel weaker. (-2 HP)")
+    if out or bus.enabled:
+        publish(bus, out, events.Meal(dmg == 0, dmg))
     gs.daily_wood_bonus_combo = 0
-    gs.player.update_stats(gs.day_num)
+    gs.player.update_stats(gs.day_num, gs.params)
+
+def play(gs: GameState, scr: Screen, src: CommandSource, autosave: bool = True,
+         m: Optional[Metrics] = None, hint: Optional[night.Hint] = None,
+         bus: Optional[Bus] = None, log: Optional[RunLog] = None) -> GameState:
+    """Day -> night -> dawn until the player falls. Metrics and events are flushed every dawn;
+    `log` gets each dusk."""
+    m = m or metrics.default()
+    bus = bus or events.default()
+    try:
+        while gs.alive:
+            run_day(gs, scr, src, m, bus)
+            if log is not None:
+                log.dusk(gs)
+            if not gs.alive:
+                break
+
+            night.run_night(gs, scr, src, m, hint, bus)
+            if not gs.alive:
+                break
+
+            gs.day_num += 1
+            t = m.clock() if m.enabled else 0.0
+            morning_upkeep(gs, scr.say if scr.active else None, bus)
+            if m.enabled:
+                m.lap("day_upkeep", t)
+            scr.flush()
+            # autosave at dawn
+            if autosave:
+                t = m.clock() if m.enabled else 0.0
+                save_game(gs, scr)
+                if m.enabled:
+                    m.lap("day_autosave", t)
+            m.flush()
+            bus.flush()
+            src.pause("\n[Enter] A new day breaks...")
+    finally:
+        m.flush()
+        bus.flush()
+    return gs
+
+def replay(path: str, scr: Optional[Screen] = None) -> GameState:
+    """Replay a recorded game from a fresh start, without pauses or saves."""
+    src = ScriptSource.from_file(path)
+    scr = scr or NullScreen()
+    gs = GameState(rng=GameRNG(src.seed))
+    intro(gs, scr, src)
+    try:
+        play(gs, scr, src, autosave=False)
+    except EOFError:
+        pass  # the recording stops mid-game
+    scr.flush()
+    return gs
 
-def main():
-    random.seed()
-    if os.path.exists(SAVE_FILE):
-        ans = input("Save file found. Continue? (Y/n): ").strip().lower()
+def main(record: Optional[str] = None, seed: Optional[int] = None, hints: bool = False,
+         archive: Optional[str] = ARCHIVE_DIR):
+    rng = GameRNG() if seed is None else GameRNG(seed)
+    scr = screen.make_screen(os.environ.get("CABIN_SCREEN"))
+    src: CommandSource = StdinSource(scr)
+    if record:
+        # recordings always start fresh so they can be replayed
+        src = Recorder(src, record, rng.seed)
+    if save_exists() and not record:
+        ans = src.read("Save file found. Continue? (Y/n): ").strip().lower()
         if ans != "n":
-            gs: GameState = load_game()
+            gs: GameState = load_game(scr)
         else:
-            gs: GameState = GameState()
-            intro(gs)
+            gs: GameState = GameState(rng=rng)
+            intro(gs, scr, src)
     else:
-        gs: GameState = GameState()
-        intro(gs)
+        gs: GameState = GameState(rng=rng)
+        intro(gs, scr, src)
 
-    while gs.alive:
-        run_day(gs)
-        if not gs.alive:
-            break
-
-        night.run_night(gs)
-        if not gs.alive:
-            break
+    log = RunLog(gs.rng.seed)
+    try:
+        play(gs, scr, src, autosave=not record, hint=SearchBot(budget=1.0).hint if hints else None,
+             log=log)
+    finally:
+        if isinstance(src, Recorder):
+            src.close()
 
-        gs.day_num += 1
-        morning_upkeep(gs)
-        # autosave at dawn
-        save_game(gs)
-        input("\n[Enter] A new day breaks...")
+    if archive:
+        try:
+            with Archive(archive) as a:
+                a.append(log.finish(gs))
+        except (OSError, ValueError) as e:
+            scr.say(f"(Run not archived: {e})")
 
     # delete save on death / game over
-    if os.path.exists(SAVE_FILE):
+    if save_exists() and not record:
         try:
-            os.remove(SAVE_FILE)
-            print("(Save deleted.)")
+            delete_save()
+            scr.say("(Save deleted.)")
         except OSError:
             pass
 
-    print(DIV)
-    print("You collapse against the cold earth. The forest exhales.")
-    print(f"You survived until Day {gs.day_num}.")
-    print("Thanks for playing this prototype.")
+    scr.say(game_over_text(gs))
+    scr.flush()
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        print("\n\nYou bar the cabin door and rest, for now.")
\ No newline at end of file
+    import argparse
+    ap = argparse.ArgumentParser(description="Cabin in the clearing.")
+    ap.add_argument("--seed", type=int, help="RNG seed for this game")
+    ap.add_argument("--record", metavar="FILE", help="record commands (and seed) to FILE")
+    ap.add_argument("--replay", metavar="FILE", help="replay a recording at full speed")
+    ap.add_argument("--show", action="store_true", help="print the replay instead of running it silently")
+    ap.add_argument("--hints", action="store_true", help="offer a search bot's advice at night ('?')")
+    ap.add_argument("--metrics-jsonl", metavar="FILE", help="append phase timings and counters to FILE")
+    ap.add_argument("--metrics-prom", metavar="FILE", help="keep FILE updated in Prometheus text format")
+    ap.add_argument("--events-jsonl", metavar="FILE", help="append every game event to FILE as JSON lines")
+    ap.add_argument("--archive", metavar="DIR", default=ARCHIVE_DIR,
+                    help=f"append the finished run to the archive in DIR (default {ARCHIVE_DIR}; '' for none)")
+    args = ap.parse_args()
+    metrics.configure(args.metrics_jsonl, args.metrics_prom)
+    events.configure(args.events_jsonl)
+    if args.replay:
+        gs = replay(args.replay, screen.make_screen("plain") if args.show else None)
+        state = "alive" if gs.alive else "fallen"
+        print(f"Replayed to Day {gs.day_num} ({state}). HP {gs.player.hp}/{gs.player.max_hp}, "
+              f"wood {gs.player.wood}, food {gs.player.food}.")
+    else:
+        try:
+            main(args.record, args.seed, args.hints, args.archive)
+        except KeyboardInterrupt:
+            print("\n\nYou bar the cabin door and rest, for now.")
@@ -0,0 +1,163 @@
+# metrics.py
+# Phase timings and counters.
+#
+# Code that wants to be measured takes a Metrics (default: default(), a
+# NullMetrics) and guards its hooks with `if m.enabled:`, the same way
+# screen output checks `scr.active`. Disabled, a hook costs one attribute
+# test. Enabled:
+#
+#   t = m.clock()
+#   ...phase...
+#   t = m.lap("night_spawn", t)    # observe the phase, start timing the next
+#   m.inc("enemies_spawned", n)
+#
+# flush() hands the current totals to every exporter: JSON lines (one
+# snapshot per flush, appended) or a Prometheus text file (rewritten).
+from __future__ import annotations
+import bisect
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+# upper bounds in seconds; everything slower lands in +Inf
+BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+class Metrics:
+    enabled = True
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self, exporters: Sequence["Exporter"] = ()):
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.exporters = list(exporters)
+
+    def inc(self, name: str, n: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Histogram()
+        h.observe(seconds)
+
+    def lap(self, name: str, start: float) -> float:
+        """Observe the time since `start` under `name`; returns now."""
+        now = self.clock()
+        self.observe(name, now - start)
+        return now
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: {"buckets": list(h.bounds), "counts": list(h.counts),
+                                  "sum": h.sum, "count": h.count}
+                           for name, h in self.histograms.items()},
+        }
+
+    def flush(self):
+        for ex in self.exporters:
+            ex.export(self)
+
+class NullMetrics(Metrics):
+    enabled = False
+
+    def inc(self, name: str, n: float = 1):
+        pass
+
+    def observe(self, name: str, seconds: float):
+        pass
+
+    def flush(self):
+        pass
+
+class Exporter(ABC):
+    @abstractmethod
+    def export(self, m: Metrics):
+        ...
+
+class JsonlExporter(Exporter):
+    """Appends one {"ts": ..., "counters": ..., "histograms": ...} line per flush."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, m: Metrics):
+        rec = {"ts": round(time.time(), 3), **m.snapshot()}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+def _le(bound: float) -> str:
+    return repr(float(bound))
+
+class PrometheusExporter(Exporter):
+    """Rewrites `path` in the Prometheus text format (e.g. for node_exporter's textfile collector)."""
+
+    def __init__(self, path: str, prefix: str = "cabin_"):
+        self.path = path
+        self.prefix = prefix
+
+    def render(self, m: Metrics) -> str:
+        lines = []
+        for name in sorted(m.counters):
+            full = f"{self.prefix}{name}_total"
+            lines.append(f"# TYPE {full} counter")
+            lines.append(f"{full} {m.counters[name]}")
+        for name in sorted(m.histograms):
+            h = m.histograms[name]
+            full = f"{self.prefix}{name}_seconds"
+            lines.append(f"# TYPE {full} histogram")
+            cum = h.cumulative()
+            for bound, c in zip(h.bounds, cum):
+                lines.append(f'{full}_bucket{{le="{_le(bound)}"}} {c}')
+            lines.append(f'{full}_bucket{{le="+Inf"}} {cum[-1]}')
+            lines.append(f"{full}_sum {h.sum}")
+            lines.append(f"{full}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, m: Metrics):
+        # scrapers must never see a half-written file
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render(m))
+        os.replace(tmp, self.path)
+
+NULL = NullMetrics()
+
+_default: Metrics = NULL
+
+def default() -> Metrics:
+    return _default
+
+def configure(jsonl: Optional[str] = None, prom: Optional[str] = None) -> Metrics:
+    """Make default() a live Metrics exporting to the given files (NULL if neither)."""
+    global _default
+    exporters: List[Exporter] = []
+    if jsonl:
+        exporters.append(JsonlExporter(jsonl))
+    if prom:
+        exporters.append(PrometheusExporter(prom))
+    _default = Metrics(exporters) if exporters else NULL
+    return _default
@@ -1,162 +1,202 @@
 # night.py
 from __future__ import annotations
 import random
-from typing import Dict, List, Tuple
-from entities import GameState, Enemy, SIDES, scaled_enemy
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from difficulty import DEFAULT, Difficulty
+from entities import GameState, EnemyQueue, EnemyStacks, ENEMY_POOL, SIDES, scaled_enemy
+import commands
+from commands import CommandSource
+import events
+from events import Bus, publish
+import metrics
+from metrics import Metrics
+import screen
+from screen import Screen
 
 DIV = "\n" + "=" * 56 + "\n"
 
-def _spawn_pattern(day: int, current_enemies: int, max_alive: int) -> List[Tuple[str, int]]:
+TURNS = 20  # 10 hours * 2 turns/hour
+MAX_FREE_ACTIONS = 8  # headless guard: non-consuming choices allowed per turn
+HORDE_DAY = 50  # from here on, sides hold count-compressed stacks
+
+Queues = Dict[str, Union[EnemyQueue, EnemyStacks]]
+Policy = Callable[[GameState, Queues], str]
+Hint = Callable[[GameState, Queues, int], str]  # (gs, queues, turn) -> advice, e.g. bot.SearchBot.hint
+Out = Optional[Callable[[str], None]]
+
+def _spawn_pattern(day: int, current_enemies: int, max_alive: int, rng=random,
+                   params: Difficulty = DEFAULT) -> List[Tuple[str, int]]:
     if current_enemies >= max_alive:
         return []
-    day_clamped = min(day, 10)
-    spawn_chance = min(0.35 + day_clamped * 0.05, 0.85)
-    per_spawn = 1 if day < 3 else 2 if day < 6 else 3
-    if random.random() > spawn_chance:
+    spawn_chance, per_spawn, groups = params.wave(day)
+    if rng.random() > spawn_chance:
         return []
 
-    groups = 1 if day < 3 else 2 if day < 7 else 3
     result = []
     remaining_slots = max_alive - current_enemies
     for _ in range(groups):
         if remaining_slots <= 0:
             break
-        side = random.choice(SIDES)
+        side = rng.choice(SIDES)
         count = min(per_spawn, remaining_slots)
         result.append((side, count))
         remaining_slots -= count
     return result
 
-def _print_board(gs: GameState, enemy_queues: Dict[str, List[Enemy]], turn: int):
+def _print_board(gs: GameState, enemy_queues: Queues, turn: int, scr: Optional[Screen] = None):
+    scr = scr or screen.default()
+    if not scr.active:
+        return
     hour = 20 + turn * 0.5
     if hour >= 24:
         hour -= 24
     clock = f"{int(hour):02d}:{'30' if hour % 1 else '00'}"
 
-    print(DIV)
+    lines = [DIV]
     mode = "🏰 Tower Mode" if gs.in_tower else "🛡️ Ground Mode"
     side = f"covering {gs.player.side}" if gs.in_tower else f"at {gs.player.side}"
-    print(f" NIGHT — Day {gs.day_num} | {mode} ({side})")
-    print(f" You are defending: [{gs.player.side}]   HP {gs.player.hp}/{gs.player.max_hp}")
-    print(" Fences:")
+    lines.append(f" NIGHT — Day {gs.day_num} | {mode} ({side})")
+    lines.append(f" You are defending: [{gs.player.side}]   HP {gs.player.hp}/{gs.player.max_hp}")
+    lines.append(" Fences:")
     for s in SIDES:
         f = gs.fence(s)
         fence_bar = f"{f.hp:02d}/{f.max_hp}"
         q = enemy_queues[s]
-        q_str = ", ".join(f"{e.name}({e.hp})" if gs.campfire_on else "? (?)" for e in q) if q else "—"
-        print(f"  {s:<5} | Fence {fence_bar} | Enemies: {q_str}")
-    print(DIV)
+        q_str = ", ".join((f"{e.name}({e.hp})" if gs.campfire_on else "? (?)")
+                          + (f"x{e.count}" if e.count > 1 else "") for e in q) if q else "—"
+        lines.append(f"  {s:<5} | Fence {fence_bar} | Enemies: {q_str}")
+    lines.append(DIV)
+    scr.frame(lines)
 
-def _player_menu(gs) -> str:
-    print("Choose your action:")
+def _menu_text(gs) -> str:
+    lines = ["Choose your action:"]
 
     if gs.in_tower:
-        print(" [Tower Mode]")
-        print(" 1) Cover North (0 turns)")
-        print(" 2) Cover East  (0 turns)")
-        print(" 3) Cover South (0 turns)")
-        print(" 4) Cover West  (0 turns)")
+        lines.append(" [Tower Mode]")
+        lines.append(" 1) Cover North (0 turns)")
+        lines.append(" 2) Cover East  (0 turns)")
+        lines.append(" 3) Cover South (0 turns)")
+        lines.append(" 4) Cover West  (0 turns)")
     else:
-        print(" 1) Move North")
-        print(" 2) Move East")
-        print(" 3) Move South")
-        print(" 4) Move West")
-
-    print(" 5) Attack")
-    print(" 6) Defend")
-    print(" 7) Wait")
+        lines.append(" 1) Move North")
+        lines.append(" 2) Move East")
+        lines.append(" 3) Move South")
+        lines.append(" 4) Move West")
+
+    lines.append(" 5) Attack")
+    lines.append(" 6) Defend")
+    lines.append(" 7) Wait")
     if gs.has_watchtower:
         if not gs.in_tower:
-            print(" 8) Climb tower (1 turn)")
+            lines.append(" 8) Climb tower (1 turn)")
         else:
-            print(" 8) Climb down (1 turn)")
-    return input("> ").strip()
+            lines.append(" 8) Climb down (1 turn)")
+    return "\n".join(lines)
+
+def _player_menu(gs, scr: Optional[Screen] = None, src: Optional[CommandSource] = None,
+                 hints: bool = False) -> str:
+    scr = scr or screen.default()
+    if scr.active:
+        scr.say(_menu_text(gs) + ("\n ?) Hint" if hints else ""))
+    return (src or commands.default()).read("> ").strip()
 
-def _resolve_player_action(gs: GameState, enemy_queues: Dict[str, List[Enemy]]) -> bool:
+def _resolve_player_action(gs: GameState, enemy_queues: Queues, choice: str, out: Out = None,
+                           bus: Bus = events.NULL) -> bool:
     gs.player.defending = False
-    choice = _player_menu(gs)
     # Tower cover / movement handling
     if choice in ("1", "2", "3", "4"):
         target = {"1": "North", "2": "East", "3": "South", "4": "West"}[choice]
         if gs.in_tower:
             # Instantly switch focus side
             gs.player.side = target
-            print(f"You pivot your bow toward the {target} side. (No time lost)")
+            if out:
+                out(f"You pivot your bow toward the {target} side. (No time lost)")
             return False  # does NOT consume a turn
         else:
             # normal ground movement
             if gs.player.side == target:
-                print(f"You're already at the {target} fence.")
+                if out:
+                    out(f"You're already at the {target} fence.")
                 return False
             gs.player.side = target
-            print(f"You dash to the {target} side.")
+            if out:
+                out(f"You dash to the {target} side.")
             return True
 
     if choice == "5":
         side = gs.player.side  # whatever you’re covering
         q = enemy_queues[side]
         if not q:
-            print(f"No enemies on {side}.")
+            if out:
+                out(f"No enemies on {side}.")
             return True
         if gs.has_bow and gs.arrows > 0 and gs.in_tower:
-            target = min(q, key=lambda e: e.hp)
-            dmg = gs.player.damage + random.randint(0, 2)
-            target.hp = max(0, target.hp - dmg)
+            dmg = gs.player.damage + gs.rng.combat.randint(0, 2)
+            name, left = q.strike(dmg)
             gs.arrows -= 1
-            print(f"🏹 You loose an arrow at the {target.name} ({side}) for {dmg}! "
-                  f"{gs.arrows} arrows left.")
-            if target.hp <= 0:
-                q.remove(target)
-                print(f"The {target.name} falls.")
+            if out or bus.enabled:
+                publish(bus, out, events.Struck(side, name, dmg, True, gs.arrows))
+                if left <= 0:
+                    publish(bus, out, events.Killed(side, name, True))
             return True
 
         # --- MELEE FALLBACK ---
-        target = min(q, key=lambda e: e.hp)
-        dmg = gs.player.damage + random.randint(0, 2)
-        target.hp = max(0, target.hp - dmg)
-        print(f"You strike the {target.name} for {dmg} damage!")
-        if target.hp <= 0:
-            print(f"The {target.name} collapses.")
-            q.remove(target)
+        dmg = gs.player.damage + gs.rng.combat.randint(0, 2)
+        name, left = q.strike(dmg)
+        if out or bus.enabled:
+            publish(bus, out, events.Struck(side, name, dmg, False, gs.arrows))
+            if left <= 0:
+                publish(bus, out, events.Killed(side, name, False))
         return True
 
     if choice == "6":
         if gs.has_watchtower and gs.in_tower:
-            print("You cannot defend while in the watchtower — you’re too far from the fences!")
+            if out:
+                out("You cannot defend while in the watchtower — you’re too far from the fences!")
             return False
         gs.player.defending = True
-        print(f"You brace against the {gs.player.side} fence.")
+        if out:
+            out(f"You brace against the {gs.player.side} fence.")
         return True
 
     if choice == "7":
-        print("You steady your breath...")
+        if out:
+            out("You steady your breath...")
         return True
 
     if choice == "8" and gs.has_watchtower:
         if not gs.in_tower:
             gs.in_tower = True
-            print("You climb the tower, gaining full sight of the battlefield.")
+            if out:
+                out("You climb the tower, gaining full sight of the battlefield.")
         else:
             gs.in_tower = False
-            print("You climb down to the ground, ready to defend the fences again.")
+            if out:
+                out("You climb down to the ground, ready to defend the fences again.")
         return True  # consumes a turn
 
-    print("Invalid choice.")
+    if out:
+        out("Invalid choice.")
     return False
 
-def _enemies_attack(gs: GameState, enemy_queues: Dict[str, List[Enemy]]):
+def _enemies_attack(gs: GameState, enemy_queues: Queues, out: Out = None,
+                    bus: Bus = events.NULL) -> int:
+    """Each non-empty side strikes once. Returns the number of breaches."""
+    breaches = 0
     for side in SIDES:
         q = enemy_queues[side]
         if not q:
             continue
-        attacker = random.choice(q)
+        attacker = q.choice(gs.rng.combat)
         fence = gs.fence(side)
         if fence.is_up():
             dmg = attacker.dmg
             if gs.defense_bonus > 0:
                 dmg = int(dmg * (1 - gs.defense_bonus))
             fence.hp = max(0, fence.hp - dmg)
-            print(f"{attacker.name} batters the {side} fence (-{dmg}).")
+            if out or bus.enabled:
+                publish(bus, out, events.FenceHit(side, attacker.name, dmg))
         else:
             dmg = attacker.dmg
             if gs.player.side == side and gs.player.defending:
@@ -164,64 +204,224 @@ def _enemies_attack(gs: GameState, enemy_queues: Dict[str, List[Enemy]]):
             if gs.has_watchtower and gs.in_tower:
                 dmg += 1  # extra damage if exposed in tower
             gs.player.hp = max(0, gs.player.hp - dmg)
-            print(f"{attacker.name} breaches {side}! You take {dmg} damage.")
+            breaches += 1
+            if out or bus.enabled:
+                publish(bus, out, events.Breach(side, attacker.name, dmg))
+    return breaches
 
-def run_night(gs: GameState):
-    turns = 20  # 10 hours * 2 turns/hour
-    enemy_queues: Dict[str, List[Enemy]] = {s: [] for s in SIDES}
-    gs.player.side = "North"
+@dataclass
+class NightResult:
+    survived: bool = True
+    turns: int = 0
+    spawned: int = 0
+    trap_kills: int = 0
+    kills: int = 0
+    breaches: int = 0
+    arrows_spent: int = 0
+    damage_taken: int = 0
+    fences: Dict[str, int] = field(default_factory=dict)
 
-    print("\nNight falls. The treeline rustles with unseen steps...")
-    # Decide whether to climb the tower (if built)
-    if gs.has_watchtower:
-        ans = input("Do you want to start the night in the watchtower? (y/N): ").strip().lower()
-        gs.in_tower = (ans == "y")
-        if gs.in_tower:
-            print("You climb the tower, bow ready. You’ll shoot from above but can’t defend.")
-        else:
-            print("You remain on the ground, near the fences.")
-    else:
-        gs.in_tower = False
+class Night:
+    """Turn-resolution engine for one night, free of terminal I/O.
+
+    Drive it with begin_turn() / act(choice) / end_turn(), or let
+    simulate_night() do it with a policy. Messages go to `out` if given.
+    Horde nights (default: from HORDE_DAY on) keep each side as EnemyStacks.
+    Phase timings and tallies go to `m` (default: metrics.default()), game
+    events to `bus` (default: events.default()).
+    """
 
-    for t in range(1, turns + 1):
-        current_alive = sum(len(q) for q in enemy_queues.values())
-        max_alive = int(3 + gs.day_num * 1.2)
+    def __init__(self, gs: GameState, out: Out = None, in_tower: bool = False,
+                 horde: Optional[bool] = None, m: Optional[Metrics] = None,
+                 bus: Optional[Bus] = None):
+        self.gs = gs
+        self.out = out
+        self.metrics = m or metrics.default()
+        self.bus = bus or events.default()
+        self.horde = gs.day_num >= HORDE_DAY if horde is None else horde
+        self._queue_type = EnemyStacks if self.horde else EnemyQueue
+        self.enemy_queues: Queues = {s: self._queue_type() for s in SIDES}
+        self.turn = 0
+        self.result = NightResult()
+        gs.player.side = "North"
+        gs.in_tower = gs.has_watchtower and in_tower
+
+    @property
+    def over(self) -> bool:
+        return not self.gs.alive or self.turn >= TURNS
+
+    def begin_turn(self):
+        """Advance the clock, spawn the next wave and spring traps on it."""
+        gs, out, m, bus = self.gs, self.out, self.metrics, self.bus
+        t = m.clock() if m.enabled else 0.0
+        self.turn += 1
+        gs.rng.at_turn(gs.day_num, self.turn)
+        if bus.enabled:
+            bus.at(gs.day_num, self.turn)
+        current_alive = sum(len(q) for q in self.enemy_queues.values())
+        params = gs.params
+        max_alive = params.alive_cap(gs.day_num)
 
         new_batch = []
-        for side, count in _spawn_pattern(gs.day_num, current_alive, max_alive):
+        spawn = gs.rng.spawn
+        for side, count in _spawn_pattern(gs.day_num, current_alive, max_alive, spawn, params):
+            if bus.enabled:
+                bus.emit(events.Spawned(side, count))
             for _ in range(count):
-                e = scaled_enemy(gs.day_num, side)
-                enemy_queues[side].append(e)
+                e = scaled_enemy(gs.day_num, side, spawn, params)
+                self.enemy_queues[side].push(e)
                 new_batch.append(e)
+        self.result.spawned += len(new_batch)
+        if m.enabled:
+            t = m.lap("night_spawn", t)
 
         # trap trigger per batch
+        victims = []
         if new_batch and gs.traps > 0:
-            kills = random.randint(2, 4)
-            victims = random.sample(new_batch, min(kills, len(new_batch)))
+            kills = gs.rng.combat.randint(*params.trap_kills)
+            victims = gs.rng.combat.sample(new_batch, min(kills, len(new_batch)))
             for e in victims:
-                enemy_queues[e.side].remove(e)
+                self.enemy_queues[e.side].remove(e)
+                ENEMY_POOL.release(e)
             gs.traps -= 1
-            print(f"Your traps snap! {len(victims)} creatures from the new wave are slain.")
+            self.result.trap_kills += len(victims)
+            if out or bus.enabled:
+                publish(bus, out, events.TrapSprung(len(victims)))
+        if not self._queue_type.owns_enemies:
+            for e in new_batch:
+                if e not in victims:
+                    ENEMY_POOL.release(e)
+        if m.enabled:
+            m.lap("night_traps", t)
 
-        _print_board(gs, enemy_queues, t)
+    def act(self, choice: str) -> bool:
+        """Apply one player choice. Returns True if it consumed the turn."""
+        m = self.metrics
+        t = m.clock() if m.enabled else 0.0
+        arrows, alive = self.gs.arrows, sum(len(q) for q in self.enemy_queues.values())
+        acted = _resolve_player_action(self.gs, self.enemy_queues, choice, self.out, self.bus)
+        self.result.arrows_spent += arrows - self.gs.arrows
+        self.result.kills += alive - sum(len(q) for q in self.enemy_queues.values())
+        if m.enabled:
+            m.lap("night_action", t)
+        return acted
 
-        acted = False
-        while not acted:
-            acted = _resolve_player_action(gs, enemy_queues)
+    def end_turn(self):
+        """Enemies strike, then the dead are cleared from the queues."""
+        gs, m = self.gs, self.metrics
+        t = m.clock() if m.enabled else 0.0
+        hp = gs.player.hp
+        self.result.breaches += _enemies_attack(gs, self.enemy_queues, self.out, self.bus)
+        self.result.damage_taken += hp - gs.player.hp
+        if m.enabled:
+            t = m.lap("night_attack", t)
         if gs.player.hp <= 0:
             gs.alive = False
-            break
+            return
+        for q in self.enemy_queues.values():
+            for e in q.prune():
+                ENEMY_POOL.release(e)
+        if m.enabled:
+            m.lap("night_cleanup", t)
+
+    def finish(self) -> NightResult:
+        gs, res, bus = self.gs, self.result, self.bus
+        res.survived = gs.alive
+        res.turns = self.turn
+        if gs.alive:
+            healed = 2
+            gs.player.hp = min(gs.player.max_hp, gs.player.hp + healed)
+            if self.out or bus.enabled:
+                publish(bus, self.out, events.Dawn(healed))
+        if bus.enabled:
+            bus.emit(events.NightEnded(res.survived, res.turns))
+        res.fences = {s: f.hp for s, f in gs.fences.items()}
+        # hand the survivors of the night back to the pool
+        if self._queue_type.owns_enemies:
+            for q in self.enemy_queues.values():
+                for e in q:
+                    ENEMY_POOL.release(e)
+        self.enemy_queues = {s: self._queue_type() for s in SIDES}
+        m = self.metrics
+        if m.enabled:
+            m.inc("nights")
+            m.inc("enemies_spawned", res.spawned)
+            m.inc("trap_kills", res.trap_kills)
+            m.inc("breaches", res.breaches)
+            m.inc("arrows_spent", res.arrows_spent)
+        return res
+
+def greedy_policy(gs: GameState, enemy_queues: Queues) -> str:
+    """Hit whatever is on our side, otherwise go where the crowd is."""
+    if enemy_queues[gs.player.side]:
+        return "5"
+    busiest = max(SIDES, key=lambda s: len(enemy_queues[s]))
+    if not enemy_queues[busiest]:
+        return "7"
+    return str(SIDES.index(busiest) + 1)
 
-        _enemies_attack(gs, enemy_queues)
+def simulate_night(gs: GameState, policy: Policy = greedy_policy, out: Out = None,
+                   in_tower: bool = False,
+                   on_turn: Optional[Callable[[GameState, Queues, int], None]] = None,
+                   horde: Optional[bool] = None, m: Optional[Metrics] = None,
+                   bus: Optional[Bus] = None,
+                   max_free: Optional[int] = MAX_FREE_ACTIONS) -> NightResult:
+    """Play a whole night with `policy` choosing each action.
+
+    A policy that makes `max_free` choices in a row without using the turn
+    (moves onto its own side, unknown input...) forfeits it; None lets it
+    keep choosing, for a human at the prompt."""
+    night = Night(gs, out, in_tower, horde, m, bus)
+    while not night.over:
+        night.begin_turn()
+        if on_turn:
+            on_turn(gs, night.enemy_queues, night.turn)
+        acted = False
+        tries = 0
+        while not acted:
+            acted = night.act(policy(gs, night.enemy_queues))
+            tries += 1
+            if not acted and max_free is not None and tries >= max_free:
+                break  # a policy stuck on free actions forfeits the turn
         if gs.player.hp <= 0:
             gs.alive = False
             break
+        night.end_turn()
+    return night.finish()
+
+def run_night(gs: GameState, scr: Optional[Screen] = None, src: Optional[CommandSource] = None,
+              m: Optional[Metrics] = None, hint: Optional[Hint] = None, bus: Optional[Bus] = None):
+    scr = scr or screen.default()
+    src = src or commands.default()
+    m = m or metrics.default()
+    scr.say("\nNight falls. The treeline rustles with unseen steps...")
+    # Decide whether to climb the tower (if built)
+    in_tower = False
+    if gs.has_watchtower:
+        ans = src.read("Do you want to start the night in the watchtower? (y/N): ").strip().lower()
+        in_tower = (ans == "y")
+        if in_tower:
+            scr.say("You climb the tower, bow ready. You’ll shoot from above but can’t defend.")
+        else:
+            scr.say("You remain on the ground, near the fences.")
+
+    now = 0
+
+    def ask(gs: GameState, enemy_queues: Queues) -> str:
+        while True:
+            choice = _player_menu(gs, scr, src, hint is not None)
+            if choice != "?" or hint is None:
+                return choice
+            scr.say(hint(gs, enemy_queues, now))
 
-        for s in SIDES:
-            enemy_queues[s] = [e for e in enemy_queues[s] if e.alive()]
+    def board(gs: GameState, enemy_queues: Queues, turn: int):
+        nonlocal now
+        now = turn
+        t = m.clock() if m.enabled else 0.0
+        _print_board(gs, enemy_queues, turn, scr)
+        if m.enabled:
+            m.lap("night_board", t)
 
-    if gs.alive:
-        print("\nA gray thread of light touches the treetops. Dawn.")
-        healed = 2
-        gs.player.hp = min(gs.player.max_hp, gs.player.hp + healed)
-        print(f"You patch wounds and breathe deep. HP +{healed}.")
\ No newline at end of file
+    simulate_night(gs, ask, out=scr.say if scr.active else None, in_tower=in_tower,
+                   on_turn=board, m=m, bus=bus, max_free=None)
+    scr.flush()
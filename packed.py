@@ -0,0 +1,161 @@
+# packed.py
+# GameState as a flat tuple of ints, for look-ahead.
+#
+# snapshot(gs) packs every field into a fixed layout (NAMES gives the slot
+# labels, INDEX the slot of each): counters as they are, the player's side
+# and the field state as small codes, the booleans and the upgrades set as
+# bitflags, defense_bonus as its float bits, and the RNG positions.
+# restore(gs, snap) writes them back into an existing GameState, so a
+# simulator can branch from a position without copy.deepcopy:
+#
+#   log = UndoLog(gs)
+#   log.mark()          # before a what-if
+#   ...play a turn...
+#   log.undo()          # back where we were
+#
+# state_hash(snap) is the same in every process, unlike hash() on objects
+# holding strings. Enemy queues live outside GameState and are not packed,
+# nor is gs.params (the difficulty, fixed for a game).
+from __future__ import annotations
+import dataclasses
+import hashlib
+import struct
+from operator import attrgetter
+from typing import Dict, List, Tuple
+
+from entities import GameState, Player, SIDES
+import recipes
+
+Snapshot = Tuple[int, ...]
+
+STATE_INTS = ("day_num", "reinforce_cost", "traps", "field_timer", "field_watered",
+              "daily_wood_bonus_combo", "arrows")
+PLAYER_INTS = ("base_hp", "base_damage", "wood", "food", "seeds", "day_actions_per_day",
+               "gather_bonus", "max_hp", "hp", "damage")
+FLAGS = ("alive", "campfire_on", "has_field", "has_bow", "has_watchtower", "in_tower")
+DEFENDING = 1 << len(FLAGS)  # player.defending, after the GameState flags
+STREAMS = ("spawn", "combat", "loot", "weather")
+
+# Codes are places in these fixed tables, the same in every process. A value
+# outside them has no code: snapshot() raises rather than number it by the
+# order this process happened to meet it in.
+PLAYER_SIDES = ("Center", *SIDES)
+FIELD_STATES = ("empty", "planted", "ready")
+UPGRADES = tuple(r.name for r in recipes.UPGRADES)  # bit i = UPGRADES[i], as recipes.BIT
+_CODES: Dict[int, Dict[str, int]] = {id(t): {v: i for i, v in enumerate(t)}
+                                     for t in (PLAYER_SIDES, FIELD_STATES, UPGRADES)}
+
+def _code(table: Tuple[str, ...], value: str) -> int:
+    i = _CODES[id(table)].get(value)
+    if i is None:
+        raise ValueError(f"cannot pack {value!r}: not one of {table}")
+    return i
+
+_f64 = struct.Struct("<d")
+_u64 = struct.Struct("<Q")
+
+def _float_bits(x: float) -> int:
+    return _u64.unpack(_f64.pack(x))[0]
+
+def _bits_float(n: int) -> float:
+    return _f64.unpack(_u64.pack(n))[0]
+
+NAMES: Tuple[str, ...] = (
+    *STATE_INTS,
+    *(f"player.{n}" for n in PLAYER_INTS),
+    *(f"fences.{s}.{n}" for s in SIDES for n in ("hp", "max_hp")),
+    "player.side", "field_state", "flags", "upgrades", "defense_bonus",
+    "rng.seed", *(f"rng.{s}.{n}" for s in STREAMS for n in ("key", "counter")),
+)
+INDEX: Dict[str, int] = {n: i for i, n in enumerate(NAMES)}
+SIZE = len(NAMES)
+
+_P0 = len(STATE_INTS)
+_F0 = _P0 + len(PLAYER_INTS)
+_X0 = _F0 + 2 * len(SIDES)  # side, field state, flags, upgrades, defense bits
+_R0 = _X0 + 5
+
+_state_ints = attrgetter(*STATE_INTS)
+_player_ints = attrgetter(*PLAYER_INTS)
+
+# every GameState / Player field must have a slot (params is constant over a
+# game and left as it is)
+_PACKED = {"GameState": set(STATE_INTS) | set(FLAGS) | {"player", "fences", "field_state", "upgrades",
+                                                         "defense_bonus", "rng", "params"},
+           "Player": set(PLAYER_INTS) | {"defending", "side"}}
+for _cls in (GameState, Player):
+    _missing = {f.name for f in dataclasses.fields(_cls)} - _PACKED[_cls.__name__]
+    if _missing:
+        raise TypeError(f"packed.py has no slot for {_cls.__name__}.{sorted(_missing)}")
+
+def snapshot(gs: GameState) -> Snapshot:
+    p, r = gs.player, gs.rng
+    flags = DEFENDING if p.defending else 0
+    for bit, name in enumerate(FLAGS):
+        if getattr(gs, name):
+            flags |= 1 << bit
+    ups = 0
+    for u in gs.upgrades:
+        ups |= 1 << _code(UPGRADES, u)
+    fences = gs.fences
+    return (*_state_ints(gs), *_player_ints(p),
+            *(v for s in SIDES for v in (fences[s].hp, fences[s].max_hp)),
+            _code(PLAYER_SIDES, p.side), _code(FIELD_STATES, gs.field_state), flags, ups,
+            _float_bits(gs.defense_bonus),
+            r.seed, r.spawn.key, r.spawn.counter, r.combat.key, r.combat.counter,
+            r.loot.key, r.loot.counter, r.weather.key, r.weather.counter)
+
+def restore(gs: GameState, snap: Snapshot) -> GameState:
+    """Make gs equal to the snapshot, in place. Returns gs."""
+    if len(snap) != SIZE:
+        raise ValueError(f"snapshot has {len(snap)} slots, expected {SIZE}")
+    p, r = gs.player, gs.rng
+    for name, v in zip(STATE_INTS, snap):
+        setattr(gs, name, v)
+    for name, v in zip(PLAYER_INTS, snap[_P0:_F0]):
+        setattr(p, name, v)
+    for i, s in enumerate(SIDES):
+        f = gs.fences[s]
+        f.hp, f.max_hp = snap[_F0 + 2 * i], snap[_F0 + 2 * i + 1]
+    side, fstate, flags, ups, defense = snap[_X0:_R0]
+    p.side = PLAYER_SIDES[side]
+    gs.field_state = FIELD_STATES[fstate]
+    for bit, name in enumerate(FLAGS):
+        setattr(gs, name, bool(flags >> bit & 1))
+    p.defending = bool(flags & DEFENDING)
+    gs.upgrades.clear()
+    gs.upgrades.update(u for i, u in enumerate(UPGRADES) if ups >> i & 1)
+    gs.defense_bonus = _bits_float(defense)
+    r.seed = snap[_R0]
+    for i, name in enumerate(STREAMS):
+        getattr(r, name).seek(snap[_R0 + 1 + 2 * i], snap[_R0 + 2 + 2 * i])
+    return gs
+
+def state_hash(snap: Snapshot) -> int:
+    """64-bit hash of a snapshot, stable across runs and processes."""
+    return int.from_bytes(hashlib.blake2b(repr(snap).encode(), digest_size=8).digest(), "little")
+
+def diff(a: Snapshot, b: Snapshot) -> Dict[str, Tuple[int, int]]:
+    """Slots that differ, by name: {"player.wood": (5, 3), ...} (codes and bits left packed)."""
+    return {NAMES[i]: (x, y) for i, (x, y) in enumerate(zip(a, b)) if x != y}
+
+class UndoLog:
+    """Nested rollback points for one GameState."""
+
+    def __init__(self, gs: GameState):
+        self.gs = gs
+        self._marks: List[Snapshot] = []
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+    def mark(self):
+        self._marks.append(snapshot(self.gs))
+
+    def undo(self):
+        """Roll back to the latest mark and drop it."""
+        restore(self.gs, self._marks.pop())
+
+    def keep(self):
+        """Drop the latest mark, keeping the changes made since."""
+        self._marks.pop()
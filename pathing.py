@@ -0,0 +1,191 @@
+# pathing.py
+# Flow fields toward the cabin, for enemies that walk the clearing.
+#
+# This is the layer positional enemies are to step by; night.py does not
+# consult it yet (its enemies still live in per-side queues).
+#
+# A FlowField holds, for every cell of a world.TileMap (flat index
+# y * width + x), the cost of the cheapest walk from there to the cabin and
+# the neighbor to step to next. Moving an enemy is then one lookup:
+#
+#   field = flow_field()                 # cached per map
+#   field.sync_fences(gs)                # after fences break or are mended
+#   positions, blocked = field.advance(positions)
+#
+# Costs: standing on ground or the cabin costs 1, on a broken fence 1, and
+# an intact fence FENCE_COST (the turns spent battering it), so enemies
+# still head for the cheapest wall when the cabin is sealed off. Trees are
+# where enemies come from: a tree cell has a distance, but no path runs
+# through one.
+#
+# A fence breaking (cheaper) or being repaired (dearer) changes one cell's
+# cost. Only the cells whose distance can change are recomputed: a cheaper
+# cell relaxes outward from itself; a dearer cell clears the cells whose
+# path ran through it (its subtree in the next-step table) and refills them
+# from their neighbors.
+from __future__ import annotations
+import heapq
+from typing import Dict, List, Tuple
+
+from entities import GameState, SIDES
+import world
+from world import T_FENCE, T_TREE, TileMap
+
+FENCE_COST = 10
+INF = 1 << 30
+STAY = -1  # next-step entry of the cabin
+
+class FlowField:
+    def __init__(self, tmap: TileMap, fence_cost: int = FENCE_COST):
+        self.map = tmap
+        self.fence_cost = fence_cost
+        n = tmap.width * tmap.height
+        self.cabin = tmap.cabin_pos[1] * tmap.width + tmap.cabin_pos[0]
+        self.cost = [fence_cost if t == T_FENCE else 1 for t in tmap.tiles]
+        self.dist = [INF] * n
+        self.next = [STAY] * n
+        # fence cells by the side they guard: the outermost fence rows are
+        # North and South, fence cells between them West or East of the cabin
+        cx, w = tmap.cabin_pos[0], tmap.width
+        fences = [i for i, t in enumerate(tmap.tiles) if t == T_FENCE]
+        top, bottom = (fences[0] // w, fences[-1] // w) if fences else (0, 0)
+        self.fence_cells: Dict[str, List[int]] = {side: [] for side in SIDES}
+        for i in fences:
+            y, x = divmod(i, w)
+            side = ("North" if y == top else "South" if y == bottom
+                    else "West" if x < cx else "East")
+            self.fence_cells[side].append(i)
+        self._up = {side: True for side in self.fence_cells}
+        self.updated = 0  # cells whose distance was recomputed, all time
+        self._build()
+
+    # --- queries ---
+
+    def step(self, i: int) -> int:
+        """Where an enemy at cell i moves next (i itself at the cabin)."""
+        j = self.next[i]
+        return i if j == STAY else j
+
+    def advance(self, positions: List[int]) -> Tuple[List[int], List[int]]:
+        """Move every enemy one step. An enemy whose next cell is an intact
+        fence stays put; the indices of those are returned as `blocked`."""
+        nxt, cost, base = self.next, self.cost, 1
+        moved, blocked = [], []
+        for k, i in enumerate(positions):
+            j = nxt[i]
+            if j == STAY:
+                moved.append(i)
+            elif cost[j] > base:
+                moved.append(i)
+                blocked.append(k)
+            else:
+                moved.append(j)
+        return moved, blocked
+
+    def path(self, i: int) -> List[int]:
+        out = [i]
+        while self.next[i] != STAY:
+            i = self.next[i]
+            out.append(i)
+        return out
+
+    # --- map changes ---
+
+    def sync_fences(self, gs: GameState) -> int:
+        """Match fence cells to gs's fences; returns the cells recomputed."""
+        before = self.updated
+        for side, cells in self.fence_cells.items():
+            up = gs.fence(side).is_up()
+            if up != self._up[side]:
+                self._up[side] = up
+                for i in cells:
+                    self.set_cost(i, self.fence_cost if up else 1)
+        return self.updated - before
+
+    def set_cost(self, i: int, c: int):
+        old = self.cost[i]
+        if c == old:
+            return
+        self.cost[i] = c
+        if c < old:
+            self._lower(i)
+        else:
+            self._raise(i)
+
+    # --- internals ---
+
+    def _expands(self, i: int) -> bool:
+        return self.map.tiles[i] != T_TREE
+
+    def _build(self):
+        self.dist[self.cabin] = 0
+        self._relax([(0, self.cabin)])
+
+    def _relax(self, heap: List[Tuple[int, int]]):
+        """Dijkstra outward from the cells in `heap` (entered with their dist)."""
+        heapq.heapify(heap)
+        dist, nxt, cost, nbrs = self.dist, self.next, self.cost, self.map.neighbor_idx
+        tiles = self.map.tiles
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i] or tiles[i] == T_TREE:
+                continue
+            for j in nbrs[i]:
+                nd = d + cost[j]
+                if nd < dist[j]:
+                    dist[j] = nd
+                    nxt[j] = i
+                    self.updated += 1
+                    heapq.heappush(heap, (nd, j))
+
+    def _best_neighbor(self, i: int) -> Tuple[int, int]:
+        best, via = INF, STAY
+        for j in self.map.neighbor_idx[i]:
+            if self.dist[j] < best and self._expands(j):
+                best, via = self.dist[j], j
+        return best, via
+
+    def _lower(self, i: int):
+        if i == self.cabin:
+            return
+        best, via = self._best_neighbor(i)
+        if best + self.cost[i] < self.dist[i]:
+            self.dist[i] = best + self.cost[i]
+            self.next[i] = via
+            self.updated += 1
+        self._relax([(self.dist[i], i)])
+
+    def _raise(self, i: int):
+        # every cell whose path ran through i, i included
+        region, stack = [], [i]
+        nbrs, nxt = self.map.neighbor_idx, self.next
+        while stack:
+            c = stack.pop()
+            region.append(c)
+            stack.extend(j for j in nbrs[c] if nxt[j] == c)
+        for c in region:
+            self.dist[c] = INF
+            self.next[c] = STAY
+        heap = []
+        for c in region:
+            if c == self.cabin:
+                self.dist[c] = 0
+                heap.append((0, c))
+                continue
+            best, via = self._best_neighbor(c)
+            if best < INF:
+                self.dist[c] = best + self.cost[c]
+                self.next[c] = via
+                heap.append((self.dist[c], c))
+        self.updated += len(region)
+        self._relax(heap)
+
+_fields: Dict[int, Tuple[TileMap, FlowField]] = {}
+
+def flow_field(tmap: TileMap = None) -> FlowField:
+    """The cached FlowField of tmap (default: world.current_map())."""
+    tmap = tmap or world.current_map()
+    hit = _fields.get(id(tmap))
+    if hit is None or hit[0] is not tmap:
+        hit = _fields[id(tmap)] = (tmap, FlowField(tmap))
+    return hit[1]
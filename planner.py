@@ -0,0 +1,327 @@
+# planner.py
+# Whole-day plans: checked up front, played in one call, and searched for.
+#
+# A plan is the day's menu choices in order, as apply_day_choice takes them
+# ("1", "5 u1", "7") or by name ("gather", "craft u1", "end"):
+#
+#   validate_plan(gs, plan)        # the plan as menu choices, or PlanError
+#   execute_plan(gs, plan)         # play it, no pauses or redraws
+#
+# DayPlanner searches the day for the best expected night ahead. It is an
+# expectimax over day states: every menu choice is tried, random ones
+# (gathering, foraging, harvests) branch on each roll with its odds, and
+# the value of every (state, actions left) is memoized, so plans that reach
+# the same state by different orders share the work. The actions themselves
+# run through main.py's own do_* functions on a scratch GameState, so the
+# gather combo, reinforce_cost growth, upgrade prerequisites and the field
+# timer behave exactly as in play. A finished day is scored by sampling the
+# night ahead (NightSampler) plus a little for wood and food carried over.
+#
+#   planner = DayPlanner()
+#   plan, value = planner.best_plan(gs)
+#   main.play_day(gs, planner)     # as a DayPolicy: re-plans after each roll
+from __future__ import annotations
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from difficulty import Difficulty
+from entities import GameState, SIDES
+from rng import GameRNG
+import main
+import events
+import metrics
+import night
+from packed import INDEX, Snapshot, restore, snapshot
+import recipes
+
+ACTION_NAMES = {"gather": "1", "forage": "2", "repair": "3", "rest": "4", "craft": "5",
+                "tend": "6", "end": "7"}
+FENCE_WEIGHT = 0.1     # share of a survival's score that depends on fence HP left
+STOCK_WEIGHT = 0.002   # per wood or food carried into the night, to break ties
+
+# the slots of a snapshot that can change a night's outcome
+_GAME = INDEX["rng.seed"]  # everything before it is game state, after it RNG
+_NIGHT_SLOTS = tuple(INDEX[n] for n in (
+    "day_num", "traps", "arrows", "player.max_hp", "player.hp", "player.damage",
+    *(f"fences.{s}.{n}" for s in SIDES for n in ("hp", "max_hp")),
+    "flags", "upgrades", "defense_bonus"))
+
+# forage rolls (random(), then randint() when it finds something), with odds
+_FORAGE = (((0.0, 1), 0.175), ((0.0, 2), 0.175), ((0.5,), 0.25),
+           ((0.7, 1), 0.1), ((0.7, 2), 0.1), ((0.9,), 0.2))
+
+NightValue = Callable[[GameState], float]  # end-of-day state -> score of the night ahead
+
+class PlanError(ValueError):
+    """A plan that cannot be played; `step` is the offending entry's index."""
+
+    def __init__(self, step: int, msg: str):
+        super().__init__(f"step {step}: {msg}")
+        self.step = step
+
+def _normalize(entry: str) -> str:
+    head, _, arg = entry.strip().lower().partition(" ")
+    head = ACTION_NAMES.get(head, head)
+    arg = arg.strip()
+    return f"{head} {arg}" if arg else head
+
+def validate_plan(gs: GameState, plan: Sequence[str], check_wood: bool = False) -> List[str]:
+    """Check a plan against gs without playing it; returns it as menu choices.
+
+    Rejects unknown choices, crafts without a code, more actions than the
+    day has, anything after "end", upgrades bought twice or before their
+    prerequisite, and tending with no field. With check_wood, every craft
+    must be affordable even if every roll comes up lowest. Without it, a
+    craft the wood may not cover only maybe happens: buying it again later
+    is a retry, not a second purchase.
+    """
+    owned = recipes.owned_mask(gs)
+    maybe = 0  # crafts that happen only if the wood is there
+    has_field = gs.has_field
+    p = gs.player
+    # lower bound on wood, upper bound on fence damage, as the plan goes
+    wood, need = p.wood, sum(f.max_hp - f.hp for f in gs.fences.values())
+    bonus, combo, reinforce = p.gather_bonus, gs.daily_wood_bonus_combo, gs.reinforce_cost
+    choices: List[str] = []
+    for step, entry in enumerate(plan):
+        choice = _normalize(entry)
+        if choices and choices[-1] == "7":
+            raise PlanError(step, "nothing can follow 'end'")
+        head, _, arg = choice.partition(" ")
+        if head not in ACTION_NAMES.values() or (arg and head != "5"):
+            raise PlanError(step, f"unknown choice {entry!r}")
+        if head != "7" and sum(c != "7" for c in choices) >= p.day_actions_per_day:
+            raise PlanError(step, f"the day has only {p.day_actions_per_day} actions")
+        if head == "1":
+            wood += 2 + bonus + combo
+            combo += 2
+        elif head == "3":
+            wood, need = max(0, wood - (need + 1) // 2), max(0, need - 2 * wood)
+        elif head == "5":
+            r = recipes.BY_CODE.get(arg)
+            if r is None:
+                raise PlanError(step, f"craft needs a code such as u1 or c2, got {arg!r}")
+            cost = reinforce if r.id == recipes.REINFORCE else recipes.cost(gs, r.id)
+            if check_wood and wood < cost:
+                raise PlanError(step, f"may be short of wood ({cost} needed, {wood} sure)")
+            if r.permanent:
+                bit = recipes.BIT[r.id]
+                if owned & bit:
+                    raise PlanError(step, f"{r.name} is already owned")
+                if recipes.REQUIRES[r.id] & ~(owned | maybe):
+                    raise PlanError(step, f"{r.name} needs {r.prereq} first")
+                if wood >= cost and not recipes.REQUIRES[r.id] & ~owned:
+                    owned |= bit
+                    maybe &= ~bit
+                    if r.name == "Axe":
+                        bonus = 2  # wood stays a lower bound: only once sure
+                else:
+                    maybe |= bit
+                if r.name == "Hoe":
+                    has_field = True  # tending may then do nothing, but is allowed
+            elif r.id == recipes.REINFORCE:
+                reinforce += gs.params.reinforce_step
+            wood = max(0, wood - cost)
+        elif head == "6" and not has_field:
+            raise PlanError(step, "there is no field to tend")
+        choices.append(choice)
+    return choices
+
+@dataclass
+class DayReport:
+    choices: List[str]                                 # the plan as menu choices
+    actions: int = 0                                   # actions spent
+    ended_early: bool = False
+    no_effect: List[int] = field(default_factory=list)  # steps that changed nothing (e.g. unaffordable crafts)
+
+def execute_plan(gs: GameState, plan: Sequence[str], out: night.Out = None,
+                 check_wood: bool = False) -> DayReport:
+    """Validate the plan, then play it as play_day would, in one call."""
+    report = DayReport(validate_plan(gs, plan, check_wood))
+    for step, choice in enumerate(report.choices):
+        before = snapshot(gs)
+        if main.apply_day_choice(gs, choice, out) == "end":
+            report.ended_early = True
+            break
+        report.actions += 1
+        if snapshot(gs) == before:
+            report.no_effect.append(step)
+    return report
+
+class NightSampler:
+    """Scores an end-of-day state by playing the night ahead `samples` times.
+
+    Sample k always uses the same spawn and combat streams, whatever the
+    state, so two states are compared on the same nights. A survived night
+    scores 1 - FENCE_WEIGHT plus FENCE_WEIGHT times the share of fence HP
+    left; a lost one scores 0.
+    """
+
+    def __init__(self, samples: int = 16, seed: int = 0, policy: night.Policy = night.greedy_policy):
+        self.samples = samples
+        self.policy = policy
+        rng = random.Random(seed)
+        self._keys = [(rng.getrandbits(64), rng.getrandbits(64)) for _ in range(samples)]
+        self._scratch = GameState(rng=GameRNG(seed))
+
+    def __call__(self, gs: GameState) -> float:
+        sim = self._scratch
+        sim.params = gs.params
+        snap = snapshot(gs)
+        total = 0.0
+        for spawn, combat in self._keys:
+            restore(sim, snap)
+            sim.rng.spawn.seek(spawn, 0)
+            sim.rng.combat.seek(combat, 0)
+            if night.simulate_night(sim, self.policy, m=metrics.NULL, bus=events.NULL).survived:
+                hp = sum(f.hp for f in sim.fences.values())
+                full = sum(f.max_hp for f in sim.fences.values())
+                total += 1.0 - FENCE_WEIGHT + FENCE_WEIGHT * hp / full
+        return total / self.samples
+
+class _Rolls:
+    """Stands in for gs.rng.loot and returns the rolls it is given, in order."""
+
+    def __init__(self):
+        self.queue: List[float] = []
+
+    def random(self) -> float:
+        return self.queue.pop(0)
+
+    def randint(self, a: int, b: int) -> int:
+        return self.queue.pop(0)
+
+class DayPlanner:
+    """Expectimax over the day's choices, with memoized sub-plan values.
+
+    Each choice looks `horizon` actions ahead (None: to the end of the day)
+    and scores the state there as if the day ended; the number of states
+    grows about 2.5x per action of lookahead, so a whole fresh day is out of
+    reach but the last few actions are searched exactly. Values are memoized
+    on (lookahead, state) and reused by every later choice of the same day.
+
+    Also a main.DayPolicy: called as policy(gs, actions_left) it answers the
+    best choice from where the day actually stands, so each real roll is
+    planned around. Memos are dropped when the day number changes.
+    """
+
+    def __init__(self, night_value: Optional[NightValue] = None, horizon: Optional[int] = 3,
+                 stock_weight: float = STOCK_WEIGHT):
+        self.night_value = night_value or NightSampler()
+        self.horizon = horizon
+        self.stock_weight = stock_weight
+        self.states = 0      # day states valued since the memo was last cleared
+        self.nights = 0      # distinct end-of-day states scored
+        self._memo: Dict[Tuple[int, Snapshot], Tuple[float, str]] = {}
+        self._night_memo: Dict[Snapshot, float] = {}
+        self._steps: Dict[Tuple[Snapshot, str], List[Tuple[Snapshot, float]]] = {}
+        self._day: Optional[Tuple[int, Difficulty]] = None  # (day_num, params) the memos are for
+        self._scratch = GameState()
+        self._rolls = _Rolls()
+
+    # --- main.DayPolicy ---
+
+    def __call__(self, gs: GameState, actions_left: int) -> str:
+        self._prepare(gs)
+        return self._best(self._depth(actions_left), snapshot(gs))[1]
+
+    # --- search ---
+
+    def value(self, gs: GameState, actions_left: Optional[int] = None) -> float:
+        """Expected score of the night ahead, as far as the horizon sees."""
+        self._prepare(gs)
+        left = gs.player.day_actions_per_day if actions_left is None else actions_left
+        return self._best(self._depth(left), snapshot(gs))[0]
+
+    def best_plan(self, gs: GameState, actions_left: Optional[int] = None) -> Tuple[List[str], float]:
+        """The day this planner plays if every roll comes up as its likeliest
+        outcome, and value() from gs."""
+        self._prepare(gs)
+        left = gs.player.day_actions_per_day if actions_left is None else actions_left
+        snap = snapshot(gs)
+        value, choice = self._best(self._depth(left), snap)
+        plan = []
+        while left > 0:
+            plan.append(choice)
+            if choice == "7":
+                break
+            snap = max(self._outcomes(snap, choice), key=lambda o: o[1])[0]
+            left -= 1
+            if left:
+                choice = self._best(self._depth(left), snap)[1]
+        return plan, value
+
+    def _depth(self, left: int) -> int:
+        return left if self.horizon is None else min(left, self.horizon)
+
+    def _prepare(self, gs: GameState):
+        day = (gs.day_num, gs.params)
+        if day != self._day:
+            self._memo.clear()
+            self._night_memo.clear()
+            self._steps.clear()
+            self.states = self.nights = 0
+            self._day = day
+        self._scratch.params = gs.params
+
+    def _best(self, depth: int, snap: Snapshot) -> Tuple[float, str]:
+        key = (depth, snap[:_GAME])
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        best = (self._end_value(snap), "7")
+        if depth > 0:
+            for choice in self._choices(snap):
+                outs = self._outcomes(snap, choice)
+                if len(outs) == 1 and outs[0][0][:_GAME] == snap[:_GAME]:
+                    continue  # changes nothing
+                v = sum(p * self._best(depth - 1, s)[0] for s, p in outs)
+                if v > best[0]:
+                    best = (v, choice)
+        self._memo[key] = best
+        self.states += 1
+        return best
+
+    def _choices(self, snap: Snapshot) -> List[str]:
+        sim = restore(self._scratch, snap)
+        crafts = [f"5 {recipes.RECIPES[i].code}" for i in recipes.craftable(sim)]
+        return ["1", "2", "3", "4", *crafts, *(["6"] if sim.has_field else [])]
+
+    def _outcomes(self, snap: Snapshot, choice: str) -> List[Tuple[Snapshot, float]]:
+        """Every (state after `choice`, probability), rolls enumerated."""
+        key = (snap[:_GAME], choice)
+        hit = self._steps.get(key)
+        if hit is not None:
+            return hit
+        sim = restore(self._scratch, snap)
+        if choice == "1":
+            rolls = [((b,), 1 / 3) for b in (2, 3, 4)]
+        elif choice == "2":
+            rolls = list(_FORAGE)
+        elif choice == "6" and sim.field_state == "ready":
+            top = 4 + min(sim.field_watered, 3)
+            rolls = [((n,), 1 / (top - 1)) for n in range(2, top + 1)]
+        else:
+            rolls = [((), 1.0)]
+        loot, outs = sim.rng.loot, []
+        for seq, p in rolls:
+            restore(sim, snap)
+            self._rolls.queue[:] = seq
+            sim.rng.loot = self._rolls
+            try:
+                main.apply_day_choice(sim, choice, None, bus=events.NULL)
+            finally:
+                sim.rng.loot = loot
+            outs.append((snapshot(sim), p))
+        self._steps[key] = outs
+        return outs
+
+    def _end_value(self, snap: Snapshot) -> float:
+        key = tuple(snap[i] for i in _NIGHT_SLOTS)
+        v = self._night_memo.get(key)
+        if v is None:
+            v = self._night_memo[key] = self.night_value(restore(self._scratch, snap))
+            self.nights += 1
+        wood, food = snap[INDEX["player.wood"]], snap[INDEX["player.food"]]
+        return v + self.stock_weight * (wood + food)
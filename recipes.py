@@ -0,0 +1,190 @@
+# recipes.py
+# The craft menu as data, compiled once at import.
+#
+# Every upgrade and craftable is a Recipe with a fixed integer id (its place
+# in _TABLE, which is also menu order). Saves store these ids, so recipes
+# may be appended but never reordered. Compiled from the table:
+#
+#   REQUIRES[id]   every recipe that must be owned first (the prerequisite
+#                  DAG, closed transitively: Watchtower needs Bow and Spear)
+#   BIT[id]        the recipe's bit in an owned-upgrades mask
+#   _EFFECTS[id]   the handler that applies it to a GameState
+#
+# craftable(gs) answers "what can I make now?" from a per-mask list of
+# recipes sorted by cost, built on first use for each Difficulty, and a
+# bisect on the player's wood.
+from __future__ import annotations
+import bisect
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from difficulty import Difficulty
+from entities import GameState
+
+@dataclass(frozen=True)
+class Recipe:
+    id: int
+    code: str                 # menu code, "u1" / "c2"
+    name: str
+    desc: str                 # may use {kills} (trap kill range)
+    prereq: Optional[str]     # recipe name
+    permanent: bool           # an upgrade: owned once, kept in gs.upgrades
+    done: Optional[str]       # message once made (upgrades: "You craft <name>. <desc>")
+
+# (name, desc, prereq, permanent, done)
+_TABLE = (
+    ("Spear", "Increase night attack damage by +2.", None, True, None),
+    ("Axe", "Gather +2 extra wood each time.", None, True, None),
+    ("Hoe", "Unlock 'Tend Field' to grow food.", None, True, None),
+    ("Bow", "Allows ranged attacks using arrows.", "Spear", True, None),
+    ("Watchtower", "Shoot from any side but cannot defend.", "Bow", True, None),
+    ("Reinforce Fences", "Increase all fence max HP by +10, cost rises each time.", None, False,
+     "Your fences grow sturdier, with thicker planks and braces."),
+    ("Trap", "Place a trap that kills {kills} monsters when a new wave spawns.", None, False,
+     "You build a trap and hide it near the fence line."),
+    ("Arrow Batch", "Craft 5 arrows for ranged attacks.", None, False,
+     "You craft 5 new arrows and bundle them neatly."),
+)
+
+def _compile() -> Tuple[Recipe, ...]:
+    out, counts = [], {True: 0, False: 0}
+    for i, (name, desc, prereq, permanent, done) in enumerate(_TABLE):
+        counts[permanent] += 1
+        code = f"{'u' if permanent else 'c'}{counts[permanent]}"
+        out.append(Recipe(i, code, name, desc, prereq, permanent, done))
+    return tuple(out)
+
+RECIPES = _compile()
+BY_NAME: Dict[str, Recipe] = {r.name: r for r in RECIPES}
+BY_CODE: Dict[str, Recipe] = {r.code: r for r in RECIPES}
+UPGRADES = tuple(r for r in RECIPES if r.permanent)
+CRAFTABLES = tuple(r for r in RECIPES if not r.permanent)
+REINFORCE = BY_NAME["Reinforce Fences"].id
+BIT = tuple(1 << i if r.permanent else 0 for i, r in enumerate(RECIPES))
+
+def _requires(r: Recipe) -> int:
+    mask = 0
+    while r.prereq is not None:
+        r = BY_NAME[r.prereq]
+        if mask & BIT[r.id]:
+            raise ValueError(f"recipe prerequisites loop at {r.name}")
+        mask |= BIT[r.id]
+    return mask
+
+REQUIRES = tuple(_requires(r) for r in RECIPES)  # as owned masks
+
+# ---- effects ----
+
+def _spear(gs: GameState):
+    gs.player.damage += 2
+
+def _axe(gs: GameState):
+    gs.player.gather_bonus = 2
+
+def _hoe(gs: GameState):
+    gs.has_field = True
+    gs.field_state = "empty"
+    gs.field_timer = 0
+
+def _bow(gs: GameState):
+    gs.has_bow = True
+
+def _watchtower(gs: GameState):
+    gs.has_watchtower = True
+
+def _reinforce(gs: GameState):
+    for f in gs.fences.values():
+        f.max_hp += 10
+        f.hp += 10
+    gs.reinforce_cost += gs.params.reinforce_step  # escalate cost
+
+def _trap(gs: GameState):
+    gs.traps += 1
+
+def _arrows(gs: GameState):
+    gs.arrows += 5
+
+_HANDLERS = {"Spear": _spear, "Axe": _axe, "Hoe": _hoe, "Bow": _bow, "Watchtower": _watchtower,
+             "Reinforce Fences": _reinforce, "Trap": _trap, "Arrow Batch": _arrows}
+_EFFECTS: Tuple[Callable[[GameState], None], ...] = tuple(_HANDLERS[r.name] for r in RECIPES)
+
+# ---- queries ----
+
+def owned_mask(gs: GameState) -> int:
+    mask = 0
+    for name in gs.upgrades:
+        r = BY_NAME.get(name)
+        if r is not None:
+            mask |= BIT[r.id]
+    return mask
+
+def cost(gs: GameState, rid: int) -> int:
+    if rid == REINFORCE:
+        return gs.reinforce_cost
+    return gs.params.costs[RECIPES[rid].name]
+
+def label(gs: GameState, r: Recipe) -> str:
+    """Menu name; the reinforcement shows its current price."""
+    return f"{r.name} ({gs.reinforce_cost} wood)" if r.id == REINFORCE else r.name
+
+def describe(gs: GameState, r: Recipe) -> str:
+    lo, hi = gs.params.trap_kills
+    return r.desc.format(kills=f"{lo}–{hi}")
+
+def blocker(gs: GameState, rid: int, mask: Optional[int] = None) -> Optional[str]:
+    """Why rid cannot be made now (do_craft's wording), or None if it can."""
+    r = RECIPES[rid]
+    mask = owned_mask(gs) if mask is None else mask
+    if r.permanent:
+        if REQUIRES[rid] & ~mask:
+            return f"You need {r.prereq} before crafting {r.name}."
+        if mask & BIT[rid]:
+            return "You already have this upgrade."
+    if gs.player.wood < cost(gs, rid):
+        return "Not enough wood."
+    return None
+
+# per Difficulty and owned mask: (costs ascending, recipe ids)
+_MENUS: Dict[Difficulty, Dict[int, Tuple[List[int], List[int]]]] = {}
+
+def _menu(gs: GameState, mask: int) -> Tuple[List[int], List[int]]:
+    params = gs.params
+    menus = _MENUS.get(params)
+    if menus is None:
+        menus = _MENUS[params] = {}
+    menu = menus.get(mask)
+    if menu is None:
+        ready = sorted((params.costs[r.name], r.id) for r in RECIPES
+                       if r.id != REINFORCE and not (r.permanent and mask & BIT[r.id])
+                       and not REQUIRES[r.id] & ~mask)
+        menu = menus[mask] = ([c for c, _ in ready], [i for _, i in ready])
+    return menu
+
+def craftable(gs: GameState) -> List[int]:
+    """Ids of every recipe gs can make right now, cheapest first."""
+    costs, ids = _menu(gs, owned_mask(gs))
+    wood = gs.player.wood
+    out = ids[:bisect.bisect_right(costs, wood)]
+    if gs.reinforce_cost <= wood:
+        out.insert(bisect.bisect_right(costs, gs.reinforce_cost, 0, len(out)), REINFORCE)
+    return out
+
+# ---- crafting ----
+
+def craft(gs: GameState, rid: int) -> Recipe:
+    """Pay for and apply rid; the caller has checked blocker()."""
+    r = RECIPES[rid]
+    gs.player.wood -= cost(gs, rid)
+    if r.permanent:
+        gs.upgrades.add(r.name)
+    _EFFECTS[rid](gs)
+    return r
+
+# ---- saves ----
+
+def to_ids(names: Iterable[str]) -> List[int]:
+    return sorted(BY_NAME[n].id for n in names)
+
+def from_ids(ids: Iterable) -> set:
+    """Upgrade names from saved ids (older saves hold the names themselves)."""
+    return {v if isinstance(v, str) else RECIPES[v].name for v in ids}
@@ -0,0 +1,161 @@
+# rng.py
+# Per-game random numbers.
+#
+# Each GameState owns a GameRNG with named substreams (spawn, combat, loot,
+# weather). A stream is counter-based: draw i is 64-bit word i % 8 of the
+# keyed BLAKE2b hash of block i // 8, so any position can be reached
+# directly (jump) and two games never share state. Each hash yields a
+# whole block of draws, and a stream read straight through hashes RUN
+# blocks at a time; the draw methods inline the buffer lookup. Streams
+# offer the subset of the `random` module API the game uses, so code that
+# takes an `rng` argument also accepts the `random` module itself.
+from __future__ import annotations
+import hashlib
+import random
+import struct
+from dataclasses import dataclass, field
+from typing import List, MutableSequence, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+BLOCK = 8  # draws per hash: one 64-byte BLAKE2b digest
+RUN = 8    # blocks hashed per refill when a stream is read straight through
+TURN_STRIDE = 1 << 16  # draws reserved per (day, turn) window, see GameRNG.at_turn
+TURNS_PER_DAY_WINDOW = 64
+
+_INV_2_53 = 1.0 / (1 << 53)
+_unpack = {n: struct.Struct(f"<{n * BLOCK}Q").unpack for n in (1, RUN)}
+
+def _derive_key(seed: int, name: str) -> int:
+    h = hashlib.blake2b(f"{seed}:{name}".encode(), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+@dataclass
+class Stream:
+    key: int
+    counter: int = 0  # index of the next draw
+
+    def __post_init__(self):
+        # draws _base .. _end - 1 are buffered in _buf
+        self._base = self._end = 0
+        self._buf: Tuple[int, ...] = ()
+        self._hasher = None
+        self._hasher_key = None
+
+    # hash objects don't copy or pickle; the position is all that matters
+    def __getstate__(self):
+        return {"key": self.key, "counter": self.counter}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _refill(self):
+        """Buffer the block holding draw `counter`: one block after a jump,
+        RUN blocks when reading on from the end of the buffer."""
+        if self._hasher_key != self.key:  # first use, or key restored from a save
+            self._hasher = hashlib.blake2b(key=self.key.to_bytes(8, "little"),
+                                           digest_size=8 * BLOCK)
+            self._hasher_key = self.key
+        n = RUN if self.counter == self._end and self._buf else 1
+        block = self.counter // BLOCK
+        hasher, digests = self._hasher, []
+        for b in range(block, block + n):
+            h = hasher.copy()
+            h.update(b.to_bytes(8, "little"))
+            digests.append(h.digest())
+        self._base = block * BLOCK
+        self._end = self._base + n * BLOCK
+        self._buf = _unpack[n](b"".join(digests))
+
+    def jump(self, n: int):
+        """Continue from draw n."""
+        self.counter = n
+
+    def seek(self, key: int, counter: int):
+        """Continue from draw `counter` of the stream keyed `key`."""
+        if key != self.key:
+            self.key = key
+            self._buf = ()  # drawn under the old key
+            self._base = self._end = 0
+        self.counter = counter
+
+    # The draws below each inline the buffer lookup: they are on every hot path.
+
+    def next64(self) -> int:
+        c = self.counter
+        if not self._base <= c < self._end:
+            self._refill()
+        self.counter = c + 1
+        return self._buf[c - self._base]
+
+    def random(self) -> float:
+        c = self.counter
+        if not self._base <= c < self._end:
+            self._refill()
+        self.counter = c + 1
+        return (self._buf[c - self._base] >> 11) * _INV_2_53
+
+    def randrange(self, n: int) -> int:
+        if n <= 0:
+            raise ValueError("empty range for randrange()")
+        c = self.counter
+        if not self._base <= c < self._end:
+            self._refill()
+        self.counter = c + 1
+        return (self._buf[c - self._base] * n) >> 64
+
+    def randint(self, a: int, b: int) -> int:
+        n = b - a + 1
+        if n <= 0:
+            raise ValueError("empty range for randint()")
+        c = self.counter
+        if not self._base <= c < self._end:
+            self._refill()
+        self.counter = c + 1
+        return a + ((self._buf[c - self._base] * n) >> 64)
+
+    def choice(self, seq: Sequence[T]) -> T:
+        n = len(seq)
+        if not n:
+            raise IndexError("cannot choose from an empty sequence")
+        c = self.counter
+        if not self._base <= c < self._end:
+            self._refill()
+        self.counter = c + 1
+        return seq[(self._buf[c - self._base] * n) >> 64]
+
+    def sample(self, population: Sequence[T], k: int) -> List[T]:
+        pool: MutableSequence[T] = list(population)
+        n = len(pool)
+        if not 0 <= k <= n:
+            raise ValueError("sample larger than population or is negative")
+        for i in range(k):
+            j = i + self.randrange(n - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return list(pool[:k])
+
+def _new_seed() -> int:
+    return random.SystemRandom().randrange(1 << 63)
+
+@dataclass
+class GameRNG:
+    seed: int = field(default_factory=_new_seed)
+    spawn: Optional[Stream] = None    # waves, enemy stats and names
+    combat: Optional[Stream] = None   # player hits, attackers, traps
+    loot: Optional[Stream] = None     # gathering, foraging, harvests
+    weather: Optional[Stream] = None  # overnight frost
+
+    def __post_init__(self):
+        for name in ("spawn", "combat", "loot", "weather"):
+            if getattr(self, name) is None:
+                setattr(self, name, Stream(_derive_key(self.seed, name)))
+
+    def at_turn(self, day: int, turn: int):
+        """Jump the spawn and combat streams to the window for this night turn.
+
+        A turn's draws then depend only on (seed, day, turn), not on how many
+        draws earlier turns used, so any turn can be replayed or branched on.
+        """
+        start = (day * TURNS_PER_DAY_WINDOW + turn) * TURN_STRIDE
+        self.spawn.jump(start)
+        self.combat.jump(start)
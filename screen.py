@@ -0,0 +1,107 @@
+# screen.py
+# Frame renderers for the day and night screens.
+#
+# Screen      builds each frame in one buffer and writes it with one call.
+# AnsiScreen  keeps the frame at the top of the terminal and only rewrites
+#             the lines that changed since the previous frame.
+# NullScreen  for when nobody is watching: callers check `active` and skip
+#             formatting altogether.
+#
+# Game messages go through say(); they are held until the next frame or an
+# explicit flush() (call it before prompting for input).
+from __future__ import annotations
+import sys
+from typing import List, Optional, TextIO
+
+class Screen:
+    active = True
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self._pending: List[str] = []
+
+    def say(self, msg: str):
+        self._pending.append(msg)
+
+    def _write(self, text: str):
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+
+    def flush(self):
+        if self._pending:
+            text = "\n".join(self._pending) + "\n"
+            self._pending.clear()
+            self._write(text)
+
+    def frame(self, lines: List[str]):
+        buf = self._pending + lines
+        self._pending = []
+        self._write("\n".join(buf) + "\n")
+
+class AnsiScreen(Screen):
+    """Frame pinned to the top of the terminal, redrawn line by line on change.
+
+    Messages said since the previous frame are shown under it, so nothing is
+    lost when the area below the frame is cleared for the next prompt.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, log_lines: int = 12):
+        super().__init__(stream)
+        self.log_lines = log_lines
+        self._prev: Optional[List[str]] = None
+        self._shown: List[str] = []  # flushed since the last frame
+
+    def flush(self):
+        if self._pending:
+            self._shown.extend(self._pending)
+            super().flush()
+
+    def frame(self, lines: List[str]):
+        recent = (self._shown + self._pending)[-self.log_lines:]
+        self._shown, self._pending = [], []
+        # one entry per terminal row
+        new = "\n".join(lines + ([""] + recent if recent else [])).split("\n")
+        prev = self._prev
+        out = []
+        if prev is None:
+            out.append("\x1b[H\x1b[2J")
+            prev = []
+        for i, line in enumerate(new):
+            if i >= len(prev) or prev[i] != line:
+                out.append(f"\x1b[{i + 1};1H\x1b[2K{line}")
+        out.append(f"\x1b[{len(new) + 1};1H\x1b[J")
+        self._prev = new
+        self._write("".join(out))
+
+class NullScreen(Screen):
+    active = False
+
+    def say(self, msg: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def frame(self, lines: List[str]):
+        pass
+
+_default: Optional[Screen] = None
+
+def default() -> Screen:
+    """Shared plain screen on stdout."""
+    global _default
+    if _default is None:
+        _default = Screen()
+    return _default
+
+def make_screen(mode: Optional[str] = None, stream: Optional[TextIO] = None) -> Screen:
+    """"plain" (default), "ansi" or "null"."""
+    mode = (mode or "plain").lower()
+    if mode == "ansi":
+        return AnsiScreen(stream)
+    if mode == "null":
+        return NullScreen(stream)
+    if mode == "plain":
+        return Screen(stream)
+    raise ValueError(f"unknown screen mode: {mode}")
@@ -0,0 +1,227 @@
+# server.py
+# Many cabins in one event loop: a plain TCP line protocol where every
+# connection plays its own GameState. Send one command per line; the server
+# answers with the screen text and the next prompt.
+#
+#   python server.py --port 7777      then e.g.   nc localhost 7777
+from __future__ import annotations
+import argparse
+import asyncio
+import io
+from typing import Optional
+
+from entities import GameState
+import main
+import night
+from screen import Screen
+
+WRITE_HIGH_WATER = 64 * 1024  # per-connection output buffered before we stop reading
+
+class GameSession:
+    """One game as a state machine: feed() it a command, get back the text to send.
+
+    Follows main.main's flow (intro, day actions and crafting, the tower
+    question, night turns, dawn) but never blocks; each phase just records
+    what it is waiting for.
+    """
+
+    def __init__(self, gs: Optional[GameState] = None):
+        self.gs = gs or GameState()
+        self._buf = io.StringIO()
+        self.scr = Screen(self._buf)
+        self.phase = "new"
+        self.actions = 0
+        self.night: Optional[night.Night] = None
+
+    @property
+    def done(self) -> bool:
+        return self.phase == "over"
+
+    def start(self) -> str:
+        self.scr.say(main.INTRO_TEXT)
+        self._ask("\n[Enter] Step toward the cabin...", "intro")
+        return self._take()
+
+    def feed(self, line: str) -> str:
+        cmd = line.strip()
+        getattr(self, "_on_" + self.phase)(cmd)
+        return self._take()
+
+    def _take(self) -> str:
+        self.scr.flush()
+        text = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return text
+
+    def _ask(self, prompt: str, phase: str):
+        self.scr.flush()
+        self._buf.write(prompt)
+        self.phase = phase
+
+    # ---- Day ----
+
+    def _on_intro(self, cmd: str):
+        self._start_day()
+
+    def _start_day(self):
+        self.actions = self.gs.player.day_actions_per_day
+        self.scr.say(f"Current time: {6 + (14 - self.actions):02d}:00")
+        self._day_prompt()
+
+    def _day_prompt(self):
+        main.show_day_status(self.gs, self.actions, self.scr)
+        self.scr.say(main.day_menu_text(self.gs))
+        self._ask("> ", "day")
+
+    def _on_day(self, cmd: str):
+        if cmd == "5":
+            self.scr.say(main.craft_menu_text(self.gs))
+            self._ask(main.CRAFT_PROMPT, "craft")
+            return
+        self._after_action(main.apply_day_choice(self.gs, cmd, self.scr.say))
+
+    def _on_craft(self, cmd: str):
+        main.do_craft(self.gs, cmd, self.scr.say)
+        self._after_action("acted")
+
+    def _after_action(self, outcome: str):
+        if outcome == "end":
+            self._dusk()
+        elif outcome == "acted":
+            self.actions -= 1
+            self._ask("\n[Enter] Continue...", "day_pause")
+        else:
+            self._day_prompt()
+
+    def _on_day_pause(self, cmd: str):
+        if self.actions > 0:
+            self._day_prompt()
+        else:
+            self._dusk()
+
+    # ---- Night ----
+
+    def _dusk(self):
+        self.scr.say("\nDusk bleeds into night. The treeline begins to whisper...")
+        self.scr.say("\nNight falls. The treeline rustles with unseen steps...")
+        if self.gs.has_watchtower:
+            self._ask("Do you want to start the night in the watchtower? (y/N): ", "tower")
+        else:
+            self._start_night(False)
+
+    def _on_tower(self, cmd: str):
+        in_tower = cmd.lower() == "y"
+        if in_tower:
+            self.scr.say("You climb the tower, bow ready. You’ll shoot from above but can’t defend.")
+        else:
+            self.scr.say("You remain on the ground, near the fences.")
+        self._start_night(in_tower)
+
+    def _start_night(self, in_tower: bool):
+        self.night = night.Night(self.gs, self.scr.say, in_tower)
+        self._next_turn()
+
+    def _next_turn(self):
+        if self.night.over:
+            self._end_night()
+            return
+        self.night.begin_turn()
+        night._print_board(self.gs, self.night.enemy_queues, self.night.turn, self.scr)
+        self._night_prompt()
+
+    def _night_prompt(self):
+        self.scr.say(night._menu_text(self.gs))
+        self._ask("> ", "night")
+
+    def _on_night(self, cmd: str):
+        if not self.night.act(cmd):
+            self._night_prompt()
+            return
+        if self.gs.player.hp <= 0:
+            self.gs.alive = False
+        else:
+            self.night.end_turn()
+        if self.gs.alive:
+            self._next_turn()
+        else:
+            self._end_night()
+
+    def _end_night(self):
+        self.night.finish()
+        self.night = None
+        if not self.gs.alive:
+            self.scr.say(main.game_over_text(self.gs))
+            self.phase = "over"
+            return
+        self.gs.day_num += 1
+        main.morning_upkeep(self.gs, self.scr.say)
+        self._ask("\n[Enter] A new day breaks...", "dawn")
+
+    def _on_dawn(self, cmd: str):
+        self._start_day()
+
+    def _on_over(self, cmd: str):
+        pass
+
+class CabinServer:
+    def __init__(self, max_sessions: int = 10_000, idle_timeout: float = 900.0,
+                 max_line: int = 1024, backlog: int = 1024):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+        self.backlog = backlog
+        self.sessions = 0
+
+    async def _send(self, writer: asyncio.StreamWriter, text: str):
+        if text:
+            writer.write(text.encode("utf-8"))
+            await writer.drain()  # backpressure: wait for slow clients
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.sessions >= self.max_sessions:
+            writer.write(b"The clearing is full. Try again later.\n")
+            writer.close()
+            return
+        self.sessions += 1
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        session = GameSession()
+        try:
+            await self._send(writer, session.start())
+            while not session.done:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    break  # idle too long, or a line over the limit
+                if not line:
+                    break
+                await self._send(writer, session.feed(line.decode("utf-8", "replace")))
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 7777) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, limit=self.max_line,
+                                          backlog=self.backlog)
+
+async def serve(host: str, port: int, **kwargs):
+    server = await CabinServer(**kwargs).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Host many cabins over TCP.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7777)
+    ap.add_argument("--max-sessions", type=int, default=10_000)
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, max_sessions=args.max_sessions))
+    except KeyboardInterrupt:
+        pass
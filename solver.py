@@ -0,0 +1,638 @@
+# solver.py
+# Exact night odds by dynamic programming.
+#
+# A night is a finite Markov process. From the state at the start of a turn,
+# the spawn roll and traps, the player's action and the enemies' strikes give
+# a distribution over next-turn states; after TURNS turns the player has
+# survived. Solver returns the survival probability and the expected total
+# fence HP when the night ends:
+#
+#   for a given policy  pushes the state distribution forward a turn at a
+#                       time, merging equal states (Solver._forward)
+#   for the best play   backward induction over the same states, memoized
+#                       (Solver._value); it also answers best_action()
+#
+# The model follows night.py exactly (spawn_pattern, scaled_enemy stats,
+# trap sampling, lowest-HP strikes, uniform attackers; curves from gs.params),
+# for EnemyQueue nights.
+# Exact answers are cheap for the last few turns of a night; a whole night
+# from dusk reaches hundreds of thousands of states per turn. For those:
+#
+#   epsilon      probability mass the solver may leave unexplored, in total.
+#                Each turn drops its least likely states while the mass
+#                dropped fits that turn's share of what is left of the
+#                budget. The mass skipped is reported, so the true survival
+#                lies in [survival, survival + unexplored]
+#   fence_step, hp_step, foe_step
+#                states whose fence / player / enemy HP agree after dividing
+#                by the step are merged: far fewer states, but the result is
+#                an estimate, no longer exact
+#   max_states   most states kept per turn (a fixed policy); past it the
+#                least likely go unexplored, over budget
+#   time_limit   seconds; past it every state not yet expanded goes
+#                unexplored, so a call returns a (wider) bracket in time
+#   max_entries  bound on the best-play memo; least recently used entries are
+#                evicted and recomputed when needed, so results stay exact
+#
+# survival_odds() defaults to all of these (DEFAULT_BOUNDS), so a bare call
+# returns in about ten seconds however deep the night; pass epsilon=0, the
+# steps as 1 and no caps for exact odds.
+from __future__ import annotations
+import bisect
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from entities import Enemy, EnemyQueue, ENEMY_NAMES, GameState, SIDES
+import night
+
+NSIDES = len(SIDES)
+
+Foe = Tuple[int, int]  # (hp, dmg)
+Side = Tuple[Foe, ...]  # sorted: strike order (entities._rank, names aside)
+
+class NightState(NamedTuple):
+    turn: int  # turns completed
+    hp: int
+    side: int  # index into SIDES
+    in_tower: bool
+    arrows: int
+    traps: int
+    fences: Tuple[int, ...]
+    enemies: Tuple[Side, ...]
+
+    @property
+    def alive_enemies(self) -> int:
+        return sum(len(s) for s in self.enemies)
+
+Action = Tuple[str, ...]  # night menu choices; leading ones may be free (tower pivot)
+StatePolicy = Callable[[NightState], str]
+
+@dataclass
+class Odds:
+    survival: float
+    fence_hp: float      # expected total fence HP at the end of the night (or at death)
+    unexplored: float    # probability mass left unexplored (epsilon, caps)
+    action: Optional[Action] = None  # best_action() only
+
+def _odds(p: float, f: float, lost: float, action: Optional[Action] = None) -> Odds:
+    # sums of many products drift past the ends of [0, 1] by an ulp or so
+    return Odds(min(1.0, max(0.0, p)), f, min(1.0, max(0.0, lost)), action)
+
+class _OutOfTime(Exception):
+    """time_limit passed (raised mid-table by _batch_dist)."""
+
+def night_state(gs: GameState, queues: Optional[night.Queues] = None, turn: int = 0) -> NightState:
+    """The solver's view of a live night (before any turn: just the GameState)."""
+    enemies: List[Side] = []
+    for s in SIDES:
+        foes = []
+        if queues:
+            # sorted (hp, dmg) is strike order
+            # (EnemyStacks yield one stack per variant: expand by count)
+            foes = sorted((e.hp, e.dmg) for e in queues[s] for _ in range(getattr(e, "count", 1)))
+        enemies.append(tuple(foes))
+    side = SIDES.index(gs.player.side) if gs.player.side in SIDES else 0
+    return NightState(turn, gs.player.hp, side, gs.in_tower, gs.arrows, gs.traps,
+                      tuple(gs.fence(s).hp for s in SIDES), tuple(enemies))
+
+def _insert(side: Side, foes: Iterable[Foe]) -> Side:
+    out = list(side)
+    for f in foes:
+        bisect.insort(out, f)
+    return tuple(out)
+
+def _remove(side: Side, foes: Iterable[Foe]) -> Side:
+    out = list(side)
+    for f in foes:
+        out.remove(f)
+    return tuple(out)
+
+def _merge(dist: Dict, key, p: float):
+    dist[key] = dist.get(key, 0.0) + p
+
+def greedy(state: NightState) -> str:
+    """night.greedy_policy, on a NightState."""
+    if state.enemies[state.side]:
+        return "5"
+    busiest = max(range(NSIDES), key=lambda i: len(state.enemies[i]))
+    if not state.enemies[busiest]:
+        return "7"
+    return str(busiest + 1)
+
+def actions(st: NightState, has_watchtower: bool) -> List[Action]:
+    """Every distinct way to spend the turn."""
+    acts: List[Action] = []
+    if st.in_tower:
+        for i in range(NSIDES):
+            pivot: Action = () if i == st.side else (str(i + 1),)
+            if st.enemies[i]:
+                acts.append(pivot + ("5",))
+            acts.append(pivot + ("7",))
+            acts.append(pivot + ("8",))
+        return acts
+    for i in range(NSIDES):
+        if i != st.side:
+            acts.append((str(i + 1),))
+    if st.enemies[st.side]:
+        acts.append(("5",))
+    acts += [("6",), ("7",)]
+    if has_watchtower:
+        acts.append(("8",))
+    return acts
+
+def adapt(policy: night.Policy, gs: GameState) -> StatePolicy:
+    """Run a night.Policy (which reads a GameState and queues) on solver states.
+
+    Each call rebuilds a scratch GameState, so it is much slower than a
+    policy written against NightState.
+    """
+    scratch = GameState(player=gs.player.__class__(**vars(gs.player)),
+                        has_bow=gs.has_bow, has_watchtower=gs.has_watchtower,
+                        defense_bonus=gs.defense_bonus, day_num=gs.day_num, params=gs.params)
+
+    def run(state: NightState) -> str:
+        scratch.player.hp = state.hp
+        scratch.player.side = SIDES[state.side]
+        scratch.in_tower = state.in_tower
+        scratch.arrows, scratch.traps = state.arrows, state.traps
+        for s, hp in zip(SIDES, state.fences):
+            scratch.fence(s).hp = hp
+        queues = {s: EnemyQueue(Enemy(s, hp, dmg, ENEMY_NAMES[0]) for hp, dmg in foes)
+                  for s, foes in zip(SIDES, state.enemies)}
+        return policy(scratch, queues)
+
+    return run
+
+class Solver:
+    """Night odds for `gs` (its day, stats, bow and tower).
+
+    policy=None solves for the play that maximizes survival (then fence HP);
+    its values stay memoized across calls. A policy that treats the four
+    sides alike may set symmetric=True so mirrored states are merged; best
+    play always does.
+    """
+
+    def __init__(self, gs: GameState, policy: Optional[StatePolicy] = None,
+                 symmetric: bool = False, max_entries: int = 1_000_000,
+                 epsilon: float = 0.0, fence_step: int = 1, hp_step: int = 1,
+                 foe_step: int = 1, max_states: Optional[int] = None,
+                 time_limit: Optional[float] = None):
+        self.policy = policy
+        self.symmetric = symmetric or policy is None
+        self.max_entries = max_entries
+        self.epsilon = epsilon
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self._deadline = float("inf")
+        self.fence_step = fence_step
+        self.hp_step = hp_step
+        self.foe_step = foe_step
+        # without abstraction a state is its own memo key
+        self._plain = not self.symmetric and fence_step == hp_step == foe_step == 1
+        # key -> (survival, fence hp, unexplored)
+        self.memo: "OrderedDict[tuple, Tuple[float, float, float]]" = OrderedDict()
+        self.evictions = 0
+
+        day = gs.day_num
+        params = gs.params
+        self.day = day
+        self.max_alive = params.alive_cap(day)
+        self.damage = gs.player.damage
+        self.defense_bonus = gs.defense_bonus
+        self.has_bow = gs.has_bow
+        self.has_watchtower = gs.has_watchtower
+        self.spawn_chance, self.per_spawn, self.groups = params.wave(day)
+        base_hp, base_dmg = params.enemy_base(day)
+        # scaled_enemy: uniform hp roll, dmg bump picked from enemy_dmg_roll
+        lo, hi = params.enemy_hp_roll
+        rolls = params.enemy_dmg_roll
+        foes: Dict[Foe, float] = {}
+        for dh in range(lo, hi + 1):
+            for dd in rolls:
+                _merge(foes, (max(1, base_hp + dh), base_dmg + dd), 1 / (hi - lo + 1) / len(rolls))
+        if foe_step != 1:
+            # newcomers whose hp share a bucket spawn as one foe at the bucket's
+            # mean hp: the waves shrink with the states
+            buckets: Dict[Foe, List[float]] = {}
+            for (hp, dmg), pf in foes.items():
+                b = buckets.setdefault((hp // foe_step, dmg), [0.0, 0.0])
+                b[0] += pf
+                b[1] += pf * hp
+            foes = {(round(w / pf), dmg): pf for (_, dmg), (pf, w) in buckets.items()}
+        self.foe_dist: List[Tuple[Foe, float]] = list(foes.items())
+        self.trap_kills = params.trap_kills
+        self._batches: Dict[int, List[Tuple[Tuple[Side, ...], float]]] = {}
+        self._traps: Dict[Tuple[Side, ...], List[Tuple[Tuple[Side, ...], float]]] = {}
+        self._hits: Dict[tuple, List[Tuple[Tuple[int, ...], int, float]]] = {}
+        self._profiles: Dict[Tuple[Side, ...], Tuple[Tuple[int, ...], ...]] = {}  # attacker dmgs per side
+
+    # ---- Public ----
+
+    def start(self, gs: GameState, in_tower: bool = False) -> NightState:
+        """The state at dusk, as Night(gs, in_tower=...) would set it up."""
+        st = night_state(gs)
+        return st._replace(side=0, in_tower=gs.has_watchtower and in_tower,
+                           enemies=((),) * NSIDES)
+
+    def solve(self, state: NightState) -> Odds:
+        """Odds from the start of the turn after `state.turn`."""
+        self._start_clock()
+        if self.policy is None:
+            p, f, lost = self._value(state, self.epsilon)
+        else:
+            p, f, lost = self._forward(state)
+        return _odds(p, f, lost)
+
+    def best_action(self, state: NightState) -> Odds:
+        """Best choice once this turn's wave has spawned (state.turn already counts it)."""
+        self._start_clock()
+        best = None
+        for action in self._actions(state):
+            v = self._q(state, action, self.epsilon)
+            if best is None or self._better(v, best[0]):
+                best = (v, action)
+        (p, f, lost), action = best
+        return _odds(p, f, lost, action)
+
+    def _start_clock(self):
+        if self.time_limit is not None:
+            self._deadline = time.perf_counter() + self.time_limit
+
+    # ---- Memo ----
+
+    def _key(self, st: NightState) -> tuple:
+        if self._plain:
+            return st
+        fs, hs = self.fence_step, self.hp_step
+        fences = st.fences if fs == 1 else tuple(f // fs for f in st.fences)
+        hp = st.hp if hs == 1 else st.hp // hs
+        arrows = st.arrows if self.has_bow and self.has_watchtower else 0
+        enemies = st.enemies
+        if self.foe_step != 1:
+            es = self.foe_step
+            enemies = tuple(tuple((hp // es, dmg) for hp, dmg in foes) for foes in enemies)
+        if not self.symmetric:
+            return (st.turn, hp, st.side, st.in_tower, arrows, st.traps, fences, enemies)
+        # Sides are interchangeable apart from the one the player holds
+        others = sorted((fences[i], enemies[i]) for i in range(NSIDES) if i != st.side)
+        return (st.turn, hp, st.in_tower, arrows, st.traps,
+                fences[st.side], enemies[st.side], tuple(others))
+
+    def _value(self, st: NightState, tol: float = 0.0) -> Tuple[float, float, float]:
+        """Odds from st, leaving at most a share `tol` of its mass unexplored."""
+        key = self._key(st)
+        memo = self.memo
+        hit = memo.get(key)
+        # an entry that left more unexplored than this state may is too coarse
+        if hit is not None and hit[2] <= tol:
+            memo.move_to_end(key)
+            return hit
+        try:
+            if time.perf_counter() > self._deadline:
+                raise _OutOfTime
+            waves = self._spawn(st)
+        except _OutOfTime:
+            return 0.0, 0.0, 1.0  # not memoized
+        if self.policy is None:
+            p = f = lost = 0.0
+            if tol > 0.0:
+                # two cuts a turn (waves here, outcomes in _expect) to the end
+                waves, lost = _prune(waves, tol / (2 * (night.TURNS - st.turn) - 1))
+                if lost < 1.0:
+                    tol = (tol - lost) / (1.0 - lost)
+            for k, (wave, pr) in enumerate(waves):
+                if time.perf_counter() > self._deadline:
+                    lost += sum(q for _, q in waves[k:])
+                    break
+                v = None
+                for action in self._actions(wave):
+                    q = self._q(wave, action, tol)
+                    if v is None or self._better(q, v):
+                        v = q
+                p += pr * v[0]
+                f += pr * v[1]
+                lost += pr * v[2]
+            res = (p, f, lost)
+        else:
+            # one fixed action per wave: pool the whole turn's outcomes, so a
+            # state reached several ways is looked up once
+            ends: Dict[tuple, list] = {}
+            term = [0.0, 0.0]
+            for wave, pr in waves:
+                self._collect(wave, self._policy_action(wave), pr, ends, term)
+            res = self._expect(ends, term, tol)
+        memo[key] = res
+        memo.move_to_end(key)
+        if len(memo) > self.max_entries:
+            memo.popitem(last=False)
+            self.evictions += 1
+        return res
+
+    def _forward(self, st: NightState) -> Tuple[float, float, float]:
+        """A fixed policy, pushed forward a turn at a time.
+
+        Each turn's states are merged by memo key with their total probability,
+        so pruning drops the states that really are least likely.
+        """
+        layer: Dict[tuple, list] = {self._key(st): [st, 1.0]}
+        p = f = lost = 0.0
+        turn = st.turn
+        while layer:
+            nxt: Dict[tuple, list] = {}
+            term = [0.0, 0.0]
+            states = list(layer.values())
+            if self.epsilon > lost or (self.max_states and len(states) > self.max_states):
+                states, dropped = _prune(states, (self.epsilon - lost) / (night.TURNS - turn),
+                                         self.max_states)
+                lost += dropped
+            for k, (cur, mass) in enumerate(states):
+                try:
+                    if time.perf_counter() > self._deadline:
+                        raise _OutOfTime
+                    waves = self._spawn(cur)
+                except _OutOfTime:
+                    # this state, the rest and all they led to
+                    lost += sum(m for _, m in states[k:]) + sum(m for _, m in nxt.values())
+                    return p + term[0], f + term[1], lost
+                for wave, pr in waves:
+                    self._collect(wave, self._policy_action(wave), mass * pr, nxt, term)
+            p += term[0]
+            f += term[1]
+            layer = nxt
+            turn += 1
+        return p, f, lost
+
+    @staticmethod
+    def _better(a: Tuple[float, float, float], b: Tuple[float, float, float]) -> bool:
+        if abs(a[0] - b[0]) > 1e-12:
+            return a[0] > b[0]
+        return a[1] > b[1] + 1e-9
+
+    # ---- Transitions ----
+
+    def _spawn(self, st: NightState) -> List[Tuple[NightState, float]]:
+        """begin_turn(): the wave and traps, as (state, probability)."""
+        st = st._replace(turn=st.turn + 1)
+        alive = st.alive_enemies
+        if alive >= self.max_alive:
+            return [(st, 1.0)]
+        out: Dict[NightState, float] = {}
+        for batch, pb in self._batch_dist(self.max_alive - alive):
+            enemies = tuple(_insert(s, b) for s, b in zip(st.enemies, batch))
+            if not any(batch) or st.traps <= 0:
+                _merge(out, st._replace(enemies=enemies), pb)
+                continue
+            for victims, pv in self._trap_dist(batch):
+                after = tuple(_remove(s, v) for s, v in zip(enemies, victims))
+                _merge(out, st._replace(enemies=after, traps=st.traps - 1), pb * pv)
+        return list(out.items())
+
+    def _batch_dist(self, slots: int) -> List[Tuple[Tuple[Side, ...], float]]:
+        """_spawn_pattern + scaled_enemy: newcomers per side, in spawn order."""
+        cached = self._batches.get(slots)
+        if cached is not None:
+            return cached
+        empty = ((),) * NSIDES
+        dist: Dict[Tuple[Side, ...], float] = {empty: 1.0 - self.spawn_chance}
+        layer = {(empty, slots): self.spawn_chance}
+        for _ in range(self.groups):
+            nxt: Dict[Tuple[Tuple[Side, ...], int], float] = {}
+            for (batch, left), p in layer.items():
+                if time.perf_counter() > self._deadline:
+                    raise _OutOfTime
+                if left <= 0:
+                    _merge(nxt, (batch, left), p)
+                    continue
+                count = min(self.per_spawn, left)
+                for side in range(NSIDES):
+                    partial = {batch: p / NSIDES}
+                    for _ in range(count):
+                        grown: Dict[Tuple[Side, ...], float] = {}
+                        for b, pb in partial.items():
+                            for foe, pf in self.foe_dist:
+                                nb = b[:side] + (b[side] + (foe,),) + b[side + 1:]
+                                _merge(grown, nb, pb * pf)
+                        partial = grown
+                    for b, pb in partial.items():
+                        _merge(nxt, (b, left - count), pb)
+            layer = nxt
+        for (batch, _), p in layer.items():
+            _merge(dist, batch, p)
+        res = list(dist.items())
+        self._batches[slots] = res
+        return res
+
+    def _trap_dist(self, batch: Tuple[Side, ...]) -> List[Tuple[Tuple[Side, ...], float]]:
+        """Victims of one trap on `batch`: trap_kills of the newcomers, uniformly."""
+        cached = self._traps.get(batch)
+        if cached is not None:
+            return cached
+        flat = [(i, foe) for i, foes in enumerate(batch) for foe in foes]
+        dist: Dict[Tuple[Side, ...], float] = {}
+        lo, hi = self.trap_kills
+        for kills in range(lo, hi + 1):
+            combos = list(itertools.combinations(range(len(flat)), min(kills, len(flat))))
+            for combo in combos:
+                victims: List[List[Foe]] = [[] for _ in range(NSIDES)]
+                for j in combo:
+                    i, foe = flat[j]
+                    victims[i].append(foe)
+                _merge(dist, tuple(tuple(v) for v in victims), 1 / (hi - lo + 1) / len(combos))
+        res = list(dist.items())
+        self._traps[batch] = res
+        return res
+
+    def _actions(self, st: NightState) -> List[Action]:
+        return actions(st, self.has_watchtower)
+
+    def _policy_action(self, st: NightState) -> Action:
+        """Ask the policy until it spends the turn, like simulate_night."""
+        action: List[str] = []
+        for _ in range(night.MAX_FREE_ACTIONS):
+            choice = self.policy(st)
+            action.append(choice)
+            consumed, nxt = self._free(st, choice)
+            if consumed:
+                return tuple(action)
+            st = nxt
+        return tuple(action) + ("",)  # forfeits the turn
+
+    def _free(self, st: NightState, choice: str) -> Tuple[bool, NightState]:
+        """(consumes the turn?, state after a choice that doesn't)."""
+        if choice in ("1", "2", "3", "4"):
+            target = int(choice) - 1
+            if st.in_tower:
+                return False, st._replace(side=target)
+            return target != st.side, st
+        if choice == "6" and self.has_watchtower and st.in_tower:
+            return False, st
+        return choice in ("5", "6", "7") or (choice == "8" and self.has_watchtower), st
+
+    def _q(self, st: NightState, action: Action, tol: float = 0.0) -> Tuple[float, float, float]:
+        """Value of taking `action` in a post-spawn state, leaving at most a
+        share `tol` unexplored."""
+        ends: Dict[tuple, list] = {}
+        term = [0.0, 0.0]
+        self._collect(st, action, 1.0, ends, term)
+        return self._expect(ends, term, tol)
+
+    def _collect(self, st: NightState, action: Action, weight: float,
+                 ends: Dict[tuple, list], term: List[float]):
+        """Add the outcomes of `action` to `ends` (memo key -> [state, prob]).
+
+        Nights that end this turn go straight into term: [P(survived), E[fence HP]].
+        """
+        *free, choice = action
+        for c in free:
+            st = self._free(st, c)[1]
+        key = None if self._plain else self._key
+        last = st.turn >= night.TURNS
+        for after, pa, defending in self._act(st, choice):
+            turn, side, in_tower, arrows, traps, enemies = (
+                after.turn, after.side, after.in_tower, after.arrows, after.traps, after.enemies)
+            (f0, f1, f2, f3), hp = after.fences, after.hp
+            w = weight * pa
+            for (d0, d1, d2, d3), loss, pe in self._volleys(after, defending):
+                pr = w * pe
+                fences = (f0 - d0 if f0 > d0 else 0, f1 - d1 if f1 > d1 else 0,
+                          f2 - d2 if f2 > d2 else 0, f3 - d3 if f3 > d3 else 0)
+                left = hp - loss
+                if left <= 0:
+                    term[1] += pr * sum(fences)
+                elif last:
+                    term[0] += pr
+                    term[1] += pr * sum(fences)
+                else:
+                    end = NightState(turn, left, side, in_tower, arrows, traps, fences, enemies)
+                    k = end if key is None else key(end)
+                    slot = ends.get(k)
+                    if slot is None:
+                        ends[k] = [end, pr]
+                    else:
+                        slot[1] += pr
+
+    def _expect(self, ends: Dict[tuple, list], term: List[float],
+                tol: float) -> Tuple[float, float, float]:
+        """Combine a turn's outcomes; `tol` is the share of them (ends and
+        term together weigh 1) that may go unexplored."""
+        p, f = term
+        states = list(ends.values())
+        if not states:
+            return p, f, 0.0
+        if time.perf_counter() > self._deadline:
+            return p, f, sum(pr for _, pr in states)
+        lost = 0.0
+        if tol > 0.0:
+            # this turn's share of the budget; the rest goes to the states kept
+            states, lost = _prune(states, tol / (2 * (night.TURNS - states[0][0].turn)))
+            kept = sum(pr for _, pr in states)
+            if kept > 0.0:
+                tol = (tol - lost) / kept
+        for end, pr in states:
+            v = self._value(end, tol)
+            p += pr * v[0]
+            f += pr * v[1]
+            lost += pr * v[2]
+        return p, f, lost
+
+    def _act(self, st: NightState, choice: str) -> List[Tuple[NightState, float, bool]]:
+        """_resolve_player_action for a turn-consuming choice: (state, prob, defending)."""
+        if choice in ("1", "2", "3", "4"):
+            return [(st._replace(side=int(choice) - 1), 1.0, False)]
+        if choice == "5":
+            foes = st.enemies[st.side]
+            if not foes:
+                return [(st, 1.0, False)]
+            arrows = st.arrows
+            if self.has_bow and arrows > 0 and st.in_tower:
+                arrows -= 1
+            (hp, dmg), rest = foes[0], foes[1:]
+            outs = []
+            for roll in (0, 1, 2):
+                left = hp - (self.damage + roll)
+                side = rest if left <= 0 else ((left, dmg),) + rest
+                enemies = st.enemies[:st.side] + (side,) + st.enemies[st.side + 1:]
+                outs.append((st._replace(enemies=enemies, arrows=arrows), 1 / 3, False))
+            return outs
+        if choice == "6":
+            return [(st, 1.0, True)]
+        if choice == "8" and self.has_watchtower:
+            return [(st._replace(in_tower=not st.in_tower), 1.0, False)]
+        return [(st, 1.0, False)]  # wait, or a forfeited turn
+
+    def _volleys(self, st: NightState, defending: bool) -> List[Tuple[Tuple[int, ...], int, float]]:
+        """_enemies_attack as (damage to each fence, damage to the player, probability)."""
+        exposed = self.has_watchtower and st.in_tower
+        up = tuple(f > 0 for f in st.fences)
+        profile = self._profiles.get(st.enemies)
+        if profile is None:
+            profile = self._profiles[st.enemies] = tuple(
+                tuple(sorted(d for _, d in foes)) for foes in st.enemies)
+        key = (up, profile, st.side if defending else -1, exposed)
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = self._hit_dist(up, profile, key[2], exposed)
+        return hits
+
+    def _hit_dist(self, up: Tuple[bool, ...], profile: Tuple[Tuple[int, ...], ...],
+                  defended: int, exposed: bool) -> List[Tuple[Tuple[int, ...], int, float]]:
+        """One attacker per occupied side, chosen uniformly."""
+        dist: Dict[Tuple[Tuple[int, ...], int], float] = {((0,) * NSIDES, 0): 1.0}
+        for i, dmgs in enumerate(profile):
+            if not dmgs:
+                continue
+            rolls: Dict[int, float] = {}
+            for dmg in dmgs:
+                _merge(rolls, dmg, 1 / len(dmgs))
+            nxt: Dict[Tuple[Tuple[int, ...], int], float] = {}
+            for (fd, loss), p in dist.items():
+                for dmg, pd in rolls.items():
+                    if up[i]:
+                        if self.defense_bonus > 0:
+                            dmg = int(dmg * (1 - self.defense_bonus))
+                        _merge(nxt, (fd[:i] + (dmg,) + fd[i + 1:], loss), p * pd)
+                    else:
+                        if i == defended:
+                            dmg = max(0, dmg - 2)
+                        _merge(nxt, (fd, loss + dmg + exposed), p * pd)
+            dist = nxt
+        return [(fd, loss, p) for (fd, loss), p in dist.items()]
+
+def _prune(states: List[list], budget: float, cap: Optional[int] = None) -> Tuple[List[list], float]:
+    """Drop the least likely [state, prob] entries while their total stays
+    within `budget`, then any beyond the `cap` most likely. (kept, mass dropped)"""
+    states.sort(key=lambda sp: sp[1])
+    cut, n = 0.0, 0
+    for _, pr in states:
+        if cut + pr > budget:
+            break
+        cut += pr
+        n += 1
+    if cap is not None and len(states) - n > cap:
+        n = len(states) - cap
+    return states[n:], sum(pr for _, pr in states[:n])
+
+# survival_odds() defaults: a bare call is an estimate, back in about ten seconds
+DEFAULT_BOUNDS = dict(epsilon=1e-3, fence_step=5, hp_step=2, foe_step=2,
+                      max_states=2_000, time_limit=10.0)
+
+def survival_odds(gs: GameState, in_tower: bool = False,
+                  policy: Optional[night.Policy] = night.greedy_policy, **kwargs) -> Odds:
+    """Odds of getting through tonight from gs: with `policy`, or best play if None.
+
+    night.greedy_policy is solved through its NightState twin; other
+    policies go through adapt(). Solver arguments not given default to
+    DEFAULT_BOUNDS.
+    """
+    kwargs = {**DEFAULT_BOUNDS, **kwargs}
+    if policy is night.greedy_policy:
+        sp: Optional[StatePolicy] = greedy
+    elif policy is None:
+        sp = None
+    else:
+        sp = adapt(policy, gs)
+    solver = Solver(gs, sp, **kwargs)
+    return solver.solve(solver.start(gs, in_tower))
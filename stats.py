@@ -0,0 +1,189 @@
+# stats.py
+# Streaming statistics for simulation sweeps.
+#
+# A Stat takes integer observations one at a time and keeps, in memory that
+# does not grow with the number of observations:
+#
+#   count, sum and sum of squares   exact Python ints: mean and variance
+#   min and max
+#   a quantile sketch               exact counts per value below EXACT, and
+#                                   log-spaced buckets (relative error ALPHA)
+#                                   above it
+#
+# Everything in a Stat is a count or an integer sum, so merge() is exact:
+# merging per-worker Stats gives the same object, to the bit, as one Stat
+# fed every observation in any order. Game quantities (days, fence HP,
+# wood) stay below EXACT, so their quantiles and histograms are exact too.
+#
+# SweepStats is the set of Stats a campaign sweep reports: day reached,
+# end-of-night fence HP, breaches per night, and wood/food at dusk.
+from __future__ import annotations
+import bisect
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+EXACT = 4096
+ALPHA = 0.01
+_GAMMA = (1 + ALPHA) / (1 - ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+_BASE = math.ceil(math.log(EXACT) / _LOG_GAMMA)  # first log bucket index
+
+def _key(v: int) -> int:
+    a = abs(v)
+    if a < EXACT:
+        return v
+    k = EXACT + math.ceil(math.log(a) / _LOG_GAMMA) - _BASE
+    return k if v > 0 else -k
+
+def _value(k: int) -> float:
+    """Representative value of bucket k (the value itself below EXACT)."""
+    a = abs(k)
+    if a < EXACT:
+        return k
+    v = 2 * _GAMMA ** (a - EXACT + _BASE) / (_GAMMA + 1)
+    return v if k > 0 else -v
+
+class Stat:
+    __slots__ = ("count", "total", "squares", "lo", "hi", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.lo: Optional[int] = None
+        self.hi: Optional[int] = None
+        self.buckets: Counter = Counter()
+
+    def add(self, v: int, n: int = 1):
+        """Observe v, n times."""
+        self.count += n
+        self.total += v * n
+        self.squares += v * v * n
+        if self.lo is None or v < self.lo:
+            self.lo = v
+        if self.hi is None or v > self.hi:
+            self.hi = v
+        self.buckets[_key(v)] += n
+
+    def merge(self, other: "Stat") -> "Stat":
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        if other.lo is not None and (self.lo is None or other.lo < self.lo):
+            self.lo = other.lo
+        if other.hi is not None and (self.hi is None or other.hi > self.hi):
+            self.hi = other.hi
+        self.buckets.update(other.buckets)
+        return self
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Stat) and all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1)."""
+        if self.count < 2:
+            return math.nan
+        return (self.squares - self.total * self.total / self.count) / (self.count - 1)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        """Smallest value reached by at least a share q of the observations."""
+        if not self.count:
+            return math.nan
+        need, seen = q * self.count, 0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if seen >= need:
+                return min(max(_value(k), self.lo), self.hi)
+        return self.hi
+
+    def histogram(self, bounds: Sequence[float]) -> List[int]:
+        """Counts per bucket of upper bounds, last is +Inf (as metrics.Histogram)."""
+        counts = [0] * (len(bounds) + 1)
+        for k, n in self.buckets.items():
+            counts[bisect.bisect_left(bounds, _value(k))] += n
+        return counts
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total": self.total, "squares": self.squares,
+                "lo": self.lo, "hi": self.hi, "buckets": {str(k): n for k, n in sorted(self.buckets.items())}}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Stat":
+        s = cls()
+        s.count, s.total, s.squares, s.lo, s.hi = d["count"], d["total"], d["squares"], d["lo"], d["hi"]
+        s.buckets = Counter({int(k): n for k, n in d["buckets"].items()})
+        return s
+
+FIELDS = ("day", "fence_hp", "breaches", "wood", "food")
+
+class SweepStats:
+    """What a sweep of campaigns reports, in constant memory.
+
+    day       day reached, per run
+    fence_hp  all fences' HP at the end of each night
+    breaches  breaches per night
+    wood      wood at dusk, per day played
+    food      food at dusk, per day played
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, Stat] = {name: Stat() for name in FIELDS}
+        self.causes: Counter = Counter()
+
+    def __getitem__(self, name: str) -> Stat:
+        return self.stats[name]
+
+    @property
+    def runs(self) -> int:
+        return self.stats["day"].count
+
+    def dusk(self, wood: int, food: int):
+        self.stats["wood"].add(wood)
+        self.stats["food"].add(food)
+
+    def night(self, fence_hp: int, breaches: int):
+        self.stats["fence_hp"].add(fence_hp)
+        self.stats["breaches"].add(breaches)
+
+    def end(self, day: int, cause: str):
+        self.stats["day"].add(day)
+        self.causes[cause] += 1
+
+    def merge(self, other: "SweepStats") -> "SweepStats":
+        for name, s in other.stats.items():
+            self.stats[name].merge(s)
+        self.causes.update(other.causes)
+        return self
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SweepStats) and self.stats == other.stats and self.causes == other.causes
+
+    def to_dict(self) -> dict:
+        return {"stats": {n: s.to_dict() for n, s in self.stats.items()}, "causes": dict(self.causes)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SweepStats":
+        out = cls()
+        out.stats.update({n: Stat.from_dict(s) for n, s in d["stats"].items()})
+        out.causes = Counter(d["causes"])
+        return out
+
+    def report(self) -> str:
+        lines = []
+        for name, s in self.stats.items():
+            if s.count:
+                lines.append(f"{name:9s} n {s.count:<9d} mean {s.mean:8.2f} sd {s.stdev:7.2f} | "
+                             f"p10 {s.quantile(0.1):6.0f} p50 {s.quantile(0.5):6.0f} "
+                             f"p90 {s.quantile(0.9):6.0f} max {s.hi}")
+        lines.append(" | ".join(f"{c}: {n}" for c, n in self.causes.most_common()))
+        return "\n".join(lines)
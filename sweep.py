@@ -0,0 +1,293 @@
+# sweep.py
+# Balance sweeps over the Difficulty constants.
+#
+# A point (one Difficulty) is scored by playing `runs` headless campaigns
+# and recording the day each reached. Every point plays the same seeds, so
+# differences between points are the parameters', not the dice. The
+# campaigns of all pending points are split into shards and spread over one
+# process pool.
+#
+# Results are cached on disk, one JSON file per point, keyed on the
+# parameter hash, the seed range, max_days, the policies and a code version
+# (a hash of the modules that decide a game: found by following imports from
+# the campaign and the policies' modules), so a re-run only plays the points
+# it hasn't seen, and editing the game invalidates everything.
+#
+#   python sweep.py grid --set enemy_hp_per_day=1.0,1.2,1.4 --set max_alive=2,3
+#   python sweep.py tune --range spawn_chance=0.2:0.5 --target-day 12
+#
+# Values are numbers; tuples are written 3/6, craft costs as costs.Bow=6,8.
+from __future__ import annotations
+import argparse
+import ast
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import campaign
+from difficulty import DEFAULT, Difficulty, as_dict, param_hash
+import main
+import night
+
+CACHE_DIR = ".sweep_cache"
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _imported_files(roots: Iterable[str]) -> Tuple[str, ...]:
+    """roots and every module of this directory they import, directly or not."""
+    seen, todo = set(), list(roots)
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(_HERE, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                mods = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                mods = [node.module]
+            else:
+                continue
+            todo.extend(f"{m}.py" for m in mods if os.path.exists(os.path.join(_HERE, f"{m}.py")))
+    return tuple(sorted(seen))
+
+# the modules whose source decides how a campaign plays out: these, what
+# they import (followed through the source), and the policies' modules
+CODE_ROOTS = ("campaign.py", "difficulty.py", "main.py", "night.py")
+CODE_FILES = _imported_files(CODE_ROOTS)
+
+@dataclass
+class Outcome:
+    params: Difficulty
+    days: Dict[int, int]    # day reached -> runs
+    causes: Dict[str, int]  # "overrun" / "starved" / "survived" -> runs
+    cached: bool = False
+
+    @property
+    def runs(self) -> int:
+        return sum(self.days.values())
+
+    @property
+    def mean_day(self) -> float:
+        return sum(d * n for d, n in self.days.items()) / self.runs
+
+    def quantile(self, q: float) -> int:
+        """Smallest day reached by at least a share q of the runs."""
+        need, seen = q * self.runs, 0
+        for d in sorted(self.days):
+            seen += self.days[d]
+            if seen >= need:
+                return d
+        return max(self.days)
+
+def code_version(files: Iterable[str] = CODE_FILES) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for name in files:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()
+
+class Cache:
+    """One JSON file per (point, seed range, settings, code version)."""
+
+    def __init__(self, path: str = CACHE_DIR):
+        self.path = path
+        self.version = code_version()
+        self._versions: Dict[Tuple[str, ...], str] = {(): self.version}
+        os.makedirs(path, exist_ok=True)
+
+    def version_for(self, modules: Tuple[str, ...]) -> str:
+        """code_version() with these modules (policies') and their imports added."""
+        v = self._versions.get(modules)
+        if v is None:
+            v = self._versions[modules] = code_version(_imported_files(CODE_ROOTS + modules))
+        return v
+
+    def key(self, params: Difficulty, base_seed: int, runs: int, max_days: int,
+            policies: Tuple[str, str], version: Optional[str] = None) -> str:
+        version = version or self.version
+        text = f"{param_hash(params)}:{base_seed}:{runs}:{max_days}:{policies[0]}:{policies[1]}:{version}"
+        return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.path, key + ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, rec: dict):
+        path = os.path.join(self.path, key + ".json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rec, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+def _policy_name(fn: Callable) -> str:
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+def _policy_files(*fns: Callable) -> Tuple[str, ...]:
+    names = {f"{fn.__module__}.py" for fn in fns}
+    return tuple(sorted(n for n in names if os.path.exists(os.path.join(_HERE, n))))
+
+def evaluate(points: Sequence[Difficulty], runs: int = 200, base_seed: int = 0,
+             max_days: int = 100, workers: Optional[int] = None, cache: Optional[Cache] = None,
+             shard_size: int = 25, day_policy: main.DayPolicy = main.steady_day_policy,
+             night_policy: night.Policy = night.greedy_policy) -> List[Outcome]:
+    """Score every point on the seed range [0, runs) of base_seed, in order."""
+    policies = (_policy_name(day_policy), _policy_name(night_policy))
+    version = cache.version_for(_policy_files(day_policy, night_policy)) if cache else None
+    out: List[Optional[Outcome]] = [None] * len(points)
+    pending: Dict[str, List[int]] = {}  # param hash -> indices (duplicates play once)
+    keys: Dict[str, Optional[str]] = {}
+    for i, p in enumerate(points):
+        ph = param_hash(p)
+        key = cache.key(p, base_seed, runs, max_days, policies, version) if cache else None
+        rec = cache.get(key) if key else None
+        if rec is not None:
+            out[i] = Outcome(p, {int(d): n for d, n in rec["days"].items()}, rec["causes"], cached=True)
+        else:
+            pending.setdefault(ph, []).append(i)
+            keys[ph] = key
+
+    shards = [(ph, (start, min(start + shard_size, runs), base_seed, max_days,
+                    day_policy, night_policy, points[idx[0]]))
+              for ph, idx in pending.items() for start in range(0, runs, shard_size)]
+    days: Dict[str, Counter] = {ph: Counter() for ph in pending}
+    causes: Dict[str, Counter] = {ph: Counter() for ph in pending}
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(shards) <= 1:
+        results: Iterable = map(campaign._run_shard, (args for _, args in shards))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(campaign._run_shard, [args for _, args in shards])
+    try:
+        for (ph, _), shard in zip(shards, results):
+            for r in shard:
+                days[ph][r.day] += 1
+                causes[ph][r.cause] += 1
+    finally:
+        if pool:
+            pool.shutdown()
+
+    for ph, idx in pending.items():
+        rec = {"params": as_dict(points[idx[0]]), "days": dict(days[ph]), "causes": dict(causes[ph])}
+        if cache and keys[ph]:
+            cache.put(keys[ph], rec)
+        for i in idx:
+            out[i] = Outcome(points[i], dict(days[ph]), dict(causes[ph]))
+    return out  # type: ignore[return-value]
+
+def with_values(base: Difficulty, values: Dict[str, Any]) -> Difficulty:
+    """dataclasses.replace, also taking "costs.<item>" keys."""
+    costs = {k.split(".", 1)[1]: v for k, v in values.items() if k.startswith("costs.")}
+    plain = {k: v for k, v in values.items() if not k.startswith("costs.")}
+    if costs:
+        plain["costs"] = {**base.costs, **costs}
+    return dataclasses.replace(base, **plain)
+
+def grid(base: Difficulty, axes: Dict[str, Sequence[Any]]) -> List[Difficulty]:
+    """Every combination of the axis values, applied to base."""
+    names = list(axes)
+    return [with_values(base, dict(zip(names, combo)))
+            for combo in itertools.product(*(axes[n] for n in names))]
+
+def _value(base: Difficulty, name: str) -> Any:
+    if name.startswith("costs."):
+        return base.costs[name.split(".", 1)[1]]
+    return getattr(base, name)
+
+def tune(base: Difficulty, ranges: Dict[str, Tuple[float, float]],
+         objective: Callable[[Outcome], float], rounds: int = 3, points: int = 5,
+         **kwargs) -> Tuple[Outcome, List[Outcome]]:
+    """Coordinate search: per round and parameter, try `points` values across
+    its current range and keep the best (lowest objective), then narrow the
+    range around it. Returns the best outcome and everything evaluated.
+    Only numeric parameters can be tuned; kwargs go to evaluate().
+    """
+    for name in ranges:
+        if not isinstance(_value(base, name), (int, float)):
+            raise ValueError(f"{name} is not a number")
+    bounds = dict(ranges)
+    best = evaluate([base], **kwargs)[0]
+    history = [best]
+    for _ in range(rounds):
+        for name, (lo, hi) in bounds.items():
+            integer = isinstance(_value(base, name), int)
+            step = (hi - lo) / (points - 1)
+            vals = sorted({round(lo + k * step) if integer else lo + k * step for k in range(points)})
+            outs = evaluate([with_values(best.params, {name: v}) for v in vals], **kwargs)
+            history += outs
+            best = min([best, *outs], key=objective)
+            v = _value(best.params, name)
+            span = max(step, 1) if integer else step
+            bounds[name] = (max(ranges[name][0], v - span), min(ranges[name][1], v + span))
+    return best, history
+
+# ---- CLI ----
+
+def _parse(name: str, text: str) -> Any:
+    default = _value(DEFAULT, name)
+    if isinstance(default, tuple):
+        return tuple(type(default[0])(x) for x in text.split("/"))
+    return type(default)(text)
+
+def _changes(p: Difficulty) -> str:
+    a, b = as_dict(DEFAULT), as_dict(p)
+    parts = [f"{k}={b[k]}" for k in a if k != "costs" and a[k] != b[k]]
+    parts += [f"costs.{k}={v}" for k, v in b["costs"].items() if a["costs"].get(k) != v]
+    return " ".join(parts) or "(defaults)"
+
+def _report(o: Outcome):
+    print(f"mean day {o.mean_day:6.2f} | p10 {o.quantile(0.1):3d} p50 {o.quantile(0.5):3d} "
+          f"p90 {o.quantile(0.9):3d} | {'cached' if o.cached else 'new   '} | {_changes(o.params)}")
+
+def main_cli():
+    ap = argparse.ArgumentParser(description="Sweep difficulty parameters over headless campaigns.")
+    sub = ap.add_subparsers(dest="mode", required=True)
+    g = sub.add_parser("grid", help="evaluate every combination of --set values")
+    g.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2,...")
+    t = sub.add_parser("tune", help="search --range bounds for a mean survival day")
+    t.add_argument("--range", action="append", default=[], metavar="NAME=LO:HI")
+    t.add_argument("--target-day", type=float, required=True)
+    t.add_argument("--rounds", type=int, default=3)
+    t.add_argument("--points", type=int, default=5)
+    for p in (g, t):
+        p.add_argument("--runs", type=int, default=200)
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--max-days", type=int, default=100)
+        p.add_argument("--workers", type=int, default=None)
+        p.add_argument("--cache", default=CACHE_DIR)
+        p.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+
+    kwargs = dict(runs=args.runs, base_seed=args.seed, max_days=args.max_days, workers=args.workers,
+                  cache=None if args.no_cache else Cache(args.cache))
+    if args.mode == "grid":
+        axes = {}
+        for spec in args.set:
+            name, _, vals = spec.partition("=")
+            axes[name] = [_parse(name, v) for v in vals.split(",")]
+        for o in evaluate(grid(DEFAULT, axes), **kwargs):
+            _report(o)
+    else:
+        ranges = {}
+        for spec in args.range:
+            name, _, span = spec.partition("=")
+            lo, _, hi = span.partition(":")
+            ranges[name] = (_parse(name, lo), _parse(name, hi))
+        best, history = tune(DEFAULT, ranges, lambda o: abs(o.mean_day - args.target_day),
+                             args.rounds, args.points, **kwargs)
+        print(f"{len(history)} points ({sum(o.cached for o in history)} cached); best:")
+        _report(best)
+
+if __name__ == "__main__":
+    main_cli()
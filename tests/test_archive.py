@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+import archive
+from archive import Archive, Run
+
+def _runs(n=60, seed=4):
+    rng = random.Random(seed)
+    return [Run(i, 1, "overrun", 0, 0,
+                tuple((rng.randrange(50), rng.randrange(-5, 9), rng.randrange(200))
+                      for _ in range(rng.choice((0, 1, 2, 5, 9, 14)))))
+            for i in range(n)]
+
+def _reference(runs, k):
+    out = []
+    for d in range(max(len(r.days) for r in runs)):
+        vals = [r.days[d][k] for r in runs if len(r.days) > d]
+        out.append(sum(vals) / len(vals))
+    return out
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_day_means_average_the_runs_that_reached_each_day(tmp_path, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(archive, "np", None)
+    runs = _runs()
+    with Archive(str(tmp_path)) as a:
+        assert a.day_means("wood") == []
+        for r in runs:
+            a.append(r)
+        a.flush()
+        for k, name in enumerate(("wood", "food", "fence_hp")):
+            assert a.day_means(name) == pytest.approx(_reference(runs, k))
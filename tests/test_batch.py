@@ -0,0 +1,47 @@
+import copy
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch
+import night
+import recipes
+from entities import GameState
+from rng import GameRNG
+
+NIGHTS = 2000        # scalar nights per case
+BATCH = 20000
+
+def _start(day, upgrades):
+    gs = GameState(rng=GameRNG(0))
+    gs.day_num = day
+    gs.player.update_stats(day, gs.params)
+    for name in upgrades:
+        gs.player.wood = 999
+        recipes.craft(gs, recipes.BY_NAME[name].id)
+    gs.player.wood = 10
+    gs.arrows = 10
+    return gs
+
+@pytest.mark.parametrize("day,upgrades", [
+    (1, ()),
+    (2, ()),
+    (2, ("Spear", "Bow")),
+    (3, ("Reinforce Fences", "Reinforce Fences")),
+])
+def test_batch_matches_scalar_nights(day, upgrades):
+    start = _start(day, upgrades)
+    vec = batch.simulate_nights(start, BATCH, seed=1).summary()
+    survived = breaches = kills = 0
+    for i in range(NIGHTS):
+        gs = copy.deepcopy(start)
+        gs.rng = GameRNG(100 + i)
+        res = night.simulate_night(gs)
+        survived += res.survived
+        breaches += res.breaches
+        kills += res.kills
+    # about four standard errors of the scalar sample
+    assert vec["survival_rate"] == pytest.approx(survived / NIGHTS, abs=0.045)
+    assert vec["mean_breaches"] == pytest.approx(breaches / NIGHTS, abs=0.3)
+    assert vec["mean_kills"] == pytest.approx(kills / NIGHTS, abs=0.3)
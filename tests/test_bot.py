@@ -0,0 +1,102 @@
+import bot
+import night
+from bot import SearchBot
+from entities import Enemy, ENEMY_NAMES, GameState
+from journal import flatten_state
+from rng import GameRNG
+
+def _bot(**kw):
+    return SearchBot(budget=None, max_iterations=40, seed=11, **kw)
+
+def _game(seed=3):
+    gs = GameState(rng=GameRNG(seed))
+    gs.day_num = 4
+    return gs
+
+def _recorded(b: SearchBot):
+    """b as a policy that logs (turn, choice) for every choice it makes."""
+    said = []
+
+    def policy(gs, queues):
+        said.append((b.turn, b(gs, queues)))
+        return said[-1][1]
+
+    return policy, said
+
+def test_seeded_night_plays_the_same_twice():
+    runs = []
+    for _ in range(2):
+        gs, b = _game(), _bot()
+        policy, said = _recorded(b)
+        res = night.simulate_night(gs, policy, on_turn=b.on_turn)
+        runs.append((said, vars(res), flatten_state(gs)))
+    assert runs[0] == runs[1]
+    assert len(runs[0][0]) >= night.TURNS or not runs[0][1]["survived"]
+
+def _tower_position():
+    """In the tower facing North, with enemies only to the East."""
+    gs = _game()
+    gs.has_bow = gs.has_watchtower = True
+    gs.arrows = 10
+    nt = night.Night(gs, in_tower=True, horde=False)
+    nt.begin_turn()
+    for q in nt.enemy_queues.values():
+        q.prune()
+        while len(q):
+            q.pop_front()
+    for hp in (4, 5):
+        nt.enemy_queues["East"].push(Enemy("East", hp, 2, ENEMY_NAMES[0]))
+    return gs, nt
+
+class _Scripted(SearchBot):
+    """Plays a fixed action per turn, to watch how SearchBot feeds it out."""
+
+    def __init__(self, script):
+        super().__init__(budget=None, max_iterations=1)
+        self.script = script
+        self.searched = []
+
+    def choose(self, gs, queues, turn):
+        self.searched.append(turn)
+        return self.script[turn]
+
+def test_pivot_and_attack_is_replayed_in_full():
+    gs, nt = _tower_position()
+    b = _Scripted({1: ("2", "5"), 2: ("1", "7")})
+    said = []
+    for _ in range(2):
+        b.on_turn(gs, nt.enemy_queues, nt.turn)
+        while True:
+            said.append(b(gs, nt.enemy_queues))
+            if nt.act(said[-1]):
+                break
+        if nt.turn == 1:
+            assert gs.player.side == "East" and gs.arrows == 9
+            nt.end_turn()
+            nt.begin_turn()
+    assert said == ["2", "5", "1", "7"]
+    assert b.searched == [1, 2]  # one search per turn, each action played whole
+    assert gs.player.side == "North"
+
+def test_table_drops_finished_turns_and_keeps_the_rest():
+    gs = _game()
+    b = _bot()
+    nt = night.Night(gs, horde=False)
+    nt.begin_turn()
+    b.choose(gs, nt.enemy_queues, nt.turn)
+    turn = nt.turn
+    assert {k[0] for k in b.table} > {turn}  # the search looked ahead
+    nt.act(b.choose(gs, nt.enemy_queues, nt.turn)[0])
+    nt.end_turn()
+    nt.begin_turn()
+    ahead = {k for k in b.table if k[0] > turn}
+    b.choose(gs, nt.enemy_queues, nt.turn)
+    assert all(k[0] >= nt.turn for k in b.table)
+    assert ahead <= set(b.table)  # what was learned about later turns is reused
+
+def test_hint_names_the_searched_action():
+    gs, nt = _tower_position()
+    action = _bot().choose(gs, nt.enemy_queues, nt.turn)
+    assert _bot().hint(gs, nt.enemy_queues, nt.turn) == f"Hint: {bot.describe(action, gs)}."
+    assert bot.describe(("2", "5"), gs) == "Cover East (2), then Attack (5)"
+    assert bot.describe(("8",), gs) == "Climb down (8)"
@@ -0,0 +1,30 @@
+import campaign
+
+def _results(**kw):
+    return list(campaign.run_campaigns(12, base_seed=5, max_days=8, keep_runs=True, **kw))
+
+def test_results_do_not_depend_on_workers_or_shards():
+    one = _results(workers=1)
+    assert [r.index for r in one] == list(range(12))
+    assert len({r.seed for r in one}) == 12
+    for shard_size in (5, 3):
+        assert _results(workers=2, shard_size=shard_size) == one
+
+def _sweep(seeds, max_days=8):
+    stats = campaign.SweepStats()
+    for i in seeds:
+        campaign.play_campaign(i, campaign.derive_seed(5, i), max_days, stats=stats)
+    return stats
+
+def test_sharded_stats_merge_to_the_serial_sweep():
+    whole = _sweep(range(12))
+    assert whole.runs == 12 and whole["fence_hp"].count > 12 and whole["wood"].count > 12
+    for workers, shard_size in ((1, 5), (2, 3)):
+        assert campaign.aggregate_campaigns(12, 5, workers, max_days=8, shard_size=shard_size) == whole
+
+def test_archive_runs_feed_every_stat():
+    stats = campaign.SweepStats()
+    runs = list(campaign.run_campaigns(12, 5, workers=2, max_days=8, shard_size=5, keep_runs=True,
+                                       stats=stats))
+    assert len(runs) == 12 and stats == _sweep(range(12))
+    assert stats["wood"].count == sum(len(r.run.days) for r in runs)
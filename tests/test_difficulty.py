@@ -0,0 +1,39 @@
+import copy
+import dataclasses
+import json
+import pickle
+
+import pytest
+
+import recipes
+from difficulty import DEFAULT, Difficulty, as_dict, from_dict, param_hash
+from entities import GameState
+
+def test_hashable_and_equal_by_value():
+    assert hash(Difficulty()) == hash(DEFAULT) and Difficulty() == DEFAULT
+    cheap = dataclasses.replace(DEFAULT, costs={**DEFAULT.costs, "Spear": 1})
+    assert cheap != DEFAULT and hash(cheap) != hash(DEFAULT)
+    assert len({DEFAULT, Difficulty(), cheap}) == 2
+
+def test_costs_are_read_only_and_private():
+    costs = {**DEFAULT.costs}
+    p = Difficulty(costs=costs)
+    costs["Spear"] = 99
+    assert p.costs["Spear"] == DEFAULT.costs["Spear"]
+    with pytest.raises(TypeError):
+        p.costs["Spear"] = 1
+
+def test_copies_and_dict_round_trip():
+    p = dataclasses.replace(DEFAULT, enemy_hp=9, costs={**DEFAULT.costs, "Bow": 3})
+    for q in (copy.deepcopy(p), pickle.loads(pickle.dumps(p)),
+              from_dict(json.loads(json.dumps(as_dict(p))))):
+        assert q == p and hash(q) == hash(p) and param_hash(q) == param_hash(p)
+
+def test_menu_follows_the_params_costs():
+    gs = GameState()
+    gs.player.wood = 4
+    assert recipes.BY_NAME["Spear"].id not in recipes.craftable(gs)
+    gs.params = dataclasses.replace(DEFAULT, costs={**DEFAULT.costs, "Spear": 4})
+    assert recipes.BY_NAME["Spear"].id in recipes.craftable(gs)
+    gs.params = Difficulty()  # equal to DEFAULT: same menu
+    assert recipes.BY_NAME["Spear"].id not in recipes.craftable(gs)
@@ -0,0 +1,73 @@
+import random
+
+from entities import BASE_NAMES, Enemy, ENEMY_NAMES, EnemyPool, EnemyQueue, intern_name, scaled_enemy
+from rng import GameRNG
+
+def _check(q: EnemyQueue, live: list):
+    """live: the enemies that should be in q, in spawn order."""
+    assert len(q) == len(live)
+    assert list(q) == live  # iteration is spawn order
+    assert sorted(map(id, q._items)) == sorted(map(id, live))
+    for e in live:
+        assert e in q and q._items[q._entry[id(e)][5]] is e
+    want = min(live, key=lambda e: (e.hp, e.dmg, e.name_id, live.index(e)), default=None)
+    assert q.lowest() is want
+
+def test_queue_order_and_dense_list_through_pushes_and_kills():
+    rng = random.Random(8)
+    q, live = EnemyQueue(), []
+    for step in range(400):
+        if live and rng.random() < 0.45:
+            if rng.random() < 0.5:
+                e = live.pop(rng.randrange(len(live)))  # a trap kill
+                q.remove(e)
+            else:
+                target = q.lowest()
+                name, hp = q.strike(rng.randrange(1, 4))
+                assert name == target.name
+                if hp == 0:
+                    live.remove(target)
+        else:
+            e = Enemy("North", rng.randrange(1, 8), rng.randrange(1, 4), rng.choice(ENEMY_NAMES[:6]))
+            q.push(e)
+            live.append(e)
+        _check(q, live)
+    assert len(q._heap) <= 2 * len(q) + 16  # dead entries are compacted
+
+def test_queue_copy_is_independent():
+    q = EnemyQueue(Enemy("East", hp, 2, ENEMY_NAMES[0]) for hp in (5, 3, 5))
+    c = q.copy()
+    assert [(e.hp, e.dmg) for e in c] == [(e.hp, e.dmg) for e in q]
+    c.strike(10)
+    assert len(c) == 2 and len(q) == 3 and q.lowest().hp == 3
+
+def test_pool_resets_reused_enemies():
+    pool = EnemyPool()
+    dead = Enemy("West", 0, 9, ENEMY_NAMES[3])
+    pool.release(dead)
+    e = pool.acquire("South", 6, 2, 1)
+    assert e is dead and len(pool) == 0
+    assert (e.side, e.hp, e.dmg, e.name) == ("South", 6, 2, ENEMY_NAMES[1]) and e.alive()
+    fresh = pool.acquire("North", 4, 3, 0)
+    assert fresh is not dead and (fresh.side, fresh.hp, fresh.dmg, fresh.name_id) == ("North", 4, 3, 0)
+
+def test_pool_keeps_at_most_max_free():
+    pool = EnemyPool(max_free=3)
+    enemies = [Enemy("North", 0, 1, ENEMY_NAMES[0]) for _ in range(5)]
+    for e in enemies:
+        pool.release(e)
+    assert len(pool) == 3
+    back = [pool.acquire("East", 1, 1, 0) for _ in range(4)]
+    assert {id(e) for e in back[:3]} == {id(e) for e in enemies[:3]}
+    assert back[3] not in enemies and len(pool) == 0
+
+def _spawns(seed):
+    spawn = GameRNG(seed).spawn
+    return [(e.hp, e.dmg, e.name) for e in (scaled_enemy(7, "North", spawn) for _ in range(200))]
+
+def test_interning_a_name_does_not_change_spawns():
+    before = _spawns(3)
+    intern_name("Test Wraith")
+    assert len(ENEMY_NAMES) > len(BASE_NAMES)
+    assert _spawns(3) == before
+    assert {name for _, _, name in before} == set(BASE_NAMES)
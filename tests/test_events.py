@@ -0,0 +1,36 @@
+import json
+
+import night
+from entities import GameState
+from events import Bus, JsonlSink, NightEnded, RingBuffer, Sink
+from rng import GameRNG
+
+class _Stamps(Sink):
+    """write() only: flush() is the base class's no-op."""
+
+    def __init__(self):
+        self.stamps = []
+
+    def write(self, ev, day, turn):
+        self.stamps.append((day, turn, type(ev)))
+
+def test_sinks_get_events_stamped_with_day_and_turn():
+    sink = _Stamps()
+    bus = Bus([sink])
+    gs = GameState(rng=GameRNG(2))
+    gs.day_num = 3
+    res = night.simulate_night(gs, bus=bus)
+    bus.flush()
+    assert {day for day, _, _ in sink.stamps} == {3}
+    turns = [turn for _, turn, _ in sink.stamps]
+    assert turns == sorted(turns) and turns[0] >= 1 and turns[-1] == res.turns
+    assert sink.stamps[-1] == (3, res.turns, NightEnded)
+
+def test_night_events_reach_every_sink(tmp_path):
+    ring, path = RingBuffer(), tmp_path / "ev.jsonl"
+    bus = Bus([ring, JsonlSink(str(path))])
+    res = night.simulate_night(GameState(rng=GameRNG(2)), bus=bus)
+    bus.flush()
+    assert ring.of(NightEnded)[-1][2] == NightEnded(res.survived, res.turns)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == len(ring.events) and lines[-1]["ev"] == "NightEnded"
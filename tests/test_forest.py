@@ -0,0 +1,53 @@
+import pytest
+
+import forest
+import pathing
+import world
+from world import T_CABIN, T_FENCE, T_TREE
+
+def test_chunks_smaller_than_the_mapping_granularity(tmp_path):
+    path = str(tmp_path / "forest.bin")
+    with forest.open_forest(path, 100, 90, seed=3, chunk=16, cache=4) as fm:
+        assert fm.tile(*fm.cabin_pos) == T_CABIN
+        cx, cy = fm.cabin_pos
+        assert fm.tile(cx, cy - forest.CLEARING + 1) == T_FENCE
+        assert fm.tile(0, 40) == T_TREE and fm.tile(99, 40) == T_TREE
+        tiles = {(x, y): fm.tile(x, y) for y in range(90) for x in range(100)}
+        assert fm.evictions > 0  # 42 chunks through a cache of 4
+        for y in (0, 15, 16, 45, 89):
+            assert list(fm.row(y, 3, 97)) == [tiles[x, y] for x in range(3, 97)]
+        fm.set_tile(33, 17, T_FENCE)
+        generated = fm.generated
+    with forest.open_forest(path, 100, 90, seed=3, chunk=16, cache=4) as fm:
+        tiles[33, 17] = T_FENCE
+        assert all(fm.tile(x, y) == t for (x, y), t in tiles.items())
+        assert fm.generated == 0 and generated == 42
+
+def test_views_stop_at_the_map_edge():
+    with forest.open_forest(None, 100, 90, seed=3, chunk=16) as fm:
+        n = 100 * 90
+        for view in (fm.tiles, fm.flags, fm.neighbors, fm.neighbor_idx):
+            assert sum(1 for _ in view) == n
+            assert view[-1] == view[n - 1]
+            with pytest.raises(IndexError):
+                view[n]
+        assert list(fm.tiles) == [fm.tile(x, y) for y in range(90) for x in range(100)]
+
+def test_installed_forest_serves_world_and_pathing():
+    before = world.current_map()
+    fm = world.install(forest.open_forest(None, 100, 90, seed=3, chunk=16))
+    try:
+        cx, cy = world.CABIN_POS
+        assert world.is_cabin(cx, cy) and world.is_walkable(cx, cy)
+        assert world.is_fence(cx, cy - forest.CLEARING + 1)
+        assert world.near_fence(cx, cy - forest.CLEARING + 2)
+        assert world.is_tree(0, 0) and not world.in_bounds(100, 0)
+        assert set(world.neighbors4(cx, cy)) == {(cx, cy - 1), (cx, cy + 1), (cx - 1, cy), (cx + 1, cy)}
+        field = pathing.flow_field()
+        assert field.map is fm and field.dist[field.cabin] == 0
+        fence = field.fence_cells["North"][0]
+        assert field.path(fence)[-1] == field.cabin
+        assert field.dist[fence] >= field.fence_cost
+    finally:
+        world.install(before)
+        fm.close()
@@ -0,0 +1,13 @@
+import main
+from entities import GameState
+from journal import SaveJournal
+from screen import NullScreen
+
+def test_save_messages_go_to_the_screen(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(main, "_journal", SaveJournal(str(tmp_path / "save")))
+    gs = GameState()
+    gs.player.wood = 17
+    main.save_game(gs, NullScreen())
+    loaded = main.load_game(NullScreen())
+    assert loaded.player.wood == 17
+    assert capsys.readouterr().out == ""
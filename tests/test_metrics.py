@@ -0,0 +1,35 @@
+import json
+
+from metrics import Exporter, JsonlExporter, Metrics, NullMetrics, PrometheusExporter
+
+class _Snapshots(Exporter):
+    def __init__(self):
+        self.seen = []
+
+    def export(self, m):
+        self.seen.append(m.snapshot())
+
+def test_each_flush_exports_the_running_totals():
+    ex = _Snapshots()
+    m = Metrics([ex])
+    m.inc("kills")
+    m.flush()
+    m.inc("kills", 2)
+    m.observe("night_attack", 1e-5)
+    m.flush()
+    assert [s["counters"] for s in ex.seen] == [{"kills": 1}, {"kills": 3}]
+    assert ex.seen[1]["histograms"]["night_attack"]["count"] == 1
+    NullMetrics([ex]).flush()  # never enabled: exports nothing
+    assert len(ex.seen) == 2
+
+def test_flush_reaches_every_exporter(tmp_path):
+    jl, prom = tmp_path / "m.jsonl", tmp_path / "m.prom"
+    m = Metrics([JsonlExporter(str(jl)), PrometheusExporter(str(prom))])
+    m.inc("enemies_spawned", 3)
+    m.observe("night_spawn", 2e-6)
+    m.flush()
+    rec = json.loads(jl.read_text())
+    assert rec["counters"] == {"enemies_spawned": 3}
+    text = prom.read_text()
+    assert "cabin_enemies_spawned_total 3" in text
+    assert "cabin_night_spawn_seconds_count 1" in text
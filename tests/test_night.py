@@ -0,0 +1,34 @@
+import night
+from entities import GameState
+from events import Bus, RingBuffer
+from journal import flatten_state
+from rng import GameRNG
+
+def _stay_north(gs, queues):
+    return "1"  # move to the side we are already on: never uses the turn
+
+def test_stuck_policy_forfeits_turns():
+    gs = GameState(rng=GameRNG(1))
+    gs.player.side = "North"
+    res = night.simulate_night(gs, _stay_north)
+    assert res.turns == night.TURNS or not res.survived
+
+def test_stuck_policy_forfeits_turns_with_on_turn():
+    gs = GameState(rng=GameRNG(1))
+    gs.player.side = "North"
+    seen = []
+    res = night.simulate_night(gs, _stay_north, on_turn=lambda gs, q, turn: seen.append(turn))
+    assert seen and seen[-1] == res.turns
+
+def _night(seed, day, horde):
+    gs = GameState(rng=GameRNG(seed))
+    gs.day_num = day
+    gs.traps = 2
+    ring = RingBuffer(4096)
+    res = night.simulate_night(gs, horde=horde, bus=Bus([ring]))
+    return vars(res), flatten_state(gs), [ev for _, _, ev in ring.events]
+
+def test_horde_and_per_enemy_nights_play_the_same():
+    for seed in range(12):
+        for day in (3, 12, 30, 60):
+            assert _night(seed, day, True) == _night(seed, day, False)
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import night
+import packed
+import recipes
+from entities import GameState
+from journal import flatten_state
+from packed import UndoLog, restore, snapshot, state_hash
+from rng import GameRNG
+
+def _busy(seed=5):
+    """A game some days in, with every packed field off its default."""
+    gs = GameState(rng=GameRNG(seed))
+    for _ in range(3):
+        main.play_day(gs, main.steady_day_policy)
+        night.simulate_night(gs)
+        gs.day_num += 1
+    gs.alive = True
+    gs.player.wood = 999
+    for name in ("Spear", "Bow", "Watchtower"):
+        recipes.craft(gs, recipes.BY_NAME[name].id)
+    gs.player.wood = 99
+    gs.fence("East").hp = 3
+    gs.fence("West").max_hp += 5
+    gs.has_field, gs.field_state, gs.field_timer, gs.field_watered = True, "planted", 2, 1
+    gs.in_tower, gs.campfire_on = True, False
+    gs.player.side, gs.player.defending = "West", True
+    gs.defense_bonus = 0.15
+    gs.traps, gs.arrows = 2, 7
+    for s in packed.STREAMS:
+        getattr(gs.rng, s).jump(1000 + len(s))
+    return gs
+
+def _streams(gs):
+    return [(getattr(gs.rng, s).key, getattr(gs.rng, s).counter) for s in packed.STREAMS]
+
+def test_restore_reproduces_every_field():
+    gs = _busy()
+    snap = snapshot(gs)
+    assert len(packed.diff(snapshot(GameState(rng=GameRNG(0))), snap)) > packed.SIZE // 2
+    back = restore(GameState(), snap)
+    assert flatten_state(back) == flatten_state(gs)
+    assert back.upgrades == gs.upgrades and back.player.defending
+    assert _streams(back) == _streams(gs)
+    # and the streams continue where they were
+    for s in packed.STREAMS:
+        assert getattr(back.rng, s).next64() == getattr(gs.rng, s).next64()
+    assert snapshot(back) == snapshot(gs)
+
+_CHILD = """
+from tests.test_packed import _busy
+from packed import snapshot, state_hash
+print(state_hash(snapshot(_busy())))
+"""
+
+def test_hash_is_stable_across_processes():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    want = state_hash(snapshot(_busy()))
+    for hashseed in ("1", "2"):
+        out = subprocess.run([sys.executable, "-c", _CHILD], cwd=root,
+                             env={**os.environ, "PYTHONHASHSEED": hashseed,
+                                  "PYTHONPATH": root},
+                             capture_output=True, text=True, check=True).stdout
+        assert int(out) == want
+
+def test_hash_changes_with_every_slot():
+    snap = snapshot(_busy())
+    seen = {state_hash(snap)}
+    for i in range(packed.SIZE):
+        changed = snap[:i] + (snap[i] + 1,) + snap[i + 1:]
+        seen.add(state_hash(changed))
+    assert len(seen) == packed.SIZE + 1
+
+def test_undo_log_restores_each_level():
+    gs = _busy()
+    log = UndoLog(gs)
+    saved = []
+    for day in range(4):
+        saved.append((flatten_state(gs), _streams(gs)))
+        log.mark()
+        main.play_day(gs, main.steady_day_policy)
+        night.simulate_night(gs)
+        gs.day_num += 1
+    assert len(log) == 4
+    while saved:
+        log.undo()
+        assert (flatten_state(gs), _streams(gs)) == saved.pop()
+    assert len(log) == 0
+
+def test_keep_drops_the_mark_but_not_the_changes():
+    gs = _busy()
+    food = gs.player.food
+    log = UndoLog(gs)
+    log.mark()
+    gs.player.wood -= 5
+    log.mark()
+    gs.player.food += 1
+    log.keep()
+    assert (gs.player.wood, gs.player.food) == (94, food + 1)
+    log.undo()
+    assert (gs.player.wood, gs.player.food) == (99, food) and len(log) == 0
+
+def test_values_outside_the_tables_are_rejected():
+    gs = _busy()
+    gs.field_state = "flooded"
+    with pytest.raises(ValueError, match="flooded"):
+        snapshot(gs)
+    gs = _busy()
+    gs.upgrades.add("Catapult")
+    with pytest.raises(ValueError, match="Catapult"):
+        snapshot(gs)
+    assert "Catapult" not in packed.UPGRADES
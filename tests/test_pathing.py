@@ -0,0 +1,78 @@
+import pathing
+from entities import GameState, SIDES
+from pathing import INF, STAY, FlowField
+from world import T_FENCE, T_TREE, TileMap
+
+def _walled() -> TileMap:
+    """An 11x9 clearing with fence columns west and east of the cabin too."""
+    tmap = TileMap(11, 9)
+    for y in range(2, 7):
+        for x in (2, 8):
+            tmap.tiles[y * tmap.width + x] = T_FENCE
+    return tmap
+
+def _recomputed(field: FlowField) -> FlowField:
+    fresh = FlowField(field.map, field.fence_cost)
+    fresh.cost = list(field.cost)
+    fresh.dist = [INF] * len(fresh.dist)
+    fresh.next = [STAY] * len(fresh.next)
+    fresh._build()
+    return fresh
+
+def _assert_matches_full(field: FlowField):
+    fresh = _recomputed(field)
+    assert field.dist == fresh.dist
+    # ties may pick another neighbor, but every step must be a cheapest one
+    for i, j in enumerate(field.next):
+        if i == field.cabin or field.dist[i] == INF:
+            assert j == STAY
+            continue
+        assert field.map.tiles[j] != T_TREE
+        assert field.dist[i] == field.dist[j] + field.cost[i]
+
+def test_fence_cells_cover_all_four_sides():
+    field = FlowField(_walled())
+    assert set(field.fence_cells) == set(SIDES)
+    assert all(field.fence_cells[side] for side in SIDES)
+    w = field.map.width
+    assert {i % w for i in field.fence_cells["West"]} == {2}
+    assert {i % w for i in field.fence_cells["East"]} == {8}
+    assert {i // w for i in field.fence_cells["North"]} == {1}
+    # the default clearing has fences only north and south
+    plain = FlowField(TileMap())
+    assert not plain.fence_cells["East"] and not plain.fence_cells["West"]
+
+def test_incremental_updates_match_a_full_recompute():
+    field = FlowField(_walled())
+    _assert_matches_full(field)
+    gs = GameState()
+    for side, hp in [("West", 0), ("North", 0), ("West", 5), ("East", 0),
+                     ("South", 0), ("North", 5), ("East", 5), ("South", 5)]:
+        gs.fence(side).hp = hp
+        assert field.sync_fences(gs) > 0
+        _assert_matches_full(field)
+    # single cells, as a trampled fence board would be
+    for i in field.fence_cells["North"][::2] + field.fence_cells["East"][1::2]:
+        field.set_cost(i, 1)
+        _assert_matches_full(field)
+        field.set_cost(i, field.fence_cost)
+        _assert_matches_full(field)
+
+def test_advance_stops_at_intact_fences():
+    field = FlowField(TileMap())
+    w = field.map.width
+    start = [0 * w + 3, 6 * w + 3]  # trees above the north and below the south fence
+    for _ in range(20):
+        start, blocked = field.advance(start)
+    assert blocked == [0, 1] and all(field.cost[field.next[i]] > 1 for i in start)
+    gs = GameState()
+    gs.fence("North").hp = 0
+    field.sync_fences(gs)
+    for _ in range(20):
+        start, blocked = field.advance(start)
+    assert start[0] == field.cabin and blocked == [1]
+
+def test_flow_field_is_cached_per_map():
+    tmap = TileMap()
+    assert pathing.flow_field(tmap) is pathing.flow_field(tmap)
+    assert pathing.flow_field(TileMap()) is not pathing.flow_field(tmap)
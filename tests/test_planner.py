@@ -0,0 +1,32 @@
+import pytest
+
+from entities import GameState
+from planner import PlanError, validate_plan
+
+def _gs(wood):
+    gs = GameState()
+    gs.player.wood = wood
+    return gs
+
+def test_sure_purchase_cannot_repeat():
+    with pytest.raises(PlanError) as err:
+        validate_plan(_gs(20), ["craft u1", "craft u1"])
+    assert err.value.step == 1
+
+def test_unaffordable_craft_may_be_retried():
+    # 0 wood: the first Spear may fail, so buying it after gathering is a retry
+    plan = ["craft u1", "gather", "gather", "craft u1"]
+    assert validate_plan(_gs(0), plan) == ["5 u1", "1", "1", "5 u1"]
+
+def test_retry_once_sure_makes_it_owned():
+    with pytest.raises(PlanError):
+        validate_plan(_gs(0), ["craft u1", "gather", "gather", "craft u1", "craft u1"])
+
+def test_maybe_owned_prerequisite_is_allowed():
+    assert validate_plan(_gs(3), ["craft u1", "craft u4"]) == ["5 u1", "5 u4"]
+    with pytest.raises(PlanError):
+        validate_plan(_gs(30), ["craft u4"])
+
+def test_check_wood_still_rejects_short_crafts():
+    with pytest.raises(PlanError):
+        validate_plan(_gs(0), ["craft u1"], check_wood=True)
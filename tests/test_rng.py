@@ -0,0 +1,55 @@
+import copy
+import hashlib
+import pickle
+import struct
+
+import pytest
+
+from rng import BLOCK, RUN, GameRNG, Stream
+
+def _draw(key: int, i: int) -> int:
+    """Draw i of the stream keyed `key`, straight from the definition."""
+    h = hashlib.blake2b(key=key.to_bytes(8, "little"), digest_size=8 * BLOCK)
+    h.update((i // BLOCK).to_bytes(8, "little"))
+    return struct.unpack(f"<{BLOCK}Q", h.digest())[i % BLOCK]
+
+def test_draws_match_definition_across_refills():
+    s = GameRNG(7).spawn
+    n = 3 * RUN * BLOCK + 5
+    assert [s.next64() for _ in range(n)] == [_draw(s.key, i) for i in range(n)]
+
+@pytest.mark.parametrize("to", [0, 3, BLOCK * RUN - 1, BLOCK * RUN + 1, 65536 * 3])
+def test_jump_and_seek(to):
+    s = GameRNG(7).combat
+    for _ in range(10):
+        s.next64()
+    s.jump(to)
+    assert [s.next64() for _ in range(BLOCK * RUN + 3)] == [_draw(s.key, to + i) for i in range(BLOCK * RUN + 3)]
+    s.seek(12345, to)
+    assert s.next64() == _draw(12345, to) and s.counter == to + 1
+
+def test_derived_draws():
+    s, ref = Stream(99), 0
+    for _ in range(200):
+        assert s.random() == (_draw(99, ref) >> 11) / (1 << 53)
+        assert s.randint(1, 6) == 1 + (_draw(99, ref + 1) * 6 >> 64)
+        assert s.choice("abc") == "abc"[_draw(99, ref + 2) * 3 >> 64]
+        ref += 3
+    assert s.counter == ref
+
+def test_copy_and_pickle_continue_the_stream():
+    s = GameRNG(3).loot
+    s.randrange(10)
+    for clone in (copy.deepcopy(s), pickle.loads(pickle.dumps(s))):
+        assert (clone.key, clone.counter) == (s.key, s.counter)
+        assert clone.next64() == _draw(s.key, s.counter)
+
+def test_empty_ranges():
+    s = Stream(1)
+    with pytest.raises(ValueError):
+        s.randrange(0)
+    with pytest.raises(ValueError):
+        s.randint(2, 1)
+    with pytest.raises(IndexError):
+        s.choice([])
+    assert s.counter == 0
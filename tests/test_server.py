@@ -0,0 +1,69 @@
+import asyncio
+
+from server import CabinServer
+
+PROMPTS = ("> ", "...", "(y/N): ")
+
+async def _until_prompt(reader: asyncio.StreamReader) -> str:
+    """Read until the server waits for a line (a prompt) or hangs up."""
+    text = ""
+    while not text.endswith(PROMPTS):
+        chunk = await reader.read(4096)
+        if not chunk:
+            break
+        text += chunk.decode("utf-8")
+    return text
+
+async def _with_server(client, **kw):
+    cabins = CabinServer(**kw)
+    server = await cabins.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            try:
+                return await asyncio.wait_for(client(reader, writer), 60), cabins
+            finally:
+                writer.close()
+    finally:
+        await asyncio.sleep(0)  # let the handler finish its cleanup
+
+async def _play_to_the_end(reader, writer):
+    """End every day at once and wait out every night turn."""
+    text, screens = await _until_prompt(reader), 1
+    while not reader.at_eof():
+        writer.write(b"7\n" if text.endswith("> ") else b"\n")
+        await writer.drain()
+        text = await _until_prompt(reader)
+        screens += 1
+    return text, screens
+
+def test_scripted_session_plays_to_game_over():
+    (text, screens), cabins = asyncio.run(_with_server(_play_to_the_end))
+    assert "You collapse against the cold earth" in text
+    assert "You survived until Day" in text and screens > 10
+    assert cabins.sessions == 0
+
+async def _send_long_line(reader, writer):
+    intro = await _until_prompt(reader)
+    writer.write(b"7" * 200 + b"\n")
+    await writer.drain()
+    rest = await reader.read()
+    return intro, rest
+
+def test_over_long_line_hangs_up():
+    (intro, rest), cabins = asyncio.run(_with_server(_send_long_line, max_line=64))
+    assert intro.endswith("[Enter] Step toward the cabin...")
+    assert rest == b"" and cabins.sessions == 0
+
+async def _sit_idle(reader, writer):
+    await _until_prompt(reader)
+    loop = asyncio.get_running_loop()
+    t = loop.time()
+    rest = await reader.read()
+    return rest, loop.time() - t
+
+def test_idle_client_is_disconnected():
+    (rest, waited), cabins = asyncio.run(_with_server(_sit_idle, idle_timeout=0.3))
+    assert rest == b"" and 0.25 <= waited < 5
+    assert cabins.sessions == 0
@@ -0,0 +1,91 @@
+import copy
+
+import night
+import solver
+from entities import Enemy, ENEMY_NAMES, GameState, SIDES
+from rng import GameRNG
+
+TURN = 16  # four turns left: small enough to solve exactly
+
+FOES = {"North": [(4, 3), (6, 2)], "East": [(3, 2)], "South": [], "West": [(5, 3)]}
+
+def _position() -> GameState:
+    gs = GameState()
+    gs.player.hp = 18
+    for side, hp in zip(SIDES, (0, 6, 12, 0)):
+        gs.fence(side).hp = hp
+    return gs
+
+def _queues(nt: night.Night):
+    for side, foes in FOES.items():
+        for hp, dmg in foes:
+            nt.enemy_queues[side].push(Enemy(side, hp, dmg, ENEMY_NAMES[0]))
+
+def _monte_carlo(n: int):
+    survived = fence_hp = 0
+    for i in range(n):
+        gs = copy.deepcopy(_position())
+        gs.rng = GameRNG(1000 + i)
+        nt = night.Night(gs, horde=False)
+        nt.turn = TURN
+        _queues(nt)
+        while not nt.over:
+            nt.begin_turn()
+            for _ in range(night.MAX_FREE_ACTIONS):
+                if nt.act(night.greedy_policy(gs, nt.enemy_queues)):
+                    break
+            if gs.player.hp <= 0:
+                gs.alive = False
+                break
+            nt.end_turn()
+        res = nt.finish()
+        survived += res.survived
+        fence_hp += sum(res.fences.values())
+    return survived / n, fence_hp / n
+
+def _exact() -> solver.Odds:
+    gs = _position()
+    nt = night.Night(gs, horde=False)
+    _queues(nt)
+    st = solver.night_state(gs, nt.enemy_queues, TURN)
+    return solver.Solver(gs, solver.greedy).solve(st)
+
+def test_exact_odds_match_monte_carlo():
+    odds = _exact()
+    assert odds.unexplored == 0.0
+    assert 0.1 < odds.survival < 0.9  # a position that can go either way
+    survival, fence_hp = _monte_carlo(4000)
+    assert abs(odds.survival - survival) < 0.03  # about 4 standard errors
+    assert abs(odds.fence_hp - fence_hp) < 0.5
+
+def test_odds_stay_within_unit_interval():
+    gs = _position()
+    gs.player.hp = 100  # can't die: survival sums to 1 up to rounding
+    odds = solver.Solver(gs, solver.greedy).solve(solver.night_state(gs, None, TURN + 2))
+    assert 1.0 - 1e-9 < odds.survival <= 1.0
+
+def _state(turn: int):
+    gs = _position()
+    nt = night.Night(gs, horde=False)
+    _queues(nt)
+    return gs, solver.night_state(gs, nt.enemy_queues, turn)
+
+def test_epsilon_bounds_the_unexplored_mass():
+    gs, st = _state(TURN - 1)
+    exact = solver.Solver(gs, solver.greedy).solve(st)
+    odds = solver.Solver(gs, solver.greedy, epsilon=1e-2).solve(st)
+    assert 0.0 < odds.unexplored <= 1e-2
+    assert odds.survival <= exact.survival <= odds.survival + odds.unexplored + 1e-12
+
+def test_epsilon_bounds_best_play():
+    gs, st = _state(TURN)
+    exact = solver.Solver(gs).solve(st)
+    odds = solver.Solver(gs, epsilon=1e-2).solve(st)
+    assert 0.0 < odds.unexplored <= 1e-2
+    assert odds.survival <= exact.survival + 1e-12
+
+def test_time_limit_returns_a_bracket():
+    gs = GameState()
+    gs.day_num = 6
+    odds = solver.survival_odds(gs, time_limit=0.5)
+    assert 0.0 <= odds.survival <= odds.survival + odds.unexplored <= 1.0 + 1e-12
@@ -0,0 +1,38 @@
+import random
+
+from stats import EXACT, Stat, SweepStats
+
+def _values(n=3000, seed=2):
+    rng = random.Random(seed)
+    return [rng.choice((rng.randrange(-50, 200), rng.randrange(EXACT, 10**7), -rng.randrange(10**6)))
+            for _ in range(n)]
+
+def test_merged_shards_equal_one_stat():
+    vals = _values()
+    whole = Stat()
+    for v in vals:
+        whole.add(v)
+    for size in (1, 7, 500):
+        merged = Stat()
+        for lo in range(0, len(vals), size):
+            part = Stat()
+            for v in reversed(vals[lo:lo + size]):
+                part.add(v)
+            merged.merge(part)
+        assert merged == whole
+        assert merged.quantile(0.5) == whole.quantile(0.5)
+    assert Stat().merge(whole) == whole and Stat().merge(Stat()) == Stat()
+
+def test_merged_sweep_stats_equal_one_sweep():
+    vals = _values(400)
+    whole, parts = SweepStats(), [SweepStats() for _ in range(3)]
+    for i, v in enumerate(vals):
+        for s in (whole, parts[i % 3]):
+            s.dusk(v, -v)
+            s.night(abs(v), i % 4)
+            s.end(i % 30, ("overrun", "starved")[i % 2])
+    merged = SweepStats()
+    for p in parts:
+        merged.merge(p)
+    assert merged == whole
+    assert SweepStats.from_dict(merged.to_dict()) == whole
@@ -0,0 +1,21 @@
+import main
+import night
+import sweep
+from difficulty import DEFAULT
+
+def test_code_files_follow_the_imports():
+    for name in ("campaign.py", "entities.py", "night.py", "recipes.py", "rng.py"):
+        assert name in sweep.CODE_FILES
+    assert "sweep.py" not in sweep.CODE_FILES
+
+def test_policy_modules_join_the_version(tmp_path):
+    cache = sweep.Cache(str(tmp_path))
+    assert sweep._policy_files(main.steady_day_policy, night.greedy_policy) == ("main.py", "night.py")
+    assert "planner.py" not in sweep.CODE_FILES
+    assert cache.version_for(("planner.py",)) != cache.version
+
+def test_second_evaluate_is_cached(tmp_path):
+    cache = sweep.Cache(str(tmp_path))
+    first, = sweep.evaluate([DEFAULT], runs=4, max_days=3, workers=1, cache=cache, shard_size=2)
+    again, = sweep.evaluate([DEFAULT], runs=4, max_days=3, workers=1, cache=cache, shard_size=2)
+    assert not first.cached and again.cached and again.days == first.days
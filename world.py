@@ -1,10 +1,13 @@
 # world.py
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
-# Map is a fixed 7x7 grid:
-# - Outer ring (y=0 and y=6, x=0 and x=6) = trees (impassable)
-# - North fence at y=1, South fence at y=5
-# - Ground elsewhere; Cabin center at (3,3)
+# Map is a WIDTH x HEIGHT grid (7x7 by default, see configure()):
+# - Outer ring (y=0 and y=HEIGHT-1, x=0 and x=WIDTH-1) = trees (impassable)
+# - North fence at y=1, South fence at y=HEIGHT-2
+# - Ground elsewhere; Cabin at the center
+#
+# The layout is compiled once into flat tables indexed by y * WIDTH + x,
+# so every query below is a lookup.
 
 TREE = "🌲"
 FENCE = "#"
@@ -12,75 +15,131 @@ GROUND = "."
 CABIN = "C"
 PLAYER = "@"
 
-WIDTH = 7
-HEIGHT = 7
+# Tile codes
+T_GROUND, T_TREE, T_FENCE, T_CABIN = range(4)
+_TILE_CHARS = (GROUND, TREE, FENCE, CABIN)
 
-CABIN_POS = (3, 3)
+# Adjacency flags
+NEAR_TREE = 1
+NEAR_FENCE = 2
+
+LEGEND = "Legend: @ You   C Cabin   # Fence   🌲 Trees   . Ground"
+
+class TileMap:
+    """The clearing compiled to tile codes, adjacency flags and neighbor tables."""
+
+    def __init__(self, width: int = 7, height: int = 7):
+        if width < 3 or height < 5:
+            raise ValueError(f"map must be at least 3x5, got {width}x{height}")
+        self.width = width
+        self.height = height
+        self.cabin_pos = (width // 2, height // 2)
+        n = width * height
+
+        self.tiles = bytearray(n)
+        for y in range(height):
+            for x in range(width):
+                if x == 0 or x == width - 1 or y == 0 or y == height - 1:
+                    code = T_TREE
+                elif y == 1 or y == height - 2:
+                    code = T_FENCE
+                elif (x, y) == self.cabin_pos:
+                    code = T_CABIN
+                else:
+                    code = T_GROUND
+                self.tiles[y * width + x] = code
+
+        # 4-neighbors per cell, as coordinates and as flat indices (N, S, W, E)
+        self.neighbors: List[Tuple[Tuple[int, int], ...]] = []
+        self.neighbor_idx: List[Tuple[int, ...]] = []
+        self.flags = bytearray(n)
+        for y in range(height):
+            for x in range(width):
+                cand = [(x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)]
+                nbrs = tuple((nx, ny) for nx, ny in cand if 0 <= nx < width and 0 <= ny < height)
+                idx = tuple(ny * width + nx for nx, ny in nbrs)
+                self.neighbors.append(nbrs)
+                self.neighbor_idx.append(idx)
+                flag = 0
+                for j in idx:
+                    if self.tiles[j] == T_TREE:
+                        flag |= NEAR_TREE
+                    elif self.tiles[j] == T_FENCE:
+                        flag |= NEAR_FENCE
+                self.flags[y * width + x] = flag
+
+        # Base frame, with per-row prefixes/suffixes so render() only patches one row
+        self.rows = ["".join(_TILE_CHARS[c] for c in self.tiles[y * width:(y + 1) * width])
+                     for y in range(height)]
+        tail = ["", LEGEND]
+        self.frame = "\n".join(self.rows + tail)
+        self._head = ["\n".join(self.rows[:y] + [""]) for y in range(height)]
+        self._tail = ["\n".join([""] + self.rows[y + 1:] + tail) for y in range(height)]
+
+    def render(self, px: int, py: int) -> str:
+        if not (0 <= px < self.width and 0 <= py < self.height):
+            return self.frame
+        row = self.rows[py]
+        return self._head[py] + row[:px] + PLAYER + row[px + 1:] + self._tail[py]
+
+_map = TileMap()
+WIDTH = _map.width
+HEIGHT = _map.height
+CABIN_POS = _map.cabin_pos
+
+def configure(width: int, height: int) -> TileMap:
+    """Recompile the world at a new size. Returns the new map."""
+    return install(TileMap(width, height))
+
+def install(tmap):
+    """Make tmap the current world: a TileMap, or anything with its interface
+    (e.g. a forest.ForestMap). Returns it."""
+    global _map, WIDTH, HEIGHT, CABIN_POS
+    _map = tmap
+    WIDTH, HEIGHT, CABIN_POS = _map.width, _map.height, _map.cabin_pos
+    return _map
+
+def current_map() -> TileMap:
+    return _map
 
 def in_bounds(x: int, y: int) -> bool:
     return 0 <= x < WIDTH and 0 <= y < HEIGHT
 
+def tile_at(x: int, y: int) -> int:
+    return _map.tiles[y * WIDTH + x]
+
 def is_tree(x: int, y: int) -> bool:
-    return x == 0 or x == WIDTH - 1 or y == 0 or y == HEIGHT - 1
+    return 0 <= x < WIDTH and 0 <= y < HEIGHT and _map.tiles[y * WIDTH + x] == T_TREE
 
 def is_fence(x: int, y: int) -> bool:
-    return (y == 1 or y == HEIGHT - 2) and (0 < x < WIDTH - 1)
+    return 0 <= x < WIDTH and 0 <= y < HEIGHT and _map.tiles[y * WIDTH + x] == T_FENCE
 
 def is_cabin(x: int, y: int) -> bool:
     return (x, y) == CABIN_POS
 
 def is_walkable(x: int, y: int) -> bool:
     # You can walk on ground and the cabin tile. Fences/trees are walls.
-    if not in_bounds(x, y):
-        return False
-    if is_tree(x, y):
-        return False
-    if is_fence(x, y):
+    if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
         return False
-    return True  # includes GROUND and CABIN
+    return _map.tiles[y * WIDTH + x] in (T_GROUND, T_CABIN)
 
-def neighbors4(x: int, y: int) -> List[Tuple[int, int]]:
-    cand = [(x, y-1), (x, y+1), (x-1, y), (x+1, y)]
-    return [(nx, ny) for nx, ny in cand if in_bounds(nx, ny)]
+def neighbors4(x: int, y: int) -> Sequence[Tuple[int, int]]:
+    # Shared precomputed tuple; don't mutate
+    return _map.neighbors[y * WIDTH + x]
 
 def tile_char(x: int, y: int) -> str:
-    if is_tree(x, y):
-        return TREE
-    if is_fence(x, y):
-        return FENCE
-    if is_cabin(x, y):
-        return CABIN
-    return GROUND
+    return _TILE_CHARS[_map.tiles[y * WIDTH + x]]
 
 def render(player_xy: Tuple[int, int]) -> str:
-    px, py = player_xy
-    rows = []
-    for y in range(HEIGHT):
-        line = []
-        for x in range(WIDTH):
-            if (x, y) == (px, py):
-                line.append(PLAYER)
-            else:
-                line.append(tile_char(x, y))
-        rows.append("".join(line))
-    # Add a small legend below
-    rows.append("")
-    rows.append("Legend: @ You   C Cabin   # Fence   🌲 Trees   . Ground")
-    return "\n".join(rows)
+    return _map.render(*player_xy)
 
 def near_trees(x: int, y: int) -> bool:
     # True if any adjacent tile (4-dir) is a TREE
-    for nx, ny in neighbors4(x, y):
-        if is_tree(nx, ny):
-            return True
-    return False
+    return bool(_map.flags[y * WIDTH + x] & NEAR_TREE)
 
 def at_cabin(x: int, y: int) -> bool:
     return is_cabin(x, y)
 
 def near_fence(x: int, y: int) -> bool:
     # True if any adjacent tile is a fence
-    for nx, ny in neighbors4(x, y):
-        if is_fence(nx, ny):
-            return True
-    return False
\ No newline at end of file
+    return bool(_map.flags[y * WIDTH + x] & NEAR_FENCE)